@@ -0,0 +1,128 @@
+"""
+Model backends for the benchmark suite.
+
+A backend is a callable returning a ready QwenASRPipeline. "stub" needs no
+weights or GPU: it decodes and resamples its inputs like the real model and
+then does a fixed amount of FFT work per second of audio, so it is CPU-only,
+deterministic and sensitive to front-end and scheduling changes. "qwen"
+loads real weights. Register further backends in BACKENDS.
+
+``StubASRModel`` is also the stand-in model of the single-purpose
+benchmarks; its options select the cost each one needs to expose.
+"""
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.audio import TARGET_SAMPLE_RATE, load_audio, prepare_waveform
+from src.inference import QwenASRPipeline
+
+FRAME = 400
+HOP = 160
+
+
+class StubASRModel:
+    """
+    Stand-in for Qwen3ASRModel with configurable, deterministic costs.
+    
+    Inputs are normalized to 16 kHz mono like the real model does (paths
+    are decoded from disk). By default each one is then framed
+    (25 ms / 10 ms) and passed through an FFT ``passes`` times as a
+    stand-in for the encoder, so work is proportional to audio length.
+    The text reports the normalized length so results stay checkable.
+    """
+    
+    def __init__(
+        self,
+        passes: int = 2,
+        pad_batch: bool = False,
+        overhead_ms: float = 0.0,
+        per_item_ms: float = 0.0,
+        report: str = "seconds"
+    ):
+        """
+        Configure the stub.
+        
+        Args:
+            passes: FFT passes over each input's frames (0: decode only)
+            pad_batch: Also pad each batch to its longest input and FFT the
+                padded matrix, so padding waste costs time
+            overhead_ms: Fixed sleep per call (the shape of a GPU forward pass)
+            per_item_ms: Additional sleep per input in the call
+            report: Text of each result: "seconds" ("2.00s") or "samples" ("32000 samples")
+        """
+        if report not in ("seconds", "samples"):
+            raise ValueError(f"report must be 'seconds' or 'samples', got {report!r}")
+        self.passes = passes
+        self.pad_batch = pad_batch
+        self.overhead = overhead_ms / 1000.0
+        self.per_item = per_item_ms / 1000.0
+        self.report = report
+    
+    def transcribe(self, audio, language=None, **kwargs):
+        items = audio if isinstance(audio, list) else [audio]
+        languages = language if isinstance(language, list) else [language] * len(items)
+        waveforms = [self._normalize(item) for item in items]
+        
+        if self.pad_batch and waveforms:
+            padded = np.zeros((len(waveforms), max(len(w) for w in waveforms)), dtype=np.float32)
+            for row, waveform in enumerate(waveforms):
+                padded[row, :len(waveform)] = waveform
+            np.abs(np.fft.rfft(padded, axis=1))
+        for waveform in waveforms:
+            if self.passes and len(waveform) >= FRAME:
+                frames = np.lib.stride_tricks.sliding_window_view(waveform, FRAME)[::HOP]
+                for _ in range(self.passes):
+                    np.abs(np.fft.rfft(frames, axis=1))
+        delay = self.overhead + self.per_item * len(items)
+        if delay > 0:
+            time.sleep(delay)
+            
+        return [
+            SimpleNamespace(text=self._describe(waveform), language=hint or "English")
+            for waveform, hint in zip(waveforms, languages)
+        ]
+    
+    def _describe(self, waveform: np.ndarray) -> str:
+        if self.report == "samples":
+            return f"{len(waveform)} samples"
+        return f"{len(waveform) / TARGET_SAMPLE_RATE:.2f}s"
+    
+    @staticmethod
+    def _normalize(item) -> np.ndarray:
+        if isinstance(item, str):
+            return load_audio(item)
+        if isinstance(item, tuple):
+            return prepare_waveform(*item)
+        return np.asarray(item, dtype=np.float32)
+
+
+def stub_backend(batch_size: int, model_path: Optional[str] = None) -> QwenASRPipeline:
+    return QwenASRPipeline(device="cpu", max_inference_batch_size=batch_size, model=StubASRModel())
+
+
+def qwen_backend(batch_size: int, model_path: Optional[str] = None) -> QwenASRPipeline:
+    return QwenASRPipeline(
+        model_name=model_path or "Qwen/Qwen3-ASR-0.6B",
+        max_inference_batch_size=batch_size,
+    )
+
+
+BACKENDS: Dict[str, Callable[..., QwenASRPipeline]] = {
+    "stub": stub_backend,
+    "qwen": qwen_backend,
+}
+
+
+def create_pipeline(backend: str, batch_size: int, model_path: Optional[str] = None) -> QwenASRPipeline:
+    """
+    Build the pipeline for a registered backend name.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose from {sorted(BACKENDS)}")
+    return BACKENDS[backend](batch_size, model_path)
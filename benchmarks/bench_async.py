@@ -0,0 +1,152 @@
+"""
+Benchmark: event-loop responsiveness while transcribing from asyncio.
+
+A heartbeat task asks to wake up every --tick-ms and records how late it
+actually runs. Alongside it, --clients coroutines each transcribe
+--requests clips, either by calling the blocking QwenASRPipeline directly
+from the loop ("blocking") or through AsyncQwenASRPipeline ("async"), which
+runs inference on its own thread and batches concurrent awaits. Reports
+heartbeat lag percentiles, request latency and throughput per mode, then
+checks that a bad input coalesced with good ones fails only its own await.
+
+Usage:
+    python benchmarks/bench_async.py
+    python benchmarks/bench_async.py --clients 32 --requests 8 --max-concurrency 16
+    python benchmarks/bench_async.py --backend qwen --model-path Qwen/Qwen3-ASR-0.6B
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.backends import BACKENDS, create_pipeline
+from benchmarks.corpus import ClipSpec, synthesize
+from benchmarks.run_suite import latency_summary
+from src.async_pipeline import AsyncQwenASRPipeline
+from src.audio import TARGET_SAMPLE_RATE
+
+MODES = ("blocking", "async")
+
+
+async def heartbeat(tick: float, lags: List[float], stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_mode(mode: str, pipeline, clips: List[np.ndarray], args) -> dict:
+    lags, latencies = [], []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(args.tick_ms / 1000.0, lags, stop))
+    await asyncio.sleep(0.1)
+    
+    if mode == "async":
+        frontend = AsyncQwenASRPipeline(
+            pipeline,
+            max_batch_size=args.batch_size,
+            max_wait_ms=args.max_wait_ms,
+            max_concurrency=args.max_concurrency,
+        ).start()
+        
+        async def transcribe(clip):
+            return await frontend.atranscribe_numpy(clip, TARGET_SAMPLE_RATE)
+    else:
+        async def transcribe(clip):
+            return pipeline.transcribe_numpy(clip, TARGET_SAMPLE_RATE)
+    
+    async def client(index: int):
+        for request in range(args.requests):
+            clip = clips[(index + request) % len(clips)]
+            start = time.perf_counter()
+            await transcribe(clip)
+            latencies.append(time.perf_counter() - start)
+        
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    
+    if mode == "async":
+        batches = frontend.coalescer.stats()
+        await frontend.aclose()
+    stop.set()
+    await beat
+    
+    result = {
+        "wall_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed,
+        "request_latency_ms": latency_summary(latencies),
+        "loop_lag_ms": latency_summary(lags),
+    }
+    if mode == "async":
+        result["mean_batch_size"] = batches["mean_batch_size"]
+    return result
+
+
+async def check_isolation(pipeline, clips: List[np.ndarray], args) -> bool:
+    """
+    Await good clips together with one undecodable input in the same batch.
+    """
+    async with AsyncQwenASRPipeline(pipeline, max_batch_size=len(clips) + 1, max_wait_ms=50.0) as frontend:
+        inputs = [(clip, TARGET_SAMPLE_RATE) for clip in clips]
+        inputs.insert(len(inputs) // 2, str(Path(args.bad_input)))
+        results = await frontend.atranscribe_batch(inputs, return_exceptions=True)
+        batches = frontend.coalescer.stats()["batches"]
+    failed = [i for i, result in enumerate(results) if isinstance(result, BaseException)]
+    ok = failed == [len(clips) // 2]
+    print(f"\nBad input among {len(inputs)} requests in {batches} batch(es): {len(failed)} failed await(s) "
+          f"-> {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure event-loop lag during blocking vs async transcription")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes to run (default: both)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="stub", help="Model backend (default: stub)")
+    parser.add_argument("--model-path", type=str, default=None, help="Weights for the qwen backend")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent client coroutines (default: 16)")
+    parser.add_argument("--requests", type=int, default=4, help="Requests per client (default: 4)")
+    parser.add_argument("--clip-seconds", type=float, default=4.0, help="Length of each clip (default: 4)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Max requests per model batch (default: 16)")
+    parser.add_argument("--max-wait-ms", type=float, default=10.0, help="Coalescing window (default: 10)")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Semaphore limit for the async mode")
+    parser.add_argument("--tick-ms", type=float, default=5.0, help="Heartbeat interval (default: 5)")
+    parser.add_argument(
+        "--bad-input", type=str, default="missing-audio.wav",
+        help="Undecodable input used for the isolation check (default: a missing file)"
+    )
+    args = parser.parse_args()
+    
+    logging.getLogger("src.inference").setLevel(logging.WARNING)
+    pipeline = create_pipeline(args.backend, args.batch_size, args.model_path)
+    clips = [
+        synthesize(ClipSpec(f"clip{i}", "speech", args.clip_seconds, TARGET_SAMPLE_RATE, 1, "wav", i))[:, 0]
+        for i in range(8)
+    ]
+    pipeline.transcribe_numpy(clips[0], TARGET_SAMPLE_RATE)
+    
+    print(f"{args.clients} clients x {args.requests} requests of {args.clip_seconds:.0f}s audio, "
+          f"heartbeat every {args.tick_ms:.0f}ms")
+    print(f"{'mode':<10} {'req/s':>8} {'req p50':>9} {'req p99':>9} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}")
+    for mode in args.modes:
+        result = asyncio.run(run_mode(mode, pipeline, clips, args))
+        request, lag = result["request_latency_ms"], result["loop_lag_ms"]
+        print(f"{mode:<10} {result['requests_per_s']:8.1f} {request['p50']:7.1f}ms {request['p99']:7.1f}ms "
+              f"{lag.get('p50', 0.0):7.1f}ms {lag.get('p99', 0.0):7.1f}ms {lag.get('max', 0.0):7.1f}ms"
+              + (f"  (mean batch {result['mean_batch_size']:.1f})" if "mean_batch_size" in result else ""))
+        
+    logging.getLogger("src.server").setLevel(logging.CRITICAL)
+    logging.getLogger("src.inference").setLevel(logging.CRITICAL)
+    if not asyncio.run(check_isolation(pipeline, clips, args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: audio front-end (decode, downmix, resample to 16 kHz) CPU time and allocations.
+
+Compares the previous path, which read float64 samples, downmixed with
+mean(axis=1), designed the resampling filter on every call and resampled
+each overlapping streaming window on its own, with src/audio.py: float32
+decode and downmix, a per-ratio cached filter, and a stateful
+StreamingResampler that filters each streamed sample once.
+
+Reports CPU seconds (process time, best of --repeats) and peak traced
+allocation per clip for a whole-file load and for overlapping-window
+streaming, at each input sample rate.
+
+Usage:
+    python benchmarks/bench_frontend.py
+    python benchmarks/bench_frontend.py --rates 8000 48000 --seconds 120
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from math import gcd
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.corpus import ClipSpec, synthesize
+from src.audio import TARGET_SAMPLE_RATE, StreamingResampler, load_audio, resample
+
+
+def baseline_load(path: str) -> np.ndarray:
+    audio, sampling_rate = sf.read(path)
+    if len(audio.shape) > 1:
+        audio = audio.mean(axis=1)
+    divisor = gcd(sampling_rate, TARGET_SAMPLE_RATE)
+    return resample_poly(
+        audio, TARGET_SAMPLE_RATE // divisor, sampling_rate // divisor
+    ).astype(np.float32, copy=False)
+
+
+def baseline_stream(audio: np.ndarray, sampling_rate: int, window_s: float, hop_s: float) -> int:
+    window, hop = int(window_s * sampling_rate), int(hop_s * sampling_rate)
+    buffer = np.zeros(0, dtype=np.float32)
+    produced = 0
+    for offset in range(0, len(audio), hop):
+        buffer = np.concatenate([buffer, audio[offset:offset + hop]])
+        while len(buffer) >= window:
+            divisor = gcd(sampling_rate, TARGET_SAMPLE_RATE)
+            produced += len(resample_poly(
+                buffer[:window], TARGET_SAMPLE_RATE // divisor, sampling_rate // divisor
+            ).astype(np.float32))
+            buffer = buffer[hop:]
+    return produced
+
+
+def frontend_stream(audio: np.ndarray, sampling_rate: int, window_s: float, hop_s: float) -> int:
+    resampler = StreamingResampler(sampling_rate, TARGET_SAMPLE_RATE)
+    window, hop = int(window_s * TARGET_SAMPLE_RATE), int(hop_s * TARGET_SAMPLE_RATE)
+    buffer = np.zeros(0, dtype=np.float32)
+    produced = 0
+    for offset in range(0, len(audio), int(hop_s * sampling_rate)):
+        buffer = np.concatenate([buffer, resampler.process(audio[offset:offset + int(hop_s * sampling_rate)])])
+        while len(buffer) >= window:
+            produced += window
+            buffer = buffer[hop:]
+    return produced + len(resampler.flush())
+
+
+def measure(function: Callable, repeats: int) -> tuple:
+    cpu_times = []
+    for _ in range(repeats):
+        start = time.process_time()
+        function()
+        cpu_times.append(time.process_time() - start)
+        
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(cpu_times), peak / (1024.0 * 1024.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the audio front-end with the previous decode/resample path")
+    parser.add_argument("--rates", nargs="+", type=int, default=[8000, 44100, 48000], help="Input sample rates")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Clip length (default: 60)")
+    parser.add_argument("--channels", type=int, default=2, help="Channels in the test files (default: 2)")
+    parser.add_argument("--window-seconds", type=float, default=5.0, help="Streaming window (default: 5)")
+    parser.add_argument("--hop-seconds", type=float, default=2.5, help="Streaming hop (default: 2.5)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+    
+    # Warm up lazy imports and the filter cache outside the measurements
+    resample(np.zeros(1000, dtype=np.float32), 48000)
+    
+    print(f"{args.seconds:.0f}s clips, {args.channels} channels; streaming {args.window_seconds}s windows every {args.hop_seconds}s")
+    print(f"{'rate':>6} {'path':<10} {'load CPU':>9} {'load peak':>10} {'stream CPU':>11} {'stream peak':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rate in args.rates:
+            spec = ClipSpec(f"clip{rate}", "speech", args.seconds, rate, args.channels, "wav", rate)
+            audio = synthesize(spec)
+            path = str(Path(tmp_dir) / f"{spec.name}.wav")
+            sf.write(path, audio, rate, subtype="PCM_16")
+            mono = audio.mean(axis=1, dtype=np.float32)
+            
+            rows = {
+                "previous": (
+                    lambda: baseline_load(path),
+                    lambda: baseline_stream(mono, rate, args.window_seconds, args.hop_seconds),
+                ),
+                "front-end": (
+                    lambda: load_audio(path),
+                    lambda: frontend_stream(mono, rate, args.window_seconds, args.hop_seconds),
+                ),
+            }
+            for name, (load, stream) in rows.items():
+                load_cpu, load_peak = measure(load, args.repeats)
+                stream_cpu, stream_peak = measure(stream, args.repeats)
+                print(f"{rate:>6} {name:<10} {1000 * load_cpu:7.1f}ms {load_peak:8.1f}MB "
+                      f"{1000 * stream_cpu:9.1f}ms {stream_peak:10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
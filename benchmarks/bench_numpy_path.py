@@ -0,0 +1,120 @@
+"""
+Benchmark: in-memory transcribe_numpy vs. the legacy temp-WAV round-trip.
+
+Feeds identical 5-second chunks (the VoiceNotesApp default) through both
+paths and reports per-chunk latency and read/write syscall counts taken
+from /proc/self/io. By default a stub model is used so the numbers isolate
+the I/O overhead; pass --model to run against the real Qwen3-ASR weights.
+
+Usage:
+    python benchmarks/bench_numpy_path.py
+    python benchmarks/bench_numpy_path.py --chunks 50 --model Qwen/Qwen3-ASR-0.6B
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.backends import StubASRModel
+from src.inference import QwenASRPipeline
+
+
+def legacy_transcribe_numpy(pipeline: QwenASRPipeline, audio_array: np.ndarray, sampling_rate: int) -> str:
+    """
+    The previous implementation: write a temp WAV, let the model decode it, unlink.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+    if audio_array.dtype == np.int16:
+        audio_array = audio_array.astype(np.float32) / 32768.0
+    sf.write(tmp_path, audio_array, sampling_rate)
+    try:
+        return pipeline.model.transcribe(audio=tmp_path, language=None)[0].text
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+def read_syscall_counters() -> tuple:
+    """
+    Return (read syscalls, write syscalls) for this process, or (0, 0) if unavailable.
+    """
+    try:
+        fields = dict(
+            line.split(": ") for line in Path("/proc/self/io").read_text().splitlines()
+        )
+        return int(fields["syscr"]), int(fields["syscw"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def run(label: str, fn, chunks: list) -> dict:
+    latencies = []
+    syscr0, syscw0 = read_syscall_counters()
+    for chunk in chunks:
+        start = time.perf_counter()
+        fn(chunk)
+        latencies.append(time.perf_counter() - start)
+    syscr1, syscw1 = read_syscall_counters()
+    
+    latencies_ms = np.array(latencies) * 1000.0
+    stats = {
+        "label": label,
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "read_syscalls_per_chunk": (syscr1 - syscr0) / len(chunks),
+        "write_syscalls_per_chunk": (syscw1 - syscw0) / len(chunks),
+    }
+    print(
+        f"{label:<12} mean={stats['mean_ms']:.3f}ms p50={stats['p50_ms']:.3f}ms "
+        f"p95={stats['p95_ms']:.3f}ms syscr/chunk={stats['read_syscalls_per_chunk']:.1f} "
+        f"syscw/chunk={stats['write_syscalls_per_chunk']:.1f}"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcribe_numpy against the temp-file path")
+    parser.add_argument("--chunks", type=int, default=200, help="Number of chunks per path (default: 200)")
+    parser.add_argument("--chunk-duration", type=float, default=5.0, help="Chunk length in seconds (default: 5.0)")
+    parser.add_argument("--dtype", choices=["float32", "int16"], default="float32", help="Chunk sample format")
+    parser.add_argument("--model", type=str, default=None, help="Load this model instead of the stub")
+    args = parser.parse_args()
+    
+    logging.getLogger("src.inference").setLevel(logging.WARNING)
+    
+    if args.model:
+        pipeline = QwenASRPipeline(model_name=args.model)
+    else:
+        pipeline = QwenASRPipeline(device="cpu", model=StubASRModel(passes=0, report="samples"))
+        
+    sampling_rate = 16000
+    rng = np.random.default_rng(0)
+    num_samples = int(args.chunk_duration * sampling_rate)
+    chunks = []
+    for _ in range(args.chunks):
+        chunk = (rng.standard_normal(num_samples) * 0.1).astype(np.float32)
+        if args.dtype == "int16":
+            chunk = (chunk * 32767).astype(np.int16)
+        chunks.append(chunk)
+        
+    print(f"{args.chunks} chunks x {args.chunk_duration}s @ {sampling_rate}Hz ({args.dtype})")
+    legacy = run("temp-file", lambda c: legacy_transcribe_numpy(pipeline, c, sampling_rate), chunks)
+    in_memory = run("in-memory", lambda c: pipeline.transcribe_numpy(c, sampling_rate), chunks)
+    
+    saved_ms = legacy["mean_ms"] - in_memory["mean_ms"]
+    saved_syscalls = (
+        legacy["read_syscalls_per_chunk"] + legacy["write_syscalls_per_chunk"]
+        - in_memory["read_syscalls_per_chunk"] - in_memory["write_syscalls_per_chunk"]
+    )
+    print(f"\nSaved per chunk: {saved_ms:.3f}ms, {saved_syscalls:.1f} read/write syscalls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: fp32 vs bf16 vs int8-dynamic weights on CPU.
+
+Transcribes a fixed set of recordings with each precision (each in a fresh
+process) and reports load time, weight memory, peak RSS, throughput and
+word error rate. WER is measured against the fp32 transcripts (how much the
+reduced precision changes the output) and, when a manifest with reference
+transcripts is given, against the references.
+
+This needs the real model and real speech, so there is no stub mode.
+
+Manifest format: one "<audio path>\t<reference transcript>" per line.
+
+Usage:
+    python benchmarks/bench_precision.py --audio-dir data
+    python benchmarks/bench_precision.py --manifest eval/references.tsv --output precision.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.run_suite import peak_rss_mb
+from src.inference import QwenASRPipeline, probe_duration
+from src.precision import PRECISIONS
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+
+
+def normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(references: List[str], hypotheses: List[str]) -> float:
+    """
+    Corpus-level WER: total word edits divided by total reference words.
+    """
+    edits = 0
+    words = 0
+    for reference, hypothesis in zip(references, hypotheses):
+        ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+        previous = list(range(len(hyp) + 1))
+        for i, ref_word in enumerate(ref, start=1):
+            current = [i] + [0] * len(hyp)
+            for j, hyp_word in enumerate(hyp, start=1):
+                current[j] = min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            previous = current
+        edits += previous[-1]
+        words += len(ref)
+    return edits / words if words else 0.0
+
+
+def run_precision(precision: str, paths: List[str], model_path: str, batch_size: int) -> dict:
+    logging.getLogger("src.inference").setLevel(logging.WARNING)
+    
+    start = time.perf_counter()
+    pipeline = QwenASRPipeline(
+        model_name=model_path,
+        device="cpu",
+        max_inference_batch_size=batch_size,
+        precision=precision,
+    )
+    load_s = time.perf_counter() - start
+    
+    pipeline.transcribe(paths[0])
+    start = time.perf_counter()
+    texts = pipeline.transcribe_batch(paths, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "load_s": load_s,
+        "weights_mb": pipeline.memory_footprint_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "wall_s": elapsed,
+        "texts": texts,
+    }
+
+
+def load_inputs(args) -> tuple:
+    if args.manifest:
+        paths, references = [], []
+        manifest = Path(args.manifest)
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                path, reference = line.rstrip("\n").split("\t", 1)
+                paths.append(str(manifest.parent / path))
+                references.append(reference)
+        return paths, references
+        
+    audio_dir = Path(args.audio_dir)
+    paths = sorted(str(p) for p in audio_dir.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+    return paths, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32, bf16 and int8-dynamic CPU inference")
+    parser.add_argument("--audio-dir", type=str, default="data", help="Recordings to transcribe (default: data)")
+    parser.add_argument("--manifest", type=str, default=None, help="TSV of audio path and reference transcript")
+    parser.add_argument("--precisions", nargs="+", choices=PRECISIONS, default=list(PRECISIONS), help="Precisions to compare (default: all)")
+    parser.add_argument("--model-path", type=str, default="Qwen/Qwen3-ASR-0.6B", help="Model identifier or local path")
+    parser.add_argument("--batch-size", type=int, default=8, help="Files per model batch (default: 8)")
+    parser.add_argument("--output", type=str, default=None, help="Also write the results as JSON here")
+    args = parser.parse_args()
+    
+    paths, references = load_inputs(args)
+    if not paths:
+        sys.exit("No audio files found (pass --audio-dir or --manifest)")
+    audio_seconds = sum(probe_duration(p) for p in paths)
+    print(f"Corpus: {len(paths)} files, {audio_seconds:.0f}s audio")
+    
+    precisions = ["fp32"] + [p for p in args.precisions if p != "fp32"]
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    for precision in precisions:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            results[precision] = executor.submit(
+                run_precision, precision, paths, args.model_path, args.batch_size
+            ).result()
+        
+    baseline = results["fp32"]["texts"]
+    print(f"\n{'precision':<14} {'load':>7} {'weights':>9} {'peak RSS':>9} {'RTF':>7} {'speedup':>8} {'WER vs fp32':>12}"
+          + (f" {'WER':>7}" if references else ""))
+    for precision, result in results.items():
+        result["realtime_factor"] = audio_seconds / result["wall_s"]
+        result["speedup"] = results["fp32"]["wall_s"] / result["wall_s"]
+        result["wer_vs_fp32"] = word_error_rate(baseline, result["texts"])
+        if references:
+            result["wer"] = word_error_rate(references, result["texts"])
+        weights = result["weights_mb"] or 0.0
+        print(f"{precision:<14} {result['load_s']:6.1f}s {weights:7.0f}MB {result['peak_rss_mb']:7.0f}MB "
+              f"{result['realtime_factor']:6.1f}x {result['speedup']:7.2f}x {100.0 * result['wer_vs_fp32']:11.2f}%"
+              + (f" {100.0 * result['wer']:6.2f}%" if references else ""))
+        
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"files": paths, "audio_seconds": audio_seconds, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: request coalescing in the ASR server.
+
+Starts an in-process ASRServer around a stub model whose batch latency is
+a fixed overhead plus a per-item cost (the shape of a real GPU forward
+pass), fires concurrent clients at it and reports, for each max-wait
+setting, throughput, mean batch size, queue wait and end-to-end latency.
+
+Usage:
+    python benchmarks/bench_server_coalescing.py
+    python benchmarks/bench_server_coalescing.py --clients 32 --waits 0 10 50
+"""
+import argparse
+import io
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.backends import StubASRModel
+from src.inference import QwenASRPipeline
+from src.server import ASRClient, ASRServer
+
+
+def run_setting(args, max_wait_ms: float, payload: bytes) -> dict:
+    model = StubASRModel(passes=0, overhead_ms=args.overhead_ms, per_item_ms=args.per_item_ms)
+    pipeline = QwenASRPipeline(device="cpu", max_inference_batch_size=args.max_batch_size, model=model)
+    server = ASRServer(pipeline, port=0, max_batch_size=args.max_batch_size, max_wait_ms=max_wait_ms)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    client = ASRClient(server.url)
+    latencies = []
+    lock = threading.Lock()
+    
+    def send(_):
+        start = time.perf_counter()
+        client.transcribe(payload)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+        
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        list(executor.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    
+    stats = client.stats()
+    server.shutdown()
+    thread.join()
+    
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        "max_wait_ms": max_wait_ms,
+        "throughput_rps": args.requests / elapsed,
+        "mean_batch_size": stats["mean_batch_size"],
+        "queue_wait_p50_ms": stats["queue_wait_p50_ms"],
+        "latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "latency_p95_ms": float(np.percentile(latencies_ms, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queueing latency vs batch efficiency")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests per setting (default: 200)")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--max-batch-size", type=int, default=16, help="Server max batch size (default: 16)")
+    parser.add_argument("--waits", type=float, nargs="+", default=[0.0, 5.0, 20.0, 50.0], help="max-wait settings in ms")
+    parser.add_argument("--overhead-ms", type=float, default=40.0, help="Stub fixed cost per batch (default: 40)")
+    parser.add_argument("--per-item-ms", type=float, default=5.0, help="Stub cost per batch item (default: 5)")
+    args = parser.parse_args()
+    
+    logging.getLogger("src").setLevel(logging.WARNING)
+    logging.getLogger("src.inference").setLevel(logging.WARNING)
+    
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(16000 * 2, dtype=np.float32), 16000, format="WAV")
+    payload = buffer.getvalue()
+    
+    print(f"{args.requests} requests, {args.clients} clients, stub cost "
+          f"{args.overhead_ms}ms + {args.per_item_ms}ms/item")
+    for max_wait_ms in args.waits:
+        r = run_setting(args, max_wait_ms, payload)
+        print(f"max_wait={r['max_wait_ms']:>5.1f}ms  throughput={r['throughput_rps']:7.1f} req/s  "
+              f"batch={r['mean_batch_size']:5.2f}  queue_p50={r['queue_wait_p50_ms']:6.1f}ms  "
+              f"latency_p50={r['latency_p50_ms']:6.1f}ms  p95={r['latency_p95_ms']:6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: CLI startup cost.
+
+Runs cli.py in fresh interpreters and reports, separately:
+
+- time to argument validation: ``--help`` and a missing-file error, which
+  must not pay for torch/qwen_asr imports
+- the heaviest imports on that path, from ``python -X importtime``
+- time to first transcription (only with --audio, since it loads the model)
+
+Pass --max-validation-seconds to turn the first measurement into a check
+that exits non-zero when startup regresses (e.g. in CI).
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --max-validation-seconds 1.5
+    python benchmarks/bench_startup.py --audio data/sample_audio.flac
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = str(REPO_ROOT / "cli.py")
+HEAVY_MODULES = ("torch", "torchaudio", "qwen_asr", "transformers", "librosa")
+
+
+def time_command(argv: list, repeats: int) -> tuple:
+    """
+    Return (median wall seconds, last completed process) over ``repeats`` runs.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        process = subprocess.run(argv, cwd=REPO_ROOT, capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), process
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Return (cumulative microseconds, module, nesting depth) for every import, largest first.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(module) - len(module.lstrip(" ")) - 1) // 2
+        entries.append((int(cumulative), module.strip(), depth))
+    return sorted(entries, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cli.py startup time")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--audio", type=str, default=None, help="Also time a full transcription of this file")
+    parser.add_argument("--max-validation-seconds", type=float, default=None,
+                        help="Fail if argument validation takes longer than this")
+    args = parser.parse_args()
+    
+    help_seconds, _ = time_command([sys.executable, CLI, "--help"], args.repeats)
+    missing_seconds, process = time_command(
+        [sys.executable, CLI, "--audio", str(REPO_ROOT / "does_not_exist.wav")], args.repeats
+    )
+    if process.returncode == 0:
+        print("warning: missing-file run exited 0")
+        
+    importtime = subprocess.run(
+        [sys.executable, "-X", "importtime", CLI, "--help"], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    imports = parse_importtime(importtime.stderr)
+    heavy = sorted({module.split(".")[0] for _, module, _ in imports if module.split(".")[0] in HEAVY_MODULES})
+    top_level = [(cumulative, module) for cumulative, module, depth in imports if depth == 0]
+    
+    print(f"time to --help:               {help_seconds * 1000:8.1f} ms")
+    print(f"time to missing-file error:   {missing_seconds * 1000:8.1f} ms")
+    print("heaviest imports on the validation path:")
+    for cumulative_us, module in top_level[:8]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+    if heavy:
+        print(f"heavy modules imported before validation: {', '.join(heavy)}")
+        
+    if args.audio:
+        with tempfile.TemporaryDirectory() as output_dir:
+            transcribe_seconds, process = time_command(
+                [sys.executable, CLI, "--audio", args.audio, "--output-dir", output_dir], 1
+            )
+        status = "ok" if process.returncode == 0 else f"failed (exit {process.returncode})"
+        print(f"time to first transcription:  {transcribe_seconds * 1000:8.1f} ms  [{status}]")
+        
+    validation_seconds = max(help_seconds, missing_seconds)
+    if args.max_validation_seconds is not None and (
+        validation_seconds > args.max_validation_seconds or heavy
+    ):
+        print(f"FAIL: validation path took {validation_seconds:.2f}s "
+              f"(budget {args.max_validation_seconds:.2f}s) or imported heavy modules")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare two benchmark suite result files (see run_suite.py).
+
+Prints each scenario's key metrics side by side with the relative change
+and exits with status 1 if any metric regressed by more than --threshold
+percent, so it can gate CI.
+
+Usage:
+    python benchmarks/compare_results.py benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+import argparse
+import json
+import sys
+
+# (label, path into a scenario result, True if higher is better)
+METRICS = (
+    ("files/s", ("files_per_s",), True),
+    ("RTF", ("realtime_factor",), True),
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p95 ms", ("latency_ms", "p95"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+    ("peak RSS MB", ("peak_rss_mb",), False),
+)
+
+
+def lookup(result: dict, path: tuple):
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite results")
+    parser.add_argument("baseline", type=str, help="Baseline result JSON")
+    parser.add_argument("candidate", type=str, help="Candidate result JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent (default: 10)")
+    args = parser.parse_args()
+    
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+        
+    print(f"baseline:  {baseline['meta']['revision']} ({baseline['meta']['backend']})")
+    print(f"candidate: {candidate['meta']['revision']} ({candidate['meta']['backend']})")
+    if baseline["config"] != candidate["config"]:
+        print("warning: runs used different configurations; numbers may not be comparable")
+        
+    regressions = []
+    for scenario, base_result in baseline["scenarios"].items():
+        new_result = candidate["scenarios"].get(scenario)
+        if new_result is None:
+            continue
+        print(f"\n{scenario}")
+        for label, path, higher_is_better in METRICS:
+            old, new = lookup(base_result, path), lookup(new_result, path)
+            if old is None or new is None:
+                continue
+            change = 100.0 * (new - old) / old if old else 0.0
+            regressed = (-change if higher_is_better else change) > args.threshold
+            marker = "  REGRESSION" if regressed else ""
+            print(f"  {label:<12} {old:12.2f} -> {new:12.2f}  ({change:+6.1f}%){marker}")
+            if regressed:
+                regressions.append(f"{scenario} {label}")
+        
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Deterministic synthetic audio corpus for the benchmark suite.
+
+Every clip is derived from (seed, index) only, so two runs with the same
+arguments produce byte-identical files and results can be compared across
+commits. Clips cycle through signal kinds (tone, noise, speech-like),
+durations, sample rates, channel counts and container formats.
+
+Usage:
+    python benchmarks/corpus.py ./corpus --files 48
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+import soundfile as sf
+
+KINDS = ("tone", "noise", "speech")
+DURATIONS = (1.0, 4.0, 12.0, 30.0)
+SAMPLE_RATES = (8000, 16000, 44100, 48000)
+CHANNELS = (1, 2)
+FORMATS = ("wav", "flac")
+
+
+@dataclass
+class ClipSpec:
+    """
+    Description of one synthetic clip.
+    """
+    name: str
+    kind: str
+    duration: float
+    sample_rate: int
+    channels: int
+    format: str
+    seed: int
+
+
+def plan_corpus(
+    num_files: int,
+    seed: int = 0,
+    kinds: Sequence[str] = KINDS,
+    durations: Sequence[float] = DURATIONS,
+    sample_rates: Sequence[int] = SAMPLE_RATES,
+    channels: Sequence[int] = CHANNELS,
+    formats: Sequence[str] = FORMATS
+) -> List[ClipSpec]:
+    """
+    Choose the parameters of every clip.
+    
+    Each axis is cycled with a different stride so small corpora still cover
+    every kind, duration, rate and channel count.
+    """
+    specs = []
+    for i in range(num_files):
+        kind = kinds[i % len(kinds)]
+        duration = durations[(i // len(kinds)) % len(durations)]
+        sample_rate = sample_rates[(i * 3 + i // len(sample_rates)) % len(sample_rates)]
+        num_channels = channels[(i // 2) % len(channels)]
+        fmt = formats[(i // 5) % len(formats)]
+        specs.append(ClipSpec(
+            name=f"{i:04d}_{kind}_{duration:g}s_{sample_rate}hz_{num_channels}ch.{fmt}",
+            kind=kind,
+            duration=duration,
+            sample_rate=sample_rate,
+            channels=num_channels,
+            format=fmt,
+            seed=seed * 1000003 + i,
+        ))
+    return specs
+
+
+def speech_like(num_samples: int, sample_rate: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Harmonic voiced "syllables" with a wandering pitch, separated by pauses.
+    
+    Not intelligible, but it has the energy envelope, pitch range and
+    silence gaps that VAD, segmentation and the model front-end react to.
+    """
+    t = np.arange(num_samples) / sample_rate
+    f0 = rng.uniform(100.0, 220.0) * (1.0 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.5, 2.0) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    
+    voiced = np.zeros(num_samples)
+    for harmonic in range(1, 12):
+        if harmonic * f0.max() >= sample_rate / 2:
+            break
+        voiced += np.sin(harmonic * phase) / harmonic
+        
+    # ~4 syllables per second, with a longer pause roughly every two seconds
+    syllables = np.clip(np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi)), 0.0, None) ** 2
+    pauses = (np.sin(2 * np.pi * 0.5 * t + rng.uniform(0, np.pi)) > -0.6).astype(np.float64)
+    noise = rng.standard_normal(num_samples) * 0.003
+    return 0.3 * voiced * syllables * pauses + noise
+
+
+def synthesize(spec: ClipSpec) -> np.ndarray:
+    """
+    Render a clip as a (frames, channels) float32 array.
+    """
+    rng = np.random.default_rng(spec.seed)
+    num_samples = int(spec.duration * spec.sample_rate)
+    
+    if spec.kind == "tone":
+        t = np.arange(num_samples) / spec.sample_rate
+        mono = 0.3 * np.sin(2 * np.pi * rng.uniform(200.0, 2000.0) * t)
+    elif spec.kind == "noise":
+        mono = rng.standard_normal(num_samples) * 0.05
+    elif spec.kind == "speech":
+        mono = speech_like(num_samples, spec.sample_rate, rng)
+    else:
+        raise ValueError(f"Unknown clip kind: {spec.kind}")
+        
+    # Extra channels are attenuated copies, like a second microphone
+    audio = np.stack([mono * (1.0 - 0.2 * c) for c in range(spec.channels)], axis=1)
+    return audio.astype(np.float32)
+
+
+def build_corpus(directory: Path, specs: Sequence[ClipSpec]) -> List[str]:
+    """
+    Write every clip (skipping ones already present) plus a corpus.json manifest.
+    
+    Returns:
+        Clip paths in spec order
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for spec in specs:
+        path = directory / spec.name
+        if not path.exists():
+            sf.write(path, synthesize(spec), spec.sample_rate, subtype="PCM_16")
+        paths.append(str(path))
+        
+    with open(directory / "corpus.json", "w", encoding="utf-8") as f:
+        json.dump([asdict(spec) for spec in specs], f, indent=2)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark corpus")
+    parser.add_argument("directory", type=str, help="Output directory")
+    parser.add_argument("--files", type=int, default=48, help="Number of clips (default: 48)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed (default: 0)")
+    args = parser.parse_args()
+    
+    specs = plan_corpus(args.files, args.seed)
+    paths = build_corpus(Path(args.directory), specs)
+    total = sum(spec.duration for spec in specs)
+    print(f"Wrote {len(paths)} clips ({total:.0f}s audio) to {args.directory}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmark suite: single-file, batch, streaming and numpy paths on a synthetic corpus.
+
+Generates the deterministic corpus from benchmarks/corpus.py, then runs each
+scenario in a fresh process (so peak RSS is per scenario) against a
+pluggable backend (benchmarks/backends.py; the default stub runs offline on
+CPU). Reports throughput, latency percentiles, real-time factor (audio
+seconds per wall second), peak RSS and the pipeline's per-stage latencies,
+and writes everything to a JSON file keyed by the current commit. Compare
+two result files with benchmarks/compare_results.py.
+
+Usage:
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --scenarios batch numpy --files 96
+    python benchmarks/run_suite.py --backend qwen --model-path Qwen/Qwen3-ASR-0.6B
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from benchmarks.backends import BACKENDS, create_pipeline
+from benchmarks.corpus import build_corpus, plan_corpus
+from src.audio import TARGET_SAMPLE_RATE, load_audio, read_audio
+from src.metrics import MetricsRegistry
+from src.streaming import StreamingTranscriber
+
+SCENARIOS = ("single", "batch", "streaming", "numpy")
+
+
+def peak_rss_mb() -> float:
+    """
+    Return this process's peak resident set size in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def latency_summary(latencies: List[float]) -> dict:
+    latencies_ms = np.array(latencies) * 1000.0
+    if not latencies_ms.size:
+        return {}
+    return {
+        "mean": float(latencies_ms.mean()),
+        "p50": float(np.percentile(latencies_ms, 50)),
+        "p95": float(np.percentile(latencies_ms, 95)),
+        "p99": float(np.percentile(latencies_ms, 99)),
+        "max": float(latencies_ms.max()),
+    }
+
+
+def run_scenario(
+    scenario: str,
+    paths: List[str],
+    audio_seconds: float,
+    backend: str,
+    model_path: Optional[str],
+    batch_size: int,
+    decode_workers: int,
+    window_seconds: float,
+    hop_seconds: float
+) -> dict:
+    """
+    Run one scenario over the corpus and return its measurements.
+    
+    Executed in a child process; untimed preparation (model load, warm-up,
+    pre-decoding for the numpy path) happens before the clock starts.
+    """
+    for name in ("src.inference", "src.streaming"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+        
+    pipeline = create_pipeline(backend, batch_size, model_path)
+    # First call pays for lazy imports (scipy) and allocator growth
+    pipeline.transcribe(paths[0])
+    pipeline.metrics = MetricsRegistry()
+    baseline_rss = peak_rss_mb()
+    
+    latencies = []
+    requests = 0
+    
+    if scenario == "single":
+        start = time.perf_counter()
+        for path in paths:
+            call_start = time.perf_counter()
+            pipeline.transcribe(path)
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+        requests = len(paths)
+        
+    elif scenario == "batch":
+        start = time.perf_counter()
+        pipeline.transcribe_batch(paths, batch_size=batch_size, decode_workers=decode_workers)
+        elapsed = time.perf_counter() - start
+        latencies = pipeline.metrics.samples("model_forward")
+        requests = len(paths)
+        
+    elif scenario == "numpy":
+        waveforms = [load_audio(path) for path in paths]
+        start = time.perf_counter()
+        for waveform in waveforms:
+            call_start = time.perf_counter()
+            pipeline.transcribe_numpy(waveform, TARGET_SAMPLE_RATE)
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+        requests = len(paths)
+        
+    elif scenario == "streaming":
+        clips = [read_audio(path) for path in paths]
+        start = time.perf_counter()
+        for waveform, sampling_rate in clips:
+            streamer = StreamingTranscriber(
+                pipeline,
+                window_seconds=window_seconds,
+                hop_seconds=hop_seconds,
+                sampling_rate=sampling_rate,
+            )
+            hop_samples = int(hop_seconds * sampling_rate)
+            for offset in range(0, len(waveform), hop_samples):
+                call_start = time.perf_counter()
+                streamer.feed(waveform[offset:offset + hop_samples])
+                latencies.append(time.perf_counter() - call_start)
+            streamer.finish()
+        elapsed = time.perf_counter() - start
+        requests = len(latencies)
+        
+    else:
+        raise ValueError(f"Unknown scenario: {scenario}")
+        
+    return {
+        "unit": {"single": "file", "batch": "batch", "numpy": "clip", "streaming": "hop"}[scenario],
+        "requests": requests,
+        "wall_s": elapsed,
+        "files_per_s": len(paths) / elapsed if elapsed > 0 else 0.0,
+        "audio_seconds": audio_seconds,
+        "realtime_factor": audio_seconds / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": latency_summary(latencies),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": pipeline.metrics.snapshot()["stages"],
+    }
+
+
+def git_revision() -> str:
+    """
+    Return the short commit hash, suffixed with "-dirty" for uncommitted changes.
+    """
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on a synthetic corpus")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="stub", help="Model backend (default: stub)")
+    parser.add_argument("--model-path", type=str, default=None, help="Weights for the qwen backend")
+    parser.add_argument("--files", type=int, default=48, help="Number of synthetic clips (default: 48)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed (default: 0)")
+    parser.add_argument("--corpus-dir", type=str, default=None, help="Reuse/keep the corpus here (default: temporary)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Batch size for the batch scenario (default: 16)")
+    parser.add_argument("--decode-workers", type=int, default=2, help="Decode threads for the batch scenario (default: 2)")
+    parser.add_argument("--window-seconds", type=float, default=5.0, help="Streaming window (default: 5)")
+    parser.add_argument("--hop-seconds", type=float, default=2.5, help="Streaming hop (default: 2.5)")
+    parser.add_argument("--output", type=str, default=None, help="Result file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+    
+    revision = git_revision()
+    output = Path(args.output) if args.output else REPO_ROOT / "benchmarks" / "results" / f"{revision}.json"
+    
+    specs = plan_corpus(args.files, args.seed)
+    audio_seconds = sum(spec.duration for spec in specs)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = Path(args.corpus_dir) if args.corpus_dir else Path(tmp_dir)
+        paths = build_corpus(corpus_dir, specs)
+        print(f"Corpus: {len(paths)} clips, {audio_seconds:.0f}s audio, seed {args.seed}")
+        
+        scenarios = {}
+        spawn = multiprocessing.get_context("spawn")
+        for scenario in args.scenarios:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                result = executor.submit(
+                    run_scenario, scenario, paths, audio_seconds, args.backend, args.model_path,
+                    args.batch_size, args.decode_workers, args.window_seconds, args.hop_seconds
+                ).result()
+            scenarios[scenario] = result
+            latency = result["latency_ms"]
+            print(f"{scenario:<10} {result['files_per_s']:8.2f} files/s  RTF {result['realtime_factor']:8.1f}x  "
+                  f"p50 {latency.get('p50', 0.0):8.1f}ms  p95 {latency.get('p95', 0.0):8.1f}ms  "
+                  f"p99 {latency.get('p99', 0.0):8.1f}ms  per {result['unit']:<5}  peak RSS {result['peak_rss_mb']:.0f}MB")
+        
+    report = {
+        "meta": {
+            "revision": revision,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "backend": args.backend,
+            "model_path": args.model_path,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "config": {
+            "files": args.files,
+            "seed": args.seed,
+            "audio_seconds": audio_seconds,
+            "batch_size": args.batch_size,
+            "decode_workers": args.decode_workers,
+            "window_seconds": args.window_seconds,
+            "hop_seconds": args.hop_seconds,
+        },
+        "scenarios": scenarios,
+    }
+    
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,382 @@
 import argparse
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import torch
-import torchaudio
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stdout)
 logger = logging.getLogger(__name__)
 
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-from inference import QwenASRPipeline
+sys.path.insert(0, str(Path(__file__).parent))
+from src.inference import QwenASRPipeline
+from src.jobs import JobManifest, JobRunner, transcription_path
+from src.cache import TranscriptionCache
+from src.longform import format_transcript
+from src.metrics import MetricsRegistry
+from src.precision import PRECISIONS
+from src.result import as_result, results_to_jsonl
+from src.server import ASRClient
+from src.workers import WorkerPool
+
+AUDIO_EXTENSIONS = {'.wav', '.mp3', '.flac', '.ogg', '.m4a'}
+
+
+def collect_audio_files(args) -> list:
+    """
+    Resolve the audio files requested on the command line.
+    
+    Args:
+        args: Parsed command-line arguments
+        
+    Returns:
+        List of audio file paths, in processing order
+    """
+    if args.audio:
+        return [Path(args.audio)]
+    
+    if args.audio_dir:
+        audio_dir = Path(args.audio_dir)
+        if not audio_dir.is_dir():
+            raise FileNotFoundError(f"Audio directory not found: {args.audio_dir}")
+        return sorted(p for p in audio_dir.rglob('*') if p.suffix.lower() in AUDIO_EXTENSIONS)
+    
+    manifest_path = Path(args.manifest)
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Manifest not found: {args.manifest}")
+    audio_files = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            path = Path(line)
+            if not path.is_absolute():
+                path = manifest_path.parent / path
+            audio_files.append(path)
+    return audio_files
+
+
+def find_output_collisions(audio_files: list, output_dir: Path, input_root: str = None) -> dict:
+    """
+    Find input files that would overwrite each other's transcription.
+    
+    Args:
+        audio_files: Audio files to transcribe
+        output_dir: Directory to save transcription results
+        input_root: Directory whose layout is mirrored in ``output_dir``
+        
+    Returns:
+        Mapping of each contested output path to the inputs that share it
+    """
+    sources = {}
+    for audio_path in audio_files:
+        sources.setdefault(transcription_path(audio_path, output_dir, input_root), []).append(audio_path)
+    return {path: paths for path, paths in sources.items() if len(paths) > 1}
+
+
+def save_transcription(
+    output_dir: Path,
+    audio_path: Path,
+    transcription: str,
+    metrics: MetricsRegistry = None,
+    input_root: str = None
+) -> Path:
+    """
+    Write a transcription next to the others in the output directory.
+    
+    Args:
+        output_dir: Directory to save the transcription in
+        audio_path: Source audio file
+        transcription: Transcribed text
+        metrics: Optional registry to record the write as the ``output_write`` stage
+        input_root: Directory whose layout is mirrored in ``output_dir`` (--audio-dir)
+        
+    Returns:
+        Path of the written file
+    """
+    output_path = transcription_path(audio_path, output_dir, input_root)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    start_time = time.perf_counter()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(transcription)
+    if metrics is not None:
+        metrics.observe("output_write", time.perf_counter() - start_time)
+    return output_path
+
+
+def save_results(results_path: str, audio_files: list, transcriptions: list, spans: list = None):
+    """
+    Write the structured result of every file (language, duration, stage
+    timings, token count, truncation) as JSON lines.
+    
+    Args:
+        results_path: JSONL file to write
+        audio_files: Source audio files
+        transcriptions: Transcriptions returned for them, in the same order
+        spans: Optional (start, end) seconds of each transcription within
+               its file, for long-form segments
+    """
+    with open(results_path, 'w', encoding='utf-8') as f:
+        f.write(results_to_jsonl(transcriptions, [str(p) for p in audio_files], spans))
+    logger.info(f"Results written to {results_path}")
+    
+    truncated = [str(p) for p, t in zip(audio_files, transcriptions) if as_result(t).truncated]
+    if truncated:
+        logger.warning(f"{len(truncated)} transcriptions are still truncated at their token budget: {', '.join(truncated)}")
+
+
+def run_batch(
+    asr: QwenASRPipeline,
+    audio_files: list,
+    output_dir: Path,
+    batch_size: int,
+    max_batch_seconds: float = None,
+    decode_workers: int = 0,
+    prefetch_depth: int = None,
+    results_path: str = None,
+    input_root: str = None
+):
+    """
+    Transcribe many files in model batches and save one result per file.
+    
+    Args:
+        asr: Loaded ASR pipeline
+        audio_files: Audio files to transcribe
+        output_dir: Directory to save transcription results
+        batch_size: Number of files per model batch
+        max_batch_seconds: Optional padded-audio budget per batch (duration bucketing)
+        decode_workers: Threads decoding upcoming files while a batch is running
+        prefetch_depth: Maximum number of files decoded ahead of inference
+        results_path: Optional JSONL file for the structured results
+        input_root: Directory whose layout is mirrored in ``output_dir``
+    """
+    logger.info(f"Processing {len(audio_files)} audio files in batches of {batch_size}")
+    
+    start_time = time.perf_counter()
+    transcriptions = asr.transcribe_batch(
+        [str(p) for p in audio_files],
+        batch_size=batch_size,
+        max_batch_seconds=max_batch_seconds,
+        decode_workers=decode_workers,
+        prefetch_depth=prefetch_depth
+    )
+    elapsed = time.perf_counter() - start_time
+    
+    for audio_path, transcription in zip(audio_files, transcriptions):
+        save_transcription(output_dir, audio_path, transcription, asr.metrics, input_root)
+    if results_path:
+        save_results(results_path, audio_files, transcriptions)
+    
+    throughput = len(audio_files) / elapsed if elapsed > 0 else float('inf')
+    
+    print("\n" + "="*60)
+    print("BATCH TRANSCRIPTION RESULT")
+    print("="*60)
+    print(f"Files transcribed: {len(audio_files)}")
+    print(f"Elapsed time:      {elapsed:.2f}s")
+    print(f"Throughput:        {throughput:.2f} files/s")
+    print("="*60)
+    print(f"\n✓ Transcriptions saved to: {output_dir.absolute()}\n")
+    
+    logger.info("Batch transcription completed successfully")
+
+
+def run_job(asr, audio_files: list, output_dir: Path, args):
+    """
+    Transcribe files as a resumable job tracked in a sqlite manifest.
+    
+    Files finished by an earlier run with the same --job-db are skipped
+    unless their contents changed; failures are retried with backoff.
+    
+    Args:
+        asr: Loaded ASR pipeline or worker pool
+        audio_files: Audio files belonging to the job
+        output_dir: Directory to save transcription results
+        args: Parsed command-line arguments
+    """
+    manifest = JobManifest(args.job_db)
+    try:
+        added = manifest.add(audio_files)
+        if args.retry_failed:
+            logger.info(f"Reset {manifest.reset_failed()} failed files")
+        counts = manifest.counts()
+        logger.info(
+            f"Job manifest {args.job_db}: {added} new or changed, {counts['done']} done, "
+            f"{counts['pending']} pending, {counts['failed']} failed"
+        )
+        
+        runner = JobRunner(
+            asr,
+            manifest,
+            output_dir,
+            batch_size=args.batch_size,
+            max_attempts=args.max_attempts,
+            backoff_seconds=args.retry_backoff,
+            input_root=args.audio_dir,
+            max_batch_seconds=args.max_batch_seconds,
+            decode_workers=args.decode_workers,
+            prefetch_depth=args.prefetch_depth
+        )
+        counts = runner.run()
+        failures = manifest.failures()
+    finally:
+        manifest.close()
+    
+    print("\n" + "="*60)
+    print("JOB RESULT")
+    print("="*60)
+    print(f"Done:    {counts['done']}")
+    print(f"Failed:  {counts['failed']}")
+    print(f"Pending: {counts['pending']}")
+    for path, attempts, error in failures:
+        print(f"  {path} ({attempts} attempts): {error}")
+    print("="*60)
+    print(f"\n✓ Transcriptions saved to: {output_dir.absolute()}\n")
+    
+    if failures:
+        raise RuntimeError(f"{len(failures)} files failed; re-run to retry them")
+
+
+def run_long_form(
+    asr: QwenASRPipeline,
+    audio_files: list,
+    output_dir: Path,
+    segment_seconds: float,
+    batch_size: int,
+    results_path: str = None,
+    input_root: str = None
+):
+    """
+    Transcribe long recordings segment by segment with timestamps.
+    
+    Args:
+        asr: Loaded ASR pipeline
+        audio_files: Audio files to transcribe
+        output_dir: Directory to save transcription results
+        segment_seconds: Target segment length in seconds
+        batch_size: Number of segments per model batch
+        results_path: Optional JSONL file for the structured result of every segment
+        input_root: Directory whose layout is mirrored in ``output_dir``
+    """
+    all_segments = []
+    for audio_path in audio_files:
+        logger.info(f"Processing long-form audio file: {audio_path}")
+        segments = asr.transcribe_long(str(audio_path), segment_seconds=segment_seconds, batch_size=batch_size)
+        transcript = format_transcript(segments)
+        output_path = save_transcription(output_dir, audio_path, transcript, asr.metrics, input_root)
+        
+        print("\n" + "="*60)
+        print(f"TRANSCRIPTION RESULT ({len(segments)} segments)")
+        print("="*60)
+        print(transcript)
+        print("="*60)
+        print(f"\n✓ Transcription saved to: {output_path.absolute()}\n")
+        all_segments.extend((audio_path, segment) for segment in segments)
+    
+    if results_path:
+        save_results(
+            results_path,
+            [audio_path for audio_path, _ in all_segments],
+            [segment.text for _, segment in all_segments],
+            spans=[(segment.start, segment.end) for _, segment in all_segments]
+        )
+    logger.info("Long-form transcription completed successfully")
+
+
+def run_remote(
+    server_url: str,
+    audio_files: list,
+    output_dir: Path,
+    concurrency: int,
+    results_path: str = None,
+    input_root: str = None
+):
+    """
+    Send files to a running ASR server instead of loading the model locally.
+    
+    Requests are sent concurrently so the server can coalesce them into batches.
+    
+    Args:
+        server_url: Base URL of the server (e.g. http://127.0.0.1:8765)
+        audio_files: Audio files to transcribe
+        output_dir: Directory to save transcription results
+        concurrency: Maximum number of requests in flight
+        results_path: Optional JSONL file for the structured results
+        input_root: Directory whose layout is mirrored in ``output_dir``
+    """
+    client = ASRClient(server_url)
+    logger.info(f"Sending {len(audio_files)} audio files to {server_url}")
+    
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        transcriptions = list(executor.map(client.transcribe, audio_files))
+    elapsed = time.perf_counter() - start_time
+    
+    for audio_path, transcription in zip(audio_files, transcriptions):
+        output_path = save_transcription(output_dir, audio_path, transcription, input_root=input_root)
+    if results_path:
+        save_results(results_path, audio_files, transcriptions)
+    
+    print("\n" + "="*60)
+    print("TRANSCRIPTION RESULT")
+    print("="*60)
+    if len(audio_files) == 1:
+        print(transcriptions[0])
+    else:
+        print(f"Files transcribed: {len(audio_files)}")
+        print(f"Elapsed time:      {elapsed:.2f}s")
+    print("="*60)
+    print(f"\n✓ Transcription saved to: {(output_path if len(audio_files) == 1 else output_dir).absolute()}\n")
+    
+    logger.info("Transcription completed successfully")
+
+
+def run_worker_pool(args, audio_files: list, output_dir: Path):
+    """
+    Transcribe files in batch mode across several CPU worker processes.
+    
+    Args:
+        args: Parsed command-line arguments
+        audio_files: Audio files to transcribe
+        output_dir: Directory to save transcription results
+    """
+    pool = WorkerPool(
+        model_name=args.model_path,
+        num_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        max_inference_batch_size=args.batch_size,
+        max_new_tokens=args.max_new_tokens,
+        tokens_per_second=args.tokens_per_second or None,
+        resegment_depth=args.resegment_depth,
+        cache_path=args.cache,
+        cache_max_disk_bytes=int(args.cache_size_mb * 1024 * 1024),
+        precision=args.precision
+    )
+    try:
+        with pool:
+            if args.job_db:
+                run_job(pool, audio_files, output_dir, args)
+            else:
+                run_batch(
+                    pool,
+                    audio_files,
+                    output_dir,
+                    args.batch_size,
+                    max_batch_seconds=args.max_batch_seconds,
+                    decode_workers=args.decode_workers,
+                    prefetch_depth=args.prefetch_depth,
+                    results_path=args.results_jsonl,
+                    input_root=args.audio_dir
+                )
+    finally:
+        if pool.restarts:
+            logger.warning(f"{pool.restarts} worker(s) crashed and were restarted")
+        if args.metrics_out:
+            pool.metrics.write(args.metrics_out)
+            logger.info(f"Metrics written to {args.metrics_out}")
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -22,15 +388,36 @@ Examples:
   python cli.py --audio /path/to/your/audio.wav
   python cli.py --audio recording.mp3 --device cpu
   python cli.py --audio myaudio.wav --output-dir ./my_results
+  python cli.py --audio-dir ./recordings --batch-size 16
+  python cli.py --audio-dir ./recordings --max-batch-seconds 300
+  python cli.py --audio-dir ./recordings --decode-workers 4 --prefetch-depth 64
+  python cli.py --audio-dir ./recordings --workers 4 --device cpu
+  python cli.py --audio-dir ./recordings --device cpu --precision int8-dynamic
+  python cli.py --audio recording.mp3 --cache ~/.cache/asr/transcriptions.sqlite
+  python cli.py --audio-dir ./recordings --metrics-out metrics.prom
+  python cli.py --audio-dir ./recordings --job-db backfill.sqlite --output-dir ./my_results
+  python cli.py --audio meeting.flac --long-form --segment-seconds 30
+  python cli.py --audio-dir ./recordings --server http://127.0.0.1:8765
+  python cli.py --manifest files.txt --output-dir ./my_results
         '''
     )
     
-    parser.add_argument(
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
         '--audio',
         type=str,
-        required=True,
         help='Path to audio file (supports WAV, MP3, FLAC, etc.)'
     )
+    input_group.add_argument(
+        '--audio-dir',
+        type=str,
+        help='Directory to transcribe recursively in batches; outputs mirror its subdirectories'
+    )
+    input_group.add_argument(
+        '--manifest',
+        type=str,
+        help='Text file listing one audio path per line to transcribe in batches'
+    )
     
     parser.add_argument(
         '--device',
@@ -47,6 +434,35 @@ Examples:
         help='HuggingFace model identifier or local path (default: Qwen/Qwen3-ASR-0.6B)'
     )
     
+    parser.add_argument(
+        '--max-new-tokens',
+        type=int,
+        default=256,
+        help='Most tokens generated per model call, the ceiling of the adaptive budget (default: 256)'
+    )
+    
+    parser.add_argument(
+        '--tokens-per-second',
+        type=float,
+        default=10.0,
+        help='Token budget per second of audio in each batch, floor 32; 0 always allows --max-new-tokens (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--resegment-depth',
+        type=int,
+        default=1,
+        help='Times a transcription that fills its token budget is split at a pause and retried (default: 1, 0 disables)'
+    )
+    
+    parser.add_argument(
+        '--precision',
+        type=str,
+        default=None,
+        choices=PRECISIONS,
+        help='Weight format of the linear layers (default: bf16 on CUDA, fp32 on CPU; int8-dynamic is CPU only)'
+    )
+    
     parser.add_argument(
         '--output-dir',
         type=str,
@@ -54,36 +470,241 @@ Examples:
         help='Directory to save transcription results (default: ./results)'
     )
     
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=32,
+        help='Number of files per model batch in --audio-dir/--manifest mode (default: 32)'
+    )
+    
+    parser.add_argument(
+        '--max-batch-seconds',
+        type=float,
+        default=None,
+        help='Bucket files by duration and cap each batch at this many padded audio seconds'
+    )
+    
+    parser.add_argument(
+        '--decode-workers',
+        type=int,
+        default=0,
+        help='Threads that decode and resample upcoming files during inference (default: 0, disabled)'
+    )
+    
+    parser.add_argument(
+        '--prefetch-depth',
+        type=int,
+        default=None,
+        help='Maximum number of files decoded ahead of inference (default: two batches)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='CPU worker processes for --audio-dir/--manifest, each with its own model (default: 1, in-process)'
+    )
+    
+    parser.add_argument(
+        '--threads-per-worker',
+        type=int,
+        default=None,
+        help='torch threads per worker process (default: CPU cores divided by --workers)'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        type=str,
+        default=None,
+        help='Path to a transcription cache database; repeated audio skips inference'
+    )
+    
+    parser.add_argument(
+        '--cache-size-mb',
+        type=float,
+        default=256,
+        help='Size budget of the transcription cache in MB (default: 256)'
+    )
+    
+    parser.add_argument(
+        '--job-db',
+        type=str,
+        default=None,
+        help='Track --audio-dir/--manifest progress in this sqlite database; re-runs skip finished files and retry failures'
+    )
+    
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=3,
+        help='Attempts per file before --job-db gives up on it (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--retry-backoff',
+        type=float,
+        default=5.0,
+        help='Seconds before the first retry of a failed file; doubles with each attempt (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Give files that used up their attempts in an earlier --job-db run another round'
+    )
+    
+    parser.add_argument(
+        '--long-form',
+        action='store_true',
+        help='Stream long recordings from disk, split them at silences and write timestamped segments'
+    )
+    
+    parser.add_argument(
+        '--segment-seconds',
+        type=float,
+        default=30.0,
+        help='Target segment length for --long-form (default: 30)'
+    )
+    
+    parser.add_argument(
+        '--results-jsonl',
+        type=str,
+        default=None,
+        help='Also write one JSON line per file (per segment with --long-form) with language, duration, '
+             'stage timings, token count and truncation'
+    )
+    
+    parser.add_argument(
+        '--metrics-out',
+        type=str,
+        default=None,
+        help='Write per-stage latency percentiles and real-time factor here (.prom for Prometheus text, otherwise JSON)'
+    )
+    
+    parser.add_argument(
+        '--server',
+        type=str,
+        default=None,
+        help='Send audio to a running ASR server (python -m src.server) at this URL instead of loading the model'
+    )
+    
     args = parser.parse_args()
     
-    audio_path = Path(args.audio)
-    if not audio_path.exists():
-        logger.error(f"Audio file not found: {args.audio}")
+    try:
+        audio_files = collect_audio_files(args)
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    
+    missing = [p for p in audio_files if not p.exists()]
+    if missing:
+        for p in missing:
+            logger.error(f"Audio file not found: {p}")
+        sys.exit(1)
+    if not audio_files:
+        logger.error("No audio files to transcribe")
         sys.exit(1)
     
     output_dir = Path(args.output_dir)
+    collisions = find_output_collisions(audio_files, output_dir, args.audio_dir)
+    if collisions:
+        for output_path, sources in collisions.items():
+            logger.error(f"{', '.join(str(p) for p in sources)} would all be written to {output_path}")
+        logger.error("Rename or move the inputs so each one gets its own transcription file")
+        sys.exit(1)
     output_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"Output directory: {output_dir.absolute()}")
     
-    if args.device == 'auto':
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    else:
-        device = args.device
+    if args.server:
+        try:
+            run_remote(args.server, audio_files, output_dir, args.batch_size, args.results_jsonl, args.audio_dir)
+        except Exception as e:
+            logger.error(f"Transcription failed: {str(e)}")
+            sys.exit(1)
+        return
+    
+    if args.job_db and (args.audio or args.long_form):
+        logger.warning("--job-db applies to --audio-dir/--manifest batch mode only; ignoring it")
+        args.job_db = None
+    if args.results_jsonl and args.job_db:
+        logger.warning("--results-jsonl is not supported with --job-db; ignoring it")
+
+    if args.workers > 1:
+        if args.audio or args.long_form:
+            logger.warning("--workers applies to --audio-dir/--manifest batch mode only; using one process")
+        elif args.device == 'cuda':
+            logger.error("--workers runs CPU worker processes; use --device cpu or auto")
+            sys.exit(1)
+        else:
+            try:
+                run_worker_pool(args, audio_files, output_dir)
+            except Exception as e:
+                logger.error(f"Transcription failed: {str(e)}")
+                sys.exit(1)
+            return
+    
+    device = None if args.device == 'auto' else args.device
     
     logger.info(f"Loading ASR model: {args.model_path}")
-    logger.info(f"Using device: {device}")
+    
+    cache = None
+    if args.cache:
+        cache = TranscriptionCache(args.cache, max_disk_bytes=int(args.cache_size_mb * 1024 * 1024))
+    
+    metrics = MetricsRegistry()
     
     try:
-        asr = QwenASRPipeline(model_name=args.model_path, device=device)
+        asr = QwenASRPipeline(
+            model_name=args.model_path,
+            device=device,
+            max_inference_batch_size=args.batch_size,
+            max_new_tokens=args.max_new_tokens,
+            tokens_per_second=args.tokens_per_second or None,
+            resegment_depth=args.resegment_depth,
+            cache=cache,
+            metrics=metrics,
+            precision=args.precision
+        )
+        logger.info(f"Using device: {asr.device}")
+        
+        if args.long_form:
+            run_long_form(
+                asr,
+                audio_files,
+                output_dir,
+                args.segment_seconds,
+                args.batch_size,
+                results_path=args.results_jsonl,
+                input_root=args.audio_dir
+            )
+            return
+        
+        if not args.audio and args.job_db:
+            run_job(asr, audio_files, output_dir, args)
+            return
+        
+        if not args.audio:
+            run_batch(
+                asr,
+                audio_files,
+                output_dir,
+                args.batch_size,
+                max_batch_seconds=args.max_batch_seconds,
+                decode_workers=args.decode_workers,
+                prefetch_depth=args.prefetch_depth,
+                results_path=args.results_jsonl,
+                input_root=args.audio_dir
+            )
+            return
+        
+        audio_path = audio_files[0]
         logger.info(f"Processing audio file: {audio_path}")
         
         transcription = asr.transcribe(str(audio_path))
         
-        output_filename = audio_path.stem + "_transcription.txt"
-        output_path = output_dir / output_filename
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(transcription)
+        output_path = save_transcription(output_dir, audio_path, transcription, asr.metrics)
+        if args.results_jsonl:
+            save_results(args.results_jsonl, [audio_path], [transcription])
         
         print("\n" + "="*60)
         print("TRANSCRIPTION RESULT")
@@ -98,6 +719,15 @@ Examples:
     except Exception as e:
         logger.error(f"Transcription failed: {str(e)}")
         sys.exit(1)
+    finally:
+        if cache is not None:
+            logger.info(f"Cache stats: {cache.stats()}")
+            cache.close()
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+            logger.info(f"Metrics written to {args.metrics_out}")
+
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,9 +3,9 @@ import time
 from pathlib import Path
 import urllib.request
 
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
 
-from inference import QwenASRPipeline
+from src.inference import QwenASRPipeline
 
 
 def download_sample_audio(url: str, save_path: Path) -> Path:
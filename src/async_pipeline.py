@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import logging
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.server import RequestCoalescer
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncQwenASRPipeline:
+    """
+    asyncio front-end for a ``QwenASRPipeline``.
+    
+    Inference never runs on the event loop: requests are handed to a
+    ``RequestCoalescer``, whose dedicated worker thread owns the pipeline and
+    combines requests awaited concurrently into one ``transcribe_batch``
+    call. Awaiting coroutines only wait on the wrapped future, so other
+    tasks keep running during a forward pass. A bad input only fails its
+    own await: when a coalesced batch raises, its requests are retried one
+    by one.
+    
+    Cancelling an ``atranscribe*`` call (directly or through its timeout)
+    removes the request if it has not reached the model yet; a request that
+    is already in a batch finishes and its result is discarded.
+    """
+    
+    def __init__(
+        self,
+        pipeline: Any,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Wrap a loaded pipeline.
+        
+        Args:
+            pipeline: Object exposing ``transcribe_batch`` (e.g. QwenASRPipeline)
+            max_batch_size: Maximum number of requests per model call
+            max_wait_ms: Longest time the first request of a batch waits for company
+            max_concurrency: Maximum requests queued or running at once; further
+                callers wait their turn (default: unlimited)
+            timeout: Default per-request timeout in seconds, including time
+                spent waiting for a concurrency slot (default: none)
+        """
+        self.pipeline = pipeline
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.coalescer = RequestCoalescer(pipeline, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._started = False
+    
+    @classmethod
+    async def create(
+        cls,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **pipeline_kwargs
+    ) -> "AsyncQwenASRPipeline":
+        """
+        Load a ``QwenASRPipeline`` off the event loop and wrap it.
+        
+        Args:
+            max_batch_size: Maximum number of requests per model call
+            max_wait_ms: Longest time the first request of a batch waits for company
+            max_concurrency: Maximum requests queued or running at once
+            timeout: Default per-request timeout in seconds
+            **pipeline_kwargs: Passed to ``QwenASRPipeline``
+            
+        Returns:
+            Started async pipeline
+        """
+        from src.inference import QwenASRPipeline
+        
+        loop = asyncio.get_running_loop()
+        pipeline = await loop.run_in_executor(None, functools.partial(QwenASRPipeline, **pipeline_kwargs))
+        return cls(pipeline, max_batch_size, max_wait_ms, max_concurrency, timeout).start()
+    
+    @property
+    def metrics(self):
+        """
+        The wrapped pipeline's ``MetricsRegistry`` (includes ``queue_wait``), if any.
+        """
+        return self.coalescer.metrics
+    
+    def start(self) -> "AsyncQwenASRPipeline":
+        """
+        Start the inference thread.
+        """
+        if not self._started:
+            self.coalescer.start()
+            self._started = True
+        return self
+    
+    async def aclose(self):
+        """
+        Finish queued requests and stop the inference thread without blocking the loop.
+        """
+        if self._started:
+            self._started = False
+            await asyncio.get_running_loop().run_in_executor(None, self.coalescer.stop)
+    
+    async def __aenter__(self) -> "AsyncQwenASRPipeline":
+        return self.start()
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def atranscribe(
+        self,
+        audio_path: str,
+        language: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Transcribe an audio file.
+        
+        Args:
+            audio_path: Path or URL of the audio file
+            language: Optional language hint; None auto-detects
+            timeout: Seconds before ``asyncio.TimeoutError`` (default: the pipeline's)
+            
+        Returns:
+            Transcribed text
+        """
+        return await self._submit(self._check_path(audio_path), language, timeout)
+    
+    async def atranscribe_numpy(
+        self,
+        audio_array: np.ndarray,
+        sampling_rate: int,
+        language: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Transcribe audio from a numpy array (mono, float32 or int16).
+        
+        Args:
+            audio_array: Audio samples
+            sampling_rate: Sample rate of the audio data
+            language: Optional language hint; None auto-detects
+            timeout: Seconds before ``asyncio.TimeoutError`` (default: the pipeline's)
+            
+        Returns:
+            Transcribed text
+        """
+        return await self._submit((audio_array, int(sampling_rate)), language, timeout)
+    
+    async def atranscribe_batch(
+        self,
+        paths_or_arrays: Sequence[Any],
+        languages: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[str, BaseException]]:
+        """
+        Transcribe several inputs concurrently; results come back in input order.
+        
+        Missing files are reported before anything is submitted, so they
+        never reach a coalesced batch.
+        
+        Args:
+            paths_or_arrays: File paths/URLs, ``(waveform, sampling_rate)`` pairs or 16 kHz waveforms
+            languages: One hint for all inputs, or one per input
+            timeout: Per-input timeout in seconds (default: the pipeline's)
+            return_exceptions: Return the error of a failed input in its
+                              place instead of raising it, keeping the
+                              other results
+            
+        Returns:
+            List of transcribed texts (and errors, with ``return_exceptions``)
+        """
+        if languages is None or isinstance(languages, str):
+            languages = [languages] * len(paths_or_arrays)
+        elif len(languages) != len(paths_or_arrays):
+            raise ValueError(
+                f"Got {len(languages)} language hints for {len(paths_or_arrays)} inputs"
+            )
+            
+        results: List[Any] = [None] * len(paths_or_arrays)
+        submitted = []
+        for index, item in enumerate(paths_or_arrays):
+            if isinstance(item, (str, Path)):
+                try:
+                    item = self._check_path(item)
+                except FileNotFoundError as e:
+                    if not return_exceptions:
+                        raise
+                    results[index] = e
+                    continue
+            submitted.append((index, item))
+            
+        outcomes = await asyncio.gather(
+            *(self._submit(item, languages[index], timeout) for index, item in submitted),
+            return_exceptions=return_exceptions
+        )
+        for (index, _), outcome in zip(submitted, outcomes):
+            results[index] = outcome
+        return results
+    
+    @staticmethod
+    def _check_path(audio_path: Union[str, Path]) -> str:
+        # Checked up front: a missing file would fail every request batched with it
+        audio_path = str(audio_path)
+        if not audio_path.startswith("http") and not Path(audio_path).exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        return audio_path
+    
+    async def _submit(self, audio: Any, language: Optional[str], timeout: Optional[float]) -> str:
+        if not self._started:
+            raise RuntimeError("AsyncQwenASRPipeline is not started; use 'async with' or start()")
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._run(audio, language), timeout)
+    
+    async def _run(self, audio: Any, language: Optional[str]) -> str:
+        if self.max_concurrency is None:
+            return await asyncio.wrap_future(self.coalescer.submit(audio, language).future)
+            
+        # Created lazily so it binds to the loop the requests run on
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.wrap_future(self.coalescer.submit(audio, language).future)
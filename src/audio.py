@@ -0,0 +1,273 @@
+import io
+import logging
+from functools import lru_cache
+from math import gcd
+from pathlib import Path
+from typing import Tuple, Union
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+
+def to_float32(audio: np.ndarray) -> np.ndarray:
+    """
+    Return samples as contiguous float32 in [-1, 1], converting only when needed.
+    
+    float32 input is returned as is; int16 and int32 PCM are scaled to
+    [-1, 1]; other dtypes are cast.
+    
+    Args:
+        audio: Audio samples, any shape
+        
+    Returns:
+        float32 array of the same shape
+    """
+    if audio.dtype == np.int16 or audio.dtype == np.int32:
+        waveform = audio.astype(np.float32)
+        waveform *= 1.0 / (32768.0 if audio.dtype == np.int16 else 2147483648.0)
+        return waveform
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def downmix(audio: np.ndarray) -> np.ndarray:
+    """
+    Average a (frames, channels) array down to mono, staying in float32.
+    
+    Args:
+        audio: 1D mono or 2D (frames, channels) audio
+        
+    Returns:
+        1D float32 waveform
+    """
+    if audio.ndim == 1:
+        return audio
+    if audio.shape[1] == 1:
+        return audio[:, 0]
+    return audio.mean(axis=1, dtype=np.float32)
+
+
+def resample_ratio(src_rate: int, dst_rate: int) -> Tuple[int, int]:
+    """
+    Return the reduced (up, down) factors that take src_rate to dst_rate.
+    """
+    divisor = gcd(int(src_rate), int(dst_rate))
+    return int(dst_rate) // divisor, int(src_rate) // divisor
+
+
+@lru_cache(maxsize=32)
+def resample_filter(up: int, down: int) -> np.ndarray:
+    """
+    Design (once per ratio) the anti-aliasing FIR filter for polyphase resampling.
+    
+    Same design as ``scipy.signal.resample_poly``'s default (Kaiser window,
+    beta 5, 10 zero crossings per side), in float32 so filtering stays in
+    float32.
+    
+    Args:
+        up: Upsampling factor
+        down: Downsampling factor
+        
+    Returns:
+        Read-only float32 filter taps (odd length, centered)
+    """
+    from scipy.signal import firwin
+    
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)).astype(np.float32)
+    taps.flags.writeable = False
+    return taps
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Polyphase-resample a mono waveform.
+    
+    The filter comes from the per-ratio cache and the work is done in
+    float32, so there is no float64 intermediate.
+    
+    Args:
+        audio: 1D float32 waveform
+        src_rate: Sample rate of the input
+        dst_rate: Desired sample rate
+        
+    Returns:
+        1D float32 waveform at dst_rate
+    """
+    if src_rate == dst_rate:
+        return audio
+    from scipy.signal import resample_poly
+    
+    up, down = resample_ratio(src_rate, dst_rate)
+    return resample_poly(audio, up, down, window=resample_filter(up, down))
+
+
+def prepare_waveform(audio: np.ndarray, sampling_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Normalize raw samples to what the model consumes: mono float32 at target_rate.
+    
+    Args:
+        audio: 1D or (frames, channels) samples, float or int16/int32 PCM
+        sampling_rate: Sample rate of the input
+        target_rate: Desired sample rate
+        
+    Returns:
+        1D float32 waveform at target_rate
+    """
+    return resample(downmix(to_float32(audio)), sampling_rate, target_rate)
+
+
+def read_audio(path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """
+    Decode an audio file to a mono float32 waveform at its native rate.
+    
+    Uncompressed WAV is read through a memory map (see ``AudioReader``):
+    mono float32 files come back as a zero-copy view, other sample types
+    are converted block by block without an intermediate copy of the file.
+    
+    Args:
+        path: Path to audio file (any format libsndfile can decode)
+        
+    Returns:
+        Tuple of (1D float32 waveform, sampling rate)
+    """
+    from src.ingest import AudioReader
+    
+    reader = AudioReader(path)
+    return reader.read(), reader.sampling_rate
+
+
+def load_audio(path: Union[str, Path], target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio file to a mono float32 waveform at the target rate.
+    
+    Args:
+        path: Path to audio file (any format libsndfile can decode)
+        target_rate: Sample rate of the returned waveform
+        
+    Returns:
+        1D float32 waveform
+    """
+    audio, sampling_rate = read_audio(path)
+    return resample(audio, sampling_rate, target_rate)
+
+
+def decode_audio_bytes(data: bytes, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an in-memory audio file (e.g. an upload) without touching disk.
+    
+    Args:
+        data: Encoded audio file contents
+        target_rate: Sample rate of the returned waveform
+        
+    Returns:
+        1D float32 waveform
+    """
+    audio, sampling_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return resample(downmix(audio), sampling_rate, target_rate)
+
+
+class StreamingResampler:
+    """
+    Polyphase resampler for audio that arrives in chunks.
+    
+    Each input sample is filtered once: between calls the resampler keeps
+    only the filter's history, so feeding a stream hop by hop yields the
+    same samples (to float32 rounding) as ``resample`` on the whole signal,
+    without re-filtering overlapping windows.
+    """
+    
+    def __init__(self, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE):
+        """
+        Prepare the filter for one rate pair.
+        
+        Args:
+            src_rate: Sample rate of the fed audio
+            dst_rate: Sample rate of the returned audio
+        """
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        self.up, self.down = resample_ratio(src_rate, dst_rate)
+        self._delay = 0
+        self._shift = 0
+        self._history_samples = 0
+        self._taps = None
+        
+        if self.up != self.down:
+            taps = resample_filter(self.up, self.down)
+            self._delay = (len(taps) - 1) // 2
+            # Leading zeros align upfirdn's output phase with resample()'s
+            self._shift = -self._delay % self.down
+            self._taps = np.concatenate([np.zeros(self._shift, dtype=np.float32), taps * self.up])
+            self._history_samples = -(-len(taps) // self.up)
+        self.reset()
+    
+    def reset(self):
+        """
+        Forget buffered history and start a new stream.
+        """
+        self._history = np.zeros(0, dtype=np.float32)
+        # Global index of _history[0]; kept a multiple of ``down`` so the phase never changes
+        self._history_start = 0
+        self._received = 0
+        self._emitted = 0
+    
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Resample the next chunk of a stream.
+        
+        Output lags the input by half the filter length; the rest comes
+        out of later calls or ``flush``.
+        
+        Args:
+            chunk: Mono samples at ``src_rate``
+            
+        Returns:
+            float32 samples at ``dst_rate`` that became available
+        """
+        chunk = to_float32(chunk)
+        if self.up == self.down:
+            return chunk
+        self._history = np.concatenate([self._history, chunk])
+        self._received += len(chunk)
+        # Output n needs inputs up to (n * down + delay) // up
+        ready = (self._received * self.up - 1 - self._delay) // self.down + 1
+        return self._emit(ready)
+    
+    def flush(self) -> np.ndarray:
+        """
+        Return the remaining output, treating the stream as ended with silence.
+        
+        Returns:
+            float32 samples at ``dst_rate``
+        """
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        padding = self._delay // self.up + 1
+        self._history = np.concatenate([self._history, np.zeros(padding, dtype=np.float32)])
+        output = self._emit(total)
+        self.reset()
+        return output
+    
+    def _emit(self, ready: int) -> np.ndarray:
+        if ready <= self._emitted:
+            return np.zeros(0, dtype=np.float32)
+        from scipy.signal import upfirdn
+        
+        filtered = upfirdn(self._taps, self._history, self.up, self.down)
+        first = (self._history_start * self.up - self._delay - self._shift) // self.down
+        output = filtered[self._emitted - first:ready - first]
+        self._emitted = ready
+        
+        # Keep only the history the next output still needs
+        oldest = (self._emitted * self.down + self._delay) // self.up - self._history_samples + 1
+        oldest = max(0, oldest // self.down * self.down)
+        if oldest > self._history_start:
+            self._history = self._history[oldest - self._history_start:]
+            self._history_start = oldest
+        return output
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from src.result import TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+# Memory hits whose access time is buffered before it is written to disk
+_TOUCH_BATCH_SIZE = 256
+
+# Result fields stored with the text; timings belong to the request that ran the model
+STORED_FIELDS = ("language", "duration", "token_count", "truncated", "token_budget", "segments")
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """
+    Hash the raw bytes of an audio file.
+    
+    Args:
+        path: Path to audio file
+        
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Hash an in-memory audio file (e.g. an upload) like ``hash_file`` would.
+    
+    Args:
+        data: Encoded audio file contents
+        
+    Returns:
+        Hex digest of the bytes
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def hash_pcm(audio_array: np.ndarray, sampling_rate: int) -> str:
+    """
+    Hash decoded PCM samples together with their format.
+    
+    Args:
+        audio_array: Audio samples
+        sampling_rate: Sample rate of the audio
+        
+    Returns:
+        Hex digest of the samples, dtype, shape and sample rate
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{audio_array.dtype.str}:{audio_array.shape}:{int(sampling_rate)}".encode())
+    digest.update(memoryview(np.ascontiguousarray(audio_array)).cast("B"))
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Content-addressed transcription cache.
+    
+    Each entry holds a transcription with its result fields (detected
+    language, duration, token count, truncation), so a hit returns the same
+    result as the model call that filled it. Entries live in a sqlite
+    database on disk, fronted by an in-memory LRU of the most recently used
+    keys. When the stored transcriptions exceed ``max_disk_bytes`` the least
+    recently used entries are evicted. Access times of memory hits are
+    written to disk in batches, and always before evicting, so entries
+    served from memory are not mistaken for cold ones.
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path] = "transcription_cache.sqlite",
+        max_memory_entries: int = 1024,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Open (or create) the cache.
+        
+        Args:
+            path: Location of the sqlite database
+            max_memory_entries: Number of entries kept in the in-memory LRU
+            max_disk_bytes: Size budget for stored transcriptions on disk
+        """
+        self.path = Path(path)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        
+        self._memory: "OrderedDict[str, Tuple[str, Optional[str]]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Worker processes share the database: wait for each other's writes
+        # instead of failing, and let readers proceed during a write
+        self._conn = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcriptions ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL, "
+            "fields TEXT)"
+        )
+        # Databases written before result fields were stored
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(transcriptions)")]
+        if "fields" not in columns:
+            self._conn.execute("ALTER TABLE transcriptions ADD COLUMN fields TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS transcriptions_last_access ON transcriptions (last_access)"
+        )
+        self._conn.commit()
+        
+        logger.info(f"Transcription cache: {self.path} ({self._disk_entries()} entries)")
+    
+    @staticmethod
+    def make_key(
+        audio_digest: str,
+        model_name: str,
+        language: Optional[str],
+        max_new_tokens: int
+    ) -> str:
+        """
+        Combine the audio digest with every setting that affects the output.
+        
+        Args:
+            audio_digest: Result of ``hash_file`` or ``hash_pcm``
+            model_name: Model identifier
+            language: Language hint, or None for auto-detection
+            max_new_tokens: Generation limit
+            
+        Returns:
+            Cache key
+        """
+        return f"{audio_digest}|{model_name}|{language or ''}|{max_new_tokens}"
+    
+    def get(self, key: str) -> Optional[TranscriptionResult]:
+        """
+        Look up a transcription, counting the hit or miss.
+        
+        Args:
+            key: Cache key from ``make_key``
+            
+        Returns:
+            New result marked ``cached`` (without timings), or None. Entries
+            from older databases only have the text.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._touched[key] = time.time()
+                if len(self._touched) >= _TOUCH_BATCH_SIZE:
+                    self._flush_touched()
+                    self._conn.commit()
+                self.hits += 1
+                return self._load(*entry)
+            
+            row = self._conn.execute(
+                "SELECT text, fields FROM transcriptions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE transcriptions SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self._remember(key, row)
+            self.hits += 1
+            return self._load(*row)
+    
+    def put(self, key: str, result: Union[str, TranscriptionResult]):
+        """
+        Store a transcription and evict old entries if over budget.
+        
+        Args:
+            key: Cache key from ``make_key``
+            result: Transcription result (plain text stores the text only)
+        """
+        if isinstance(result, TranscriptionResult):
+            text = result.text
+            fields = json.dumps({name: getattr(result, name) for name in STORED_FIELDS})
+        else:
+            text, fields = str(result), None
+        size = len(key) + len(text.encode("utf-8")) + len(fields or "")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcriptions (key, text, size, last_access, fields) VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, time.time(), fields)
+            )
+            self._evict()
+            self._conn.commit()
+            self._remember(key, (text, fields))
+    
+    def stats(self) -> dict:
+        """
+        Return hit/miss counters and current cache size.
+        """
+        with self._lock:
+            disk_bytes = self._disk_bytes()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries(),
+                "disk_bytes": disk_bytes,
+            }
+    
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+    
+    @staticmethod
+    def _load(text: str, fields: Optional[str]) -> TranscriptionResult:
+        stored = json.loads(fields) if fields else {}
+        return TranscriptionResult(text, cached=True, **{name: stored[name] for name in STORED_FIELDS if name in stored})
+    
+    def _remember(self, key: str, entry: Tuple[str, Optional[str]]):
+        self._memory[key] = tuple(entry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE transcriptions SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+    
+    def _evict(self):
+        excess = self._disk_bytes() - self.max_disk_bytes
+        if excess <= 0:
+            return
+        
+        self._flush_touched()
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM transcriptions ORDER BY last_access"
+        ).fetchall():
+            if excess <= 0:
+                break
+            self._conn.execute("DELETE FROM transcriptions WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._touched.pop(key, None)
+            excess -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} cache entries")
+    
+    def _disk_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcriptions").fetchone()[0]
+    
+    def _disk_entries(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM transcriptions").fetchone()[0]
@@ -0,0 +1,353 @@
+import logging
+import threading
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LAG_POLICIES = ("drop", "skip", "merge")
+
+
+class AudioRingBuffer:
+    """
+    Preallocated single-producer/single-consumer ring buffer of float32 samples.
+    
+    Writes never block: audio that does not fit is dropped and counted in
+    ``overflow_samples``. Reads block until enough samples are available or
+    the buffer is closed.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Allocate the buffer.
+        
+        Args:
+            capacity: Number of samples the buffer can hold
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.overflow_samples = 0
+        
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._read_total = 0
+        self._write_total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+    
+    @property
+    def available(self) -> int:
+        """
+        Number of samples written but not yet read.
+        """
+        with self._cond:
+            return self._write_total - self._read_total
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Copy samples into the buffer, dropping whatever does not fit.
+        
+        Args:
+            samples: Mono samples
+            
+        Returns:
+            Number of samples stored
+        """
+        with self._cond:
+            free = self.capacity - (self._write_total - self._read_total)
+            count = min(len(samples), free)
+            self.overflow_samples += len(samples) - count
+            
+            start = self._write_total % self.capacity
+            first = min(count, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[:count - first] = samples[first:count]
+            
+            self._write_total += count
+            self._cond.notify_all()
+            return count
+    
+    def read(self, num_samples: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Wait for and remove ``num_samples`` samples.
+        
+        Once the buffer is closed, whatever remains is returned even if it is
+        shorter than requested.
+        
+        Args:
+            num_samples: Number of samples to read (at most ``capacity``)
+            timeout: Maximum time to wait in seconds, or None to wait forever
+            
+        Returns:
+            Copy of the samples, or None on timeout or when closed and empty
+        """
+        num_samples = min(num_samples, self.capacity)
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._write_total - self._read_total >= num_samples or self._closed,
+                timeout=timeout,
+            )
+            available = self._write_total - self._read_total
+            if not ready or available == 0:
+                return None
+            
+            count = min(num_samples, available)
+            start = self._read_total % self.capacity
+            first = min(count, self.capacity - start)
+            out = np.empty(count, dtype=np.float32)
+            out[:first] = self._data[start:start + first]
+            out[first:] = self._data[:count - first]
+            
+            self._read_total += count
+            return out
+    
+    def discard(self, num_samples: int) -> int:
+        """
+        Drop up to ``num_samples`` of the oldest unread samples.
+        
+        Returns:
+            Number of samples discarded
+        """
+        with self._cond:
+            count = min(num_samples, self._write_total - self._read_total)
+            self._read_total += count
+            return count
+    
+    def close(self):
+        """
+        Mark the end of the stream and wake any waiting reader.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class AudioSource:
+    """
+    Blocking source of mono float32 audio, read in fixed-size blocks.
+    """
+    
+    sampling_rate: int = 16000
+    
+    def read(self, num_samples: int) -> Optional[np.ndarray]:
+        """
+        Block until the next ``num_samples`` samples are captured.
+        
+        Returns:
+            Samples, or None at the end of the stream
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+
+class PyAudioSource(AudioSource):
+    """
+    Microphone input through PyAudio.
+    """
+    
+    def __init__(self, sampling_rate: int = 16000, frames_per_buffer: int = 1600):
+        import pyaudio
+        
+        self.sampling_rate = sampling_rate
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(
+            format=pyaudio.paFloat32,
+            channels=1,
+            rate=sampling_rate,
+            input=True,
+            frames_per_buffer=frames_per_buffer
+        )
+    
+    def read(self, num_samples: int) -> Optional[np.ndarray]:
+        data = self._stream.read(num_samples, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.float32)
+    
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._pyaudio.terminate()
+
+
+class ArrayAudioSource(AudioSource):
+    """
+    Plays back an in-memory waveform as if it were being captured.
+    
+    With ``realtime=True`` each read sleeps for the duration of the returned
+    block, which makes it a drop-in stand-in for a microphone in tests.
+    """
+    
+    def __init__(self, audio: np.ndarray, sampling_rate: int = 16000, realtime: bool = True):
+        self.audio = audio
+        self.sampling_rate = sampling_rate
+        self.realtime = realtime
+        self._position = 0
+        self._next_deadline = None
+    
+    def read(self, num_samples: int) -> Optional[np.ndarray]:
+        if self._position >= len(self.audio):
+            return None
+        block = self.audio[self._position:self._position + num_samples]
+        self._position += len(block)
+        
+        if self.realtime:
+            now = time.monotonic()
+            if self._next_deadline is None:
+                self._next_deadline = now
+            self._next_deadline += len(block) / self.sampling_rate
+            time.sleep(max(0.0, self._next_deadline - now))
+        return block
+
+
+class CaptureSession:
+    """
+    Captures audio on a background thread while the caller runs inference.
+    
+    The capture thread copies source blocks into an ``AudioRingBuffer``; the
+    consumer pulls chunks with ``chunks()``. When the consumer falls more
+    than one chunk behind, ``lag_policy`` decides what happens:
+    
+    - ``"drop"``: keep processing in order; once the buffer is full, newly
+      captured audio is dropped (counted as overflow)
+    - ``"skip"``: discard the backlog and process only the newest chunk
+    - ``"merge"``: process the backlog (up to ``max_merge_chunks`` chunks)
+      as one longer chunk, trading latency for fewer model calls
+    """
+    
+    def __init__(
+        self,
+        source: AudioSource,
+        chunk_samples: int,
+        buffer_seconds: float = 60.0,
+        lag_policy: str = "drop",
+        max_merge_chunks: int = 4,
+        block_samples: int = 1600
+    ):
+        """
+        Configure the capture session.
+        
+        Args:
+            source: Audio source to capture from
+            chunk_samples: Number of samples per chunk handed to the consumer
+            buffer_seconds: Ring buffer capacity in seconds
+            lag_policy: One of "drop", "skip" or "merge"
+            max_merge_chunks: Largest backlog merged into one chunk ("merge")
+            block_samples: Samples read from the source per capture call
+        """
+        if lag_policy not in LAG_POLICIES:
+            raise ValueError(f"lag_policy must be one of {LAG_POLICIES}, got {lag_policy!r}")
+        
+        self.source = source
+        self.sampling_rate = source.sampling_rate
+        self.chunk_samples = chunk_samples
+        self.lag_policy = lag_policy
+        self.max_merge_chunks = max_merge_chunks
+        self.block_samples = block_samples
+        
+        capacity = max(int(buffer_seconds * self.sampling_rate), chunk_samples * max_merge_chunks)
+        self.buffer = AudioRingBuffer(capacity)
+        
+        self.captured_samples = 0
+        self.skipped_samples = 0
+        self.merged_chunks = 0
+        self.max_lag_seconds = 0.0
+        
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """
+        Start the capture thread.
+        """
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """
+        Stop capturing; chunks already buffered can still be consumed.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def chunks(self) -> Iterator[np.ndarray]:
+        """
+        Yield chunks for inference, applying the lag policy.
+        
+        The final chunk of a finished stream may be shorter than
+        ``chunk_samples``. Iteration ends when the source is exhausted (or
+        ``stop`` was called) and the buffer is drained.
+        """
+        while True:
+            backlog = self.buffer.available
+            if backlog >= 2 * self.chunk_samples and self.lag_policy == "skip":
+                whole_chunks = backlog // self.chunk_samples
+                self.skipped_samples += self.buffer.discard((whole_chunks - 1) * self.chunk_samples)
+            
+            num_samples = self.chunk_samples
+            if backlog >= 2 * self.chunk_samples and self.lag_policy == "merge":
+                merged = min(backlog // self.chunk_samples, self.max_merge_chunks)
+                num_samples = merged * self.chunk_samples
+                self.merged_chunks += merged - 1
+            
+            chunk = self.buffer.read(num_samples)
+            if chunk is None:
+                return
+            
+            self.max_lag_seconds = max(self.max_lag_seconds, self.lag_seconds)
+            yield chunk
+    
+    @property
+    def lag_seconds(self) -> float:
+        """
+        Audio captured but not yet handed to the consumer, in seconds.
+        """
+        return self.buffer.available / self.sampling_rate
+    
+    def stats(self) -> dict:
+        """
+        Return capture, overflow and lag metrics.
+        """
+        return {
+            "captured_seconds": self.captured_samples / self.sampling_rate,
+            "overflow_seconds": self.buffer.overflow_samples / self.sampling_rate,
+            "skipped_seconds": self.skipped_samples / self.sampling_rate,
+            "merged_chunks": self.merged_chunks,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+    
+    def _capture_loop(self):
+        # Overflow is logged once when the buffer fills and once when it has
+        # room again, not per block; running totals are in stats()
+        dropped = 0
+        try:
+            while not self._stop.is_set():
+                block = self.source.read(self.block_samples)
+                if block is None or len(block) == 0:
+                    break
+                self.captured_samples += len(block)
+                stored = self.buffer.write(block)
+                if stored < len(block):
+                    if not dropped:
+                        logger.warning("Capture buffer full, dropping new audio until inference catches up")
+                    dropped += len(block) - stored
+                elif dropped:
+                    self._log_dropped(dropped)
+                    dropped = 0
+        except Exception as e:
+            logger.error(f"Audio capture failed: {str(e)}")
+        finally:
+            if dropped:
+                self._log_dropped(dropped)
+            self.buffer.close()
+    
+    def _log_dropped(self, num_samples: int):
+        logger.warning(f"Capture buffer overflow ended, {num_samples / self.sampling_rate:.2f}s of audio was dropped")
@@ -1,12 +1,23 @@
-import torch
+import json
 import logging
+import math
 import sys
+import threading
 import numpy as np
-import tempfile
-from pathlib import Path
-from qwen_asr import Qwen3ASRModel
-from typing import Optional, Union
 import soundfile as sf
+from pathlib import Path
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.audio import TARGET_SAMPLE_RATE, read_audio, resample, to_float32
+from src.cache import TranscriptionCache, hash_file, hash_pcm
+from src.longform import TranscriptSegment, find_quiet_point, iter_segments
+from src.language import LanguageTracker
+from src.metrics import MetricsRegistry
+from src.precision import apply_precision, default_precision, load_dtype, memory_footprint_bytes
+from src.prefetch import prefetch
+from src.result import TranscriptionResult, TranscriptionText
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,6 +26,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+AudioInput = Union[str, Path, np.ndarray, Tuple[np.ndarray, int]]
+
+# Auto-detected sequences start with "language <name><asr_text>" before the
+# transcript; with a forced language that prefix is part of the prompt instead
+OUTPUT_PREFIX_TOKENS = 4
+
+# A clip this short that fills its token budget is repeating itself; splitting it does not help
+MIN_RESEGMENT_SECONDS = 2.0
+
+
+def probe_duration(item: AudioInput) -> float:
+    """
+    Return the duration of an audio input in seconds without decoding it.
+    
+    Files are inspected through their header only (``soundfile.info``).
+    Inputs whose duration cannot be determined cheaply (URLs, formats
+    libsndfile cannot parse) report ``inf`` so they are scheduled alone.
+    
+    Args:
+        item: File path/URL, ``(waveform, sampling_rate)`` pair or 16 kHz waveform
+        
+    Returns:
+        Duration in seconds
+    """
+    if isinstance(item, np.ndarray):
+        return len(item) / TARGET_SAMPLE_RATE
+    if isinstance(item, tuple):
+        audio_array, sampling_rate = item
+        return len(audio_array) / sampling_rate
+    if str(item).startswith("http"):
+        return float("inf")
+    
+    try:
+        return sf.info(str(item)).duration
+    except RuntimeError as e:
+        logger.warning(f"Could not read audio header of {item}: {str(e)}")
+        return float("inf")
+
+
+def plan_batches(
+    durations: Sequence[float],
+    max_batch_size: int,
+    max_batch_seconds: Optional[float] = None
+) -> List[List[int]]:
+    """
+    Group input indices into model batches.
+    
+    Without a seconds budget, inputs are batched first-in-first-out in
+    groups of ``max_batch_size``. With a budget, inputs are sorted by
+    duration and a batch is closed as soon as its padded size (batch length
+    times its longest clip, since every clip is padded to the longest one)
+    would exceed ``max_batch_seconds``. A clip longer than the budget still
+    forms a batch of its own.
+    
+    Args:
+        durations: Duration of each input in seconds
+        max_batch_size: Maximum number of inputs per batch
+        max_batch_seconds: Optional padded-audio budget per batch in seconds
+        
+    Returns:
+        Lists of input indices, one list per batch
+    """
+    if max_batch_seconds is None:
+        indices = list(range(len(durations)))
+        return [indices[i:i + max_batch_size] for i in range(0, len(indices), max_batch_size)]
+    
+    batches: List[List[int]] = []
+    current: List[int] = []
+    
+    for index in sorted(range(len(durations)), key=lambda i: durations[i]):
+        # Sorted ascending, so the incoming clip is the longest in the batch
+        padded_seconds = (len(current) + 1) * durations[index]
+        if current and (len(current) >= max_batch_size or padded_seconds > max_batch_seconds):
+            batches.append(current)
+            current = []
+        current.append(index)
+    
+    if current:
+        batches.append(current)
+    return batches
+
 
 class QwenASRPipeline:
     """
@@ -29,18 +121,101 @@ class QwenASRPipeline:
         model_name: str = "Qwen/Qwen3-ASR-0.6B",
         device: Optional[str] = None,
         max_inference_batch_size: int = 32,
-        max_new_tokens: int = 256
+        max_new_tokens: int = 256,
+        tokens_per_second: Optional[float] = 10.0,
+        min_new_tokens: int = 32,
+        resegment_depth: int = 1,
+        cache: Optional[TranscriptionCache] = None,
+        model: Optional[Any] = None,
+        warmup_shapes: Optional[Sequence[Tuple[int, float]]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        precision: Optional[str] = None
     ):
         """
         Initialize the ASR pipeline.
         
+        The time spent in each loading stage is recorded in ``load_profile``
+        (seconds per stage: ``import_s``, ``resolve_s``, ``materialize_s``,
+        ``quantize_s``, ``device_sync_s``, ``warmup_s`` and ``total_s``) and
+        logged as one metrics line.
+        
         Args:
             model_name: Hugging Face model identifier
             device: Device to run inference on ('cuda:0' or 'cpu'). Auto-detected if None.
             max_inference_batch_size: Maximum batch size for inference
-            max_new_tokens: Maximum number of tokens to generate
+            max_new_tokens: Maximum number of tokens to generate (the ceiling of
+                           the adaptive budget)
+            tokens_per_second: Token budget per second of audio. Each model call
+                              generates at most this rate times the longest
+                              input's duration, clamped to [min_new_tokens,
+                              max_new_tokens], which bounds the latency of
+                              repetitive output. None always uses max_new_tokens.
+            min_new_tokens: Floor of the adaptive budget
+            resegment_depth: How often a transcription that filled its budget
+                            is split at a quiet point and retried in halves
+                            (each half keeps the original budget). 0 disables.
+            cache: Optional transcription cache. Repeated audio (same file bytes
+                  or PCM, language hint and generation settings) is then served
+                  without a model forward pass.
+            model: Optional pre-built model exposing ``Qwen3ASRModel.transcribe``
+                  (e.g. a stub backend for tests and benchmarks). Skips loading.
+            warmup_shapes: Optional ``(batch_size, seconds)`` pairs to run through
+                          the model before returning, so kernel selection and
+                          allocator growth happen here instead of on the first
+                          real request. See ``warmup``.
+            metrics: Optional registry to record per-stage latencies (``decode``,
+                    ``resample``, ``decode_wait``, ``model_forward``) and
+                    real-time factor into. A private registry is created if None.
+            precision: Weight format of the linear layers: "fp32", "bf16" or
+                      "int8-dynamic" (CPU only; int8 weights with activations
+                      quantized at run time). Defaults to bf16 on CUDA and
+                      fp32 on CPU. The resulting weight memory is stored in
+                      ``memory_footprint_mb``.
         """
         self.model_name = model_name
+        self.max_inference_batch_size = max_inference_batch_size
+        self.max_new_tokens = max_new_tokens
+        self.tokens_per_second = tokens_per_second
+        self.min_new_tokens = min_new_tokens
+        self.resegment_depth = resegment_depth
+        self.truncations = 0
+        self._forward_lock = threading.Lock()
+        self.cache = cache
+        self.metrics = metrics or MetricsRegistry()
+        self.precision = precision
+        self.memory_footprint_mb: Optional[float] = None
+        self.load_profile: Dict[str, float] = {}
+        
+        load_start = time.perf_counter()
+        
+        if model is not None:
+            self.device = device or "cpu"
+            logger.info(f"Using provided model instance: {type(model).__name__}")
+            self.model = model
+        else:
+            self._load_model(device)
+        
+        if warmup_shapes:
+            self.warmup(warmup_shapes)
+        
+        self.load_profile["total_s"] = time.perf_counter() - load_start
+        logger.info(f"Load profile: {json.dumps({k: round(v, 3) for k, v in self.load_profile.items()})}")
+    
+    def _load_model(self, device: Optional[str]):
+        """
+        Import the model stack, resolve the weights and load them onto the device.
+        
+        Args:
+            device: Requested device, or None to auto-detect
+        """
+        stage_start = time.perf_counter()
+        
+        # torch and qwen_asr take seconds to import; only pay for them when
+        # a model is actually built
+        import torch
+        from qwen_asr import Qwen3ASRModel
+        
+        self.load_profile["import_s"] = time.perf_counter() - stage_start
         
         if device is None:
             if torch.cuda.is_available():
@@ -52,22 +227,46 @@ class QwenASRPipeline:
             
         logger.info(f"Initializing QwenASRPipeline on device: {self.device}")
         
-        if "cuda" in self.device and torch.cuda.is_available():
+        use_cuda = "cuda" in self.device and torch.cuda.is_available()
+        if use_cuda:
             logger.info(f"GPU Device: {torch.cuda.get_device_name(0)}")
             logger.info(f"GPU Memory: {torch.cuda.get_device_properties(0).total_memory / 1e9:.2f} GB")
         
         try:
             logger.info(f"Loading model: {self.model_name}")
             
-            dtype = torch.bfloat16 if "cuda" in self.device else torch.float32
+            stage_start = time.perf_counter()
+            model_path = self._resolve_model_path(self.model_name)
+            self.load_profile["resolve_s"] = time.perf_counter() - stage_start
+            
+            precision = self.precision or default_precision(self.device)
+            dtype = load_dtype(precision, self.device)
+            logger.info(f"Precision: {precision}")
             
+            # Weights are placed on the device while loading (device_map), so
+            # materialize_s includes the host-to-device copies; device_sync_s
+            # is whatever transfer work is still queued afterwards.
+            stage_start = time.perf_counter()
             self.model = Qwen3ASRModel.from_pretrained(
-                model_name,
+                model_path,
                 dtype=dtype,
                 device_map=self.device,
-                max_inference_batch_size=max_inference_batch_size,
-                max_new_tokens=max_new_tokens,
+                max_inference_batch_size=self.max_inference_batch_size,
+                max_new_tokens=self.max_new_tokens,
             )
+            self.load_profile["materialize_s"] = time.perf_counter() - stage_start
+            
+            stage_start = time.perf_counter()
+            apply_precision(self.model.model, precision)
+            self.load_profile["quantize_s"] = time.perf_counter() - stage_start
+            
+            self.memory_footprint_mb = memory_footprint_bytes(self.model.model) / 1e6
+            logger.info(f"Model weights: {self.memory_footprint_mb:.0f} MB")
+            
+            stage_start = time.perf_counter()
+            if use_cuda:
+                torch.cuda.synchronize()
+            self.load_profile["device_sync_s"] = time.perf_counter() - stage_start
             
             logger.info("Model loaded successfully")
             
@@ -75,11 +274,58 @@ class QwenASRPipeline:
             logger.error(f"Failed to load model: {str(e)}")
             raise
     
+    @staticmethod
+    def _resolve_model_path(model_name: str) -> str:
+        """
+        Return a local directory for the model weights, downloading them if needed.
+        
+        Args:
+            model_name: Hugging Face model identifier or local path
+            
+        Returns:
+            Local path, or ``model_name`` unchanged if huggingface_hub is unavailable
+        """
+        if Path(model_name).exists():
+            return model_name
+        try:
+            from huggingface_hub import snapshot_download
+        except ImportError:
+            return model_name
+        return snapshot_download(model_name)
+    
+    def warmup(self, shapes: Sequence[Tuple[int, float]] = ((1, 5.0),)) -> float:
+        """
+        Run synthetic audio through the model to trigger lazy initialization.
+        
+        Use the batch sizes and clip durations expected in production; each
+        ``(batch_size, seconds)`` pair runs one model call on low-level noise.
+        The cache is bypassed.
+        
+        Args:
+            shapes: ``(batch_size, seconds)`` pairs to run
+            
+        Returns:
+            Total warm-up time in seconds (also stored as ``load_profile["warmup_s"]``)
+        """
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        
+        for batch_size, seconds in shapes:
+            waveform = (rng.standard_normal(int(seconds * TARGET_SAMPLE_RATE)) * 0.01).astype(np.float32)
+            shape_start = time.perf_counter()
+            self.model.transcribe(audio=[(waveform, TARGET_SAMPLE_RATE)] * batch_size, language=None)
+            logger.info(f"Warm-up batch={batch_size} duration={seconds}s: {time.perf_counter() - shape_start:.2f}s")
+        
+        elapsed = time.perf_counter() - start
+        self.load_profile["warmup_s"] = elapsed
+        return elapsed
+    
     def transcribe(
         self,
         audio_path: Union[str, Path],
-        language: Optional[str] = None
-    ) -> str:
+        language: Optional[str] = None,
+        language_tracker: Optional[LanguageTracker] = None
+    ) -> TranscriptionText:
         """
         Transcribe audio file to text.
         
@@ -87,9 +333,13 @@ class QwenASRPipeline:
             audio_path: Path to audio file or URL
             language: Optional language hint (e.g., "English", "Chinese"). 
                      If None, language will be auto-detected.
+            language_tracker: Optional per-stream tracker; without a
+                             ``language`` it supplies the pinned hint and
+                             records the outcome (see ``LanguageTracker``)
             
         Returns:
-            Transcribed text
+            Transcribed text; a ``str`` whose ``.result`` is the
+            ``TranscriptionResult`` (language, duration, timings, tokens)
         """
         audio_path = Path(audio_path) if not str(audio_path).startswith("http") else str(audio_path)
         
@@ -97,19 +347,41 @@ class QwenASRPipeline:
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
         logger.info(f"Transcribing audio from: {audio_path}")
+        start_time = time.perf_counter()
+        
+        if language is None and language_tracker is not None:
+            language = language_tracker.next_hint()
         
         try:
-            results = self.model.transcribe(
-                audio=str(audio_path),
-                language=language,
-            )
+            duration = probe_duration(str(audio_path))
+            timings: Dict[str, float] = {}
             
-            transcription = results[0].text
-            detected_language = results[0].language
+            cache_key = self._cache_key(str(audio_path), language)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Transcription served from cache")
+                    transcription = self._cached_result(cached, language, duration, timings)
+                    if language_tracker is not None:
+                        language_tracker.observe(transcription.language, duration, language)
+                    timings["total"] = time.perf_counter() - start_time
+                    return transcription
             
-            logger.info(f"Detected language: {detected_language}")
+            transcription = self._transcribe_items([str(audio_path)], [language], timings)[0]
+            
+            logger.info(f"Detected language: {transcription.language}")
             logger.info(f"Transcription complete: {len(transcription)} characters")
             
+            if language_tracker is not None:
+                language_tracker.observe(transcription.language, duration, language)
+            
+            if cache_key is not None:
+                self.cache.put(cache_key, transcription.result)
+            
+            if duration != float("inf"):
+                self.metrics.record_throughput(duration, time.perf_counter() - start_time)
+            
+            transcription.timings["total"] = time.perf_counter() - start_time
             return transcription
             
         except FileNotFoundError as e:
@@ -123,96 +395,608 @@ class QwenASRPipeline:
         self,
         audio_array: np.ndarray,
         sampling_rate: int,
-        language: Optional[str] = None
-    ) -> str:
+        language: Optional[str] = None,
+        language_tracker: Optional[LanguageTracker] = None
+    ) -> TranscriptionText:
         """
-        Transcribe audio from numpy array to text.
+        Transcribe audio from numpy array (in-memory processing).
+        
+        The buffer is handed to the model as a ``(waveform, sampling_rate)``
+        pair, so no temporary WAV file is written or decoded. float32 input
+        is passed through without a copy; int16 input is scaled to [-1, 1].
+        Other sample rates are resampled to 16 kHz with the cached polyphase
+        filter before the model sees them.
         
         Args:
-            audio_array: Numpy array containing audio data (1D float array)
-            sampling_rate: Sampling rate of the audio
-            language: Optional language hint (e.g., "English", "Chinese"). 
+            audio_array: Audio data as numpy array (mono, float32 or int16),
+                        ideally already resampled to 16 kHz
+            sampling_rate: Sample rate of the audio data
+            language: Optional language hint (e.g., "English", "Chinese").
                      If None, language will be auto-detected.
+            language_tracker: Optional per-stream tracker; without a
+                             ``language`` it supplies the pinned hint and
+                             records the outcome (see ``LanguageTracker``)
             
         Returns:
-            Transcribed text
+            Transcribed text; a ``str`` whose ``.result`` is the
+            ``TranscriptionResult`` (language, duration, timings, tokens)
         """
-        logger.info(f"Transcribing audio from numpy array: shape={audio_array.shape}, sr={sampling_rate}")
+        logger.info(f"Transcribing audio from memory (shape: {audio_array.shape}, sr: {sampling_rate}Hz)")
+        start_time = time.perf_counter()
+        
+        if language is None and language_tracker is not None:
+            language = language_tracker.next_hint()
         
         try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-                temp_path = temp_audio.name
-                sf.write(temp_path, audio_array, sampling_rate)
-                logger.debug(f"Temporary audio file created: {temp_path}")
+            waveform = to_float32(audio_array)
+            duration = len(waveform) / sampling_rate
+            timings: Dict[str, float] = {}
             
-            try:
-                results = self.model.transcribe(
-                    audio=temp_path,
-                    language=language,
+            cache_key = self._cache_key((waveform, int(sampling_rate)), language)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Transcription served from cache")
+                    transcription = self._cached_result(cached, language, duration, timings)
+                    if language_tracker is not None:
+                        language_tracker.observe(transcription.language, duration, language)
+                    timings["total"] = time.perf_counter() - start_time
+                    return transcription
+            
+            model_input = self._to_model_rate((waveform, int(sampling_rate)), timings)
+            transcription = self._transcribe_items([model_input], [language], timings)[0]
+            
+            logger.info(f"Detected language: {transcription.language}")
+            logger.info(f"Transcription complete: {len(transcription)} characters")
+            
+            if language_tracker is not None:
+                language_tracker.observe(transcription.language, duration, language)
+            
+            if cache_key is not None:
+                self.cache.put(cache_key, transcription.result)
+            
+            self.metrics.record_throughput(duration, time.perf_counter() - start_time)
+            
+            transcription.timings["total"] = time.perf_counter() - start_time
+            return transcription
+            
+        except Exception as e:
+            logger.error(f"Transcription failed: {str(e)}")
+            raise
+    
+    def transcribe_batch(
+        self,
+        paths_or_arrays: Sequence[AudioInput],
+        languages: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        batch_size: Optional[int] = None,
+        max_batch_seconds: Optional[float] = None,
+        decode_workers: int = 0,
+        prefetch_depth: Optional[int] = None
+    ) -> List[TranscriptionText]:
+        """
+        Transcribe many audio inputs, grouping them into model batches.
+        
+        Args:
+            paths_or_arrays: Audio file paths/URLs, ``(waveform, sampling_rate)``
+                            pairs, or bare waveforms already at 16 kHz
+            languages: Optional language hint shared by all inputs, or one hint
+                      (or None) per input
+            batch_size: Maximum number of inputs per model call. Defaults to
+                       ``max_inference_batch_size``.
+            max_batch_seconds: Optional padded-audio budget per model call. When
+                              set, inputs are bucketed by duration (read from
+                              file headers) to minimize padding; see
+                              ``plan_batches``.
+            decode_workers: Number of threads decoding, downmixing and
+                           resampling upcoming files to 16 kHz while the
+                           current batch runs inference. 0 leaves decoding
+                           to the model on the inference thread.
+            prefetch_depth: Maximum number of files decoded ahead of
+                           inference. Defaults to two batches.
+            
+        Returns:
+            Transcribed texts, in the same order as the inputs; each is a
+            ``str`` whose ``.result`` is its ``TranscriptionResult`` (the
+            ``model_forward`` and ``decode_wait`` timings and the token
+            budget are per batch)
+        """
+        inputs = [self._prepare_input(item) for item in paths_or_arrays]
+        num_inputs = len(inputs)
+        
+        if languages is None or isinstance(languages, str):
+            language_hints = [languages] * num_inputs
+        else:
+            language_hints = list(languages)
+            if len(language_hints) != num_inputs:
+                raise ValueError(
+                    f"Got {len(language_hints)} language hints for {num_inputs} inputs"
                 )
+        
+        batch_size = batch_size or self.max_inference_batch_size
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        
+        transcriptions: List[Optional[TranscriptionText]] = [None] * num_inputs
+        cache_keys = [
+            self._cache_key(item, language) for item, language in zip(inputs, language_hints)
+        ]
+        for index, cache_key in enumerate(cache_keys):
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    transcriptions[index] = self._cached_result(
+                        cached, language_hints[index], probe_duration(inputs[index]), {}
+                    )
+        pending = [i for i in range(num_inputs) if transcriptions[i] is None]
+        
+        if max_batch_seconds is None:
+            durations = [0.0] * len(pending)
+        else:
+            durations = [probe_duration(inputs[i]) for i in pending]
+        batches = [
+            [pending[j] for j in batch]
+            for batch in plan_batches(durations, batch_size, max_batch_seconds)
+        ]
+        
+        logger.info(
+            f"Transcribing {len(pending)} inputs in {len(batches)} batches "
+            f"({num_inputs - len(pending)} served from cache)"
+        )
+        
+        if decode_workers > 0:
+            scheduled = (inputs[i] for batch in batches for i in batch)
+            decoded = prefetch(
+                scheduled,
+                self._decode_input,
+                num_workers=decode_workers,
+                prefetch_depth=prefetch_depth or 2 * batch_size,
+            )
+        else:
+            decoded = (self._to_model_rate(inputs[i]) for batch in batches for i in batch)
+        
+        done = 0
+        audio_seconds = 0.0
+        start_time = time.perf_counter()
+        
+        try:
+            for batch in batches:
+                timings: Dict[str, float] = {}
+                with self._stage("decode_wait", timings):
+                    batch_audio = [next(decoded) for _ in batch]
                 
-                transcription = results[0].text
-                detected_language = results[0].language
-                
-                logger.info(f"Detected language: {detected_language}")
-                logger.info(f"Transcription complete: {len(transcription)} characters")
-                
-                return transcription
+                batch_results = self._transcribe_items(batch_audio, [language_hints[i] for i in batch], timings)
+                for index, result in zip(batch, batch_results):
+                    transcriptions[index] = result
+                    audio_seconds += result.duration or 0.0
+                    if cache_keys[index] is not None:
+                        self.cache.put(cache_keys[index], result.result)
+                done += len(batch)
+                logger.info(f"Batch complete: {done}/{len(pending)} inputs")
                 
-            finally:
-                Path(temp_path).unlink(missing_ok=True)
-                logger.debug(f"Temporary file cleaned up: {temp_path}")
-            
         except Exception as e:
-            logger.error(f"Transcription from numpy array failed: {str(e)}")
+            logger.error(f"Batch transcription failed: {str(e)}")
             raise
+        finally:
+            decoded.close()
+        
+        elapsed = time.perf_counter() - start_time
+        if pending:
+            self.metrics.record_throughput(audio_seconds, elapsed)
+        throughput = num_inputs / elapsed if elapsed > 0 else float("inf")
+        logger.info(f"Batch transcription complete: {num_inputs} inputs in {elapsed:.2f}s ({throughput:.2f} inputs/s)")
+        
+        return transcriptions
     
-    def transcribe_numpy(
+    def transcribe_long(
         self,
-        audio_array: np.ndarray,
-        sampling_rate: int,
-        language: Optional[str] = None
-    ) -> str:
+        audio_path: Union[str, Path],
+        language: Optional[str] = None,
+        segment_seconds: float = 30.0,
+        batch_size: Optional[int] = None
+    ) -> List[TranscriptSegment]:
         """
-        Transcribe audio from numpy array (in-memory processing).
+        Transcribe a long recording segment by segment.
+        
+        The file is streamed from disk and cut at quiet points near
+        ``segment_seconds`` (see ``iter_segments``), so no segment can hit the
+        ``max_new_tokens`` limit and memory stays flat regardless of length.
+        Segments are transcribed in batches as they are decoded.
         
         Args:
-            audio_array: Audio data as numpy array (mono, float32 or int16)
-            sampling_rate: Sample rate of the audio data
+            audio_path: Path to a local audio file
             language: Optional language hint (e.g., "English", "Chinese").
                      If None, language will be auto-detected.
+            segment_seconds: Target segment length in seconds
+            batch_size: Segments per model call. Defaults to
+                       ``max_inference_batch_size``.
             
         Returns:
-            Transcribed text
+            Transcribed segments with start/end times in seconds; each
+            segment's text is a ``TranscriptionText`` carrying its
+            ``TranscriptionResult`` (stripped of surrounding whitespace)
         """
-        logger.info(f"Transcribing audio from memory (shape: {audio_array.shape}, sr: {sampling_rate}Hz)")
+        audio_path = Path(audio_path)
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
-        try:
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
+        batch_size = batch_size or self.max_inference_batch_size
+        logger.info(f"Transcribing long-form audio from: {audio_path} ({segment_seconds}s segments)")
+        
+        transcript: List[TranscriptSegment] = []
+        pending = []
+        
+        def flush():
+            texts = self.transcribe_batch(
+                [(segment.audio, TARGET_SAMPLE_RATE) for segment in pending],
+                languages=language,
+                batch_size=batch_size,
+            )
+            for segment, text in zip(pending, texts):
+                result = text.result
+                result.text = result.text.strip()
+                transcript.append(TranscriptSegment(segment.start, segment.end, TranscriptionText(result)))
+            pending.clear()
+        
+        for segment in iter_segments(audio_path, segment_seconds=segment_seconds):
+            pending.append(segment)
+            if len(pending) >= batch_size:
+                flush()
+        if pending:
+            flush()
+        
+        duration = transcript[-1].end if transcript else 0.0
+        logger.info(f"Long-form transcription complete: {len(transcript)} segments, {duration:.1f}s audio")
+        
+        return transcript
+    
+    def _forward(
+        self,
+        audio,
+        language,
+        timings: Optional[Dict[str, float]] = None,
+        max_new_tokens: Optional[int] = None
+    ):
+        """
+        Run one model call, timed as the ``model_forward`` stage.
+        
+        Args:
+            audio: Single input or list of inputs accepted by ``Qwen3ASRModel.transcribe``
+            language: Language hint, or one hint per input
+            timings: Optional per-request timings to add the stage to
+            max_new_tokens: Generation limit for this call (default: the model's current one)
+            
+        Returns:
+            Model results
+        """
+        if max_new_tokens is None or not hasattr(self.model, "max_new_tokens"):
+            with self._stage("model_forward", timings):
+                return self.model.transcribe(audio=audio, language=language)
                 
-            if audio_array.dtype == np.int16:
-                audio_array = audio_array.astype(np.float32) / 32768.0
+        # Qwen3ASRModel takes the limit from an attribute read on every
+        # generate call, so concurrent callers must not interleave
+        with self._forward_lock:
+            previous = self.model.max_new_tokens
+            self.model.max_new_tokens = max_new_tokens
+            try:
+                with self._stage("model_forward", timings):
+                    return self.model.transcribe(audio=audio, language=language)
+            finally:
+                self.model.max_new_tokens = previous
+    
+    def token_budget(self, duration: float, language: Optional[str] = None) -> int:
+        """
+        Return the ``max_new_tokens`` budget for audio of the given length.
+        
+        The budget is ``tokens_per_second`` per second of audio plus the
+        output prefix when the language is auto-detected, clamped to
+        [``min_new_tokens``, ``max_new_tokens``]. Unknown durations get the
+        full ``max_new_tokens``.
+        
+        Args:
+            duration: Audio length in seconds (inf if unknown)
+            language: Language hint the audio is transcribed with
+            
+        Returns:
+            Token budget
+        """
+        if self.tokens_per_second is None or duration == float("inf"):
+            return self.max_new_tokens
+        budget = math.ceil(duration * self.tokens_per_second) + self._prefix_tokens(language)
+        return min(self.max_new_tokens, max(self.min_new_tokens, budget))
+    
+    def _transcribe_items(
+        self,
+        items: List[Union[str, Tuple[np.ndarray, int]]],
+        languages: List[Optional[str]],
+        timings: Dict[str, float],
+        budget: Optional[int] = None,
+        depth: Optional[int] = None
+    ) -> List[TranscriptionText]:
+        """
+        Transcribe model-ready inputs in one call, retrying truncated ones in pieces.
+        
+        Args:
+            items: Paths/URLs or 16 kHz ``(waveform, sampling_rate)`` pairs
+            languages: One language hint (or None) per input
+            timings: Stage timings so far, copied into every result
+            budget: Token budget for the call (default: from the longest input)
+            depth: Remaining resegmentation levels (default: ``resegment_depth``)
             
-            sf.write(tmp_path, audio_array, sampling_rate)
+        Returns:
+            One result per input
+        """
+        durations = [probe_duration(item) for item in items]
+        if budget is None:
+            budget = max(self.token_budget(duration, hint) for duration, hint in zip(durations, languages))
+        results = self._forward(items, languages, timings, budget)
+        transcriptions = self._make_results(
+            [result.text for result in results],
+            [result.language or hint for result, hint in zip(results, languages)],
+            durations,
+            [dict(timings) for _ in items],
+            budget,
+            hints=languages,
+        )
+        
+        depth = self.resegment_depth if depth is None else depth
+        if depth > 0:
+            for index, transcription in enumerate(transcriptions):
+                if transcription.truncated:
+                    retried = self._resegment(items[index], languages[index], transcription, depth)
+                    if retried is not None:
+                        transcriptions[index] = retried
+        return transcriptions
+    
+    def _resegment(
+        self,
+        item: Union[str, Tuple[np.ndarray, int]],
+        language: Optional[str],
+        truncated: TranscriptionText,
+        depth: int
+    ) -> Optional[TranscriptionText]:
+        """
+        Split a truncated input at its quietest point near the middle and transcribe both halves.
+        
+        Each half runs with the budget the whole input had, so a recording cut
+        off by the ``max_new_tokens`` ceiling or denser than
+        ``tokens_per_second`` gets through, while repetitive output stays
+        bounded at twice the original budget per level.
+        
+        Args:
+            item: The input that filled its budget
+            language: Its language hint
+            truncated: Its truncated result
+            depth: Remaining resegmentation levels, including this one
             
+        Returns:
+            Combined result, or None if the input cannot be split (URLs, files
+            libsndfile cannot decode, short clips)
+        """
+        if isinstance(item, str):
+            item = self._decode_input(item)
+            if isinstance(item, str):
+                return None
+        waveform = self._to_model_rate(item)[0]
+        if len(waveform) < MIN_RESEGMENT_SECONDS * TARGET_SAMPLE_RATE:
+            return None
+        
+        timings = dict(truncated.timings)
+        with self._stage("resegment", timings):
+            middle, search = len(waveform) // 2, len(waveform) // 4
+            cut = find_quiet_point(waveform, middle - search, middle + search, TARGET_SAMPLE_RATE // 40)
+            logger.info(f"Retrying truncated transcription as two segments split at {cut / TARGET_SAMPLE_RATE:.1f}s")
+            parts = [part.result for part in self._transcribe_items(
+                [(waveform[:cut], TARGET_SAMPLE_RATE), (waveform[cut:], TARGET_SAMPLE_RATE)],
+                [language, language],
+                {},
+                budget=truncated.token_budget,
+                depth=depth - 1,
+            )]
+        
+        token_counts = [part.token_count for part in parts]
+        return TranscriptionText(TranscriptionResult(
+            " ".join(part.text.strip() for part in parts if part.text.strip()),
+            language=next((part.language for part in parts if part.language), truncated.language),
+            duration=len(waveform) / TARGET_SAMPLE_RATE,
+            timings=timings,
+            token_count=None if None in token_counts else sum(token_counts),
+            truncated=any(part.truncated for part in parts),
+            token_budget=truncated.token_budget,
+            segments=sum(part.segments for part in parts),
+        ))
+    
+    @contextmanager
+    def _stage(self, stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+        """
+        Time a block into the metrics registry and, if given, a request's timings.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.observe(stage, elapsed)
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+    
+    @staticmethod
+    def _prefix_tokens(language: Optional[str]) -> int:
+        """
+        Return how many generated tokens precede the transcript.
+        """
+        return OUTPUT_PREFIX_TOKENS if not language else 0
+    
+    def _count_tokens(self, texts: List[str]) -> List[Optional[int]]:
+        """
+        Count transcript tokens with the model's tokenizer (None if it has none).
+        """
+        tokenizer = getattr(getattr(self.model, "processor", None), "tokenizer", None)
+        if tokenizer is None or not texts:
+            return [None] * len(texts)
+        return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+    
+    def _make_results(
+        self,
+        texts: List[str],
+        languages: List[Optional[str]],
+        durations: List[float],
+        timings: List[Dict[str, float]],
+        max_new_tokens: int,
+        hints: Optional[List[Optional[str]]] = None
+    ) -> List[TranscriptionText]:
+        """
+        Wrap model output in ``TranscriptionText`` results, flagging truncation.
+        
+        Args:
+            texts: Transcripts returned by the model
+            languages: Detected (or hinted) language per transcript
+            durations: Audio seconds per transcript (inf when unknown)
+            timings: Per-request stage timings
+            max_new_tokens: Generation limit the transcripts were produced with
+            hints: Language hint each transcript was generated with
+                  (default: none, i.e. auto-detected)
+            
+        Returns:
+            One result per transcript
+        """
+        hints = hints if hints is not None else [None] * len(texts)
+        results = []
+        for text, language, hint, duration, stage_timings, token_count in zip(
+            texts, languages, hints, durations, timings, self._count_tokens(texts)
+        ):
+            truncated = None
+            if token_count is not None:
+                truncated = token_count + self._prefix_tokens(hint) >= max_new_tokens
+                if truncated:
+                    self.truncations += 1
+                    logger.warning(
+                        f"Transcription of {duration:.1f}s audio reached its token budget "
+                        f"({max_new_tokens}) after {token_count} tokens; the text is likely cut off"
+                    )
+            results.append(TranscriptionText(TranscriptionResult(
+                text,
+                language=language or None,
+                duration=None if duration == float("inf") else duration,
+                timings=stage_timings,
+                token_count=token_count,
+                truncated=truncated,
+                token_budget=max_new_tokens,
+            )))
+        return results
+    
+    @staticmethod
+    def _cached_result(
+        result: TranscriptionResult,
+        language: Optional[str],
+        duration: float,
+        timings: Dict[str, float]
+    ) -> TranscriptionText:
+        """
+        Attach this request's timings to a result served from the cache.
+        
+        Entries cached before result fields were stored only have the text;
+        they fall back to the language hint and the probed duration.
+        """
+        if result.language is None:
+            result.language = language
+        if result.duration is None and duration != float("inf"):
+            result.duration = duration
+        result.timings = timings
+        return TranscriptionText(result)
+    
+    def _prepare_input(self, item: AudioInput) -> Union[str, Tuple[np.ndarray, int]]:
+        """
+        Convert one batch input into a form accepted by the model.
+        
+        Args:
+            item: File path/URL, ``(waveform, sampling_rate)`` pair or 16 kHz waveform
+            
+        Returns:
+            Path string or ``(float32 waveform, sampling_rate)`` pair
+        """
+        if isinstance(item, np.ndarray):
+            return to_float32(item), TARGET_SAMPLE_RATE
+        if isinstance(item, tuple):
+            audio_array, sampling_rate = item
+            return to_float32(audio_array), int(sampling_rate)
+        
+        if str(item).startswith("http"):
+            return str(item)
+        if not Path(item).exists():
+            raise FileNotFoundError(f"Audio file not found: {item}")
+        return str(item)
+    
+    def _cache_key(
+        self,
+        item: Union[str, Tuple[np.ndarray, int]],
+        language: Optional[str]
+    ) -> Optional[str]:
+        """
+        Build the cache key for a prepared input, or None if caching does not apply.
+        
+        Args:
+            item: Output of ``_prepare_input``
+            language: Language hint for the request
+            
+        Returns:
+            Cache key, or None when no cache is configured or the input is a URL
+        """
+        if self.cache is None:
+            return None
+        if isinstance(item, tuple):
+            audio_digest = hash_pcm(*item)
+        elif item.startswith("http"):
+            return None
+        else:
+            audio_digest = hash_file(item)
+        # Reduced precision can change the output, so it gets its own entries
+        precision_changed = self.precision and self.precision != default_precision(self.device)
+        model_id = f"{self.model_name}@{self.precision}" if precision_changed else self.model_name
+        budget = self.token_budget(probe_duration(item), language)
+        return TranscriptionCache.make_key(audio_digest, model_id, language, budget)
+    
+    def _decode_input(self, item: Union[str, Tuple[np.ndarray, int]]) -> Union[str, Tuple[np.ndarray, int]]:
+        """
+        Decode a local file to a 16 kHz float32 waveform; resample in-memory inputs.
+        
+        Decoding and resampling are timed as separate stages. Files libsndfile
+        cannot decode (e.g. m4a) are passed through for the model's own loader.
+        
+        Args:
+            item: Output of ``_prepare_input``
+            
+        Returns:
+            ``(waveform, 16000)`` for decodable local files and waveforms,
+            otherwise the path or URL unchanged
+        """
+        if isinstance(item, str) and not item.startswith("http"):
             try:
-                results = self.model.transcribe(
-                    audio=tmp_path,
-                    language=language,
-                )
-                
-                transcription = results[0].text
-                detected_language = results[0].language
-                
-                logger.info(f"Detected language: {detected_language}")
-                logger.info(f"Transcription complete: {len(transcription)} characters")
-                
-                return transcription
-                
-            finally:
-                Path(tmp_path).unlink(missing_ok=True)
+                with self.metrics.timer("decode"):
+                    waveform, sampling_rate = read_audio(item)
+            except RuntimeError as e:
+                logger.warning(f"Could not decode {item}, leaving it to the model: {str(e)}")
+                return item
+            with self.metrics.timer("resample"):
+                waveform = resample(waveform, sampling_rate, TARGET_SAMPLE_RATE)
+            return waveform, TARGET_SAMPLE_RATE
+        return self._to_model_rate(item)
+    
+    def _to_model_rate(
+        self,
+        item: Union[str, Tuple[np.ndarray, int]],
+        timings: Optional[Dict[str, float]] = None
+    ) -> Union[str, Tuple[np.ndarray, int]]:
+        """
+        Resample an in-memory waveform to 16 kHz; pass paths and URLs through.
+        
+        Args:
+            item: Output of ``_prepare_input``
+            timings: Optional per-request timings to add the ``resample`` stage to
             
-        except Exception as e:
-            logger.error(f"Transcription failed: {str(e)}")
-            raise
\ No newline at end of file
+        Returns:
+            ``(waveform, 16000)`` for waveforms, otherwise ``item`` unchanged
+        """
+        if isinstance(item, tuple) and item[1] != TARGET_SAMPLE_RATE:
+            with self._stage("resample", timings):
+                return resample(item[0], item[1], TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE
+        return item
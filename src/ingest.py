@@ -0,0 +1,309 @@
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+from src.audio import downmix, to_float32
+
+logger = logging.getLogger(__name__)
+
+RAW_EXTENSIONS = {".raw", ".pcm"}
+
+# (format tag, bits per sample) -> sample dtype; 24-bit PCM has no numpy dtype
+WAV_DTYPES = {
+    (1, 8): np.dtype("u1"),
+    (1, 16): np.dtype("<i2"),
+    (1, 32): np.dtype("<i4"),
+    (3, 32): np.dtype("<f4"),
+    (3, 64): np.dtype("<f8"),
+}
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Frames converted at a time when a whole mapped file is read
+READ_BLOCK_FRAMES = 1 << 20
+
+
+class PCMLayout(NamedTuple):
+    """
+    Where the samples of an uncompressed file are and how they are stored.
+    """
+    offset: int
+    frames: int
+    channels: int
+    sampling_rate: int
+    dtype: np.dtype
+
+
+def parse_wav_header(path: Union[str, Path]) -> Optional[PCMLayout]:
+    """
+    Locate the data chunk of a RIFF/RF64 WAV file with memory-mappable samples.
+    
+    A data chunk whose size was never filled in (capture stopped before the
+    header was finalized) is taken to run to the end of the file.
+    
+    Args:
+        path: Path to the file
+        
+    Returns:
+        Sample layout, or None if the file is not a WAV file or its samples
+        cannot be mapped directly (24-bit, compressed codecs, ...)
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] not in (b"RIFF", b"RF64") or header[8:12] != b"WAVE":
+            return None
+            
+        data_size64 = None
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            
+            if chunk_id == b"data":
+                break
+            if chunk_id == b"ds64":
+                body = f.read(size)
+                data_size64 = struct.unpack("<Q", body[8:16])[0]
+            elif chunk_id == b"fmt ":
+                body = f.read(size)
+                format_tag, channels, sampling_rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (format_tag, channels, sampling_rate, block_align, bits)
+            else:
+                f.seek(size, os.SEEK_CUR)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+            
+        offset = f.tell()
+        
+    if fmt is None:
+        return None
+    format_tag, channels, sampling_rate, block_align, bits = fmt
+    dtype = WAV_DTYPES.get((format_tag, bits))
+    if dtype is None or channels == 0 or block_align != channels * dtype.itemsize:
+        return None
+        
+    if header[:4] == b"RF64" and size == 0xFFFFFFFF and data_size64 is not None:
+        size = data_size64
+    available = file_size - offset
+    if size == 0 or size > available:
+        size = available
+    return PCMLayout(offset, size // block_align, channels, sampling_rate, dtype)
+
+
+class AudioReader:
+    """
+    Random and sequential access to a local audio file without decoding it whole.
+    
+    Uncompressed WAV (8/16/32-bit PCM, 32/64-bit float; RIFF or RF64) and
+    headerless raw PCM are memory-mapped with ``numpy.memmap`` over the data
+    chunk: ``view`` returns zero-copy slices, and ``read``/``blocks`` convert
+    only the requested frames to mono float32 (mono float32 files are
+    handed out without any copy). Pages behind a ``blocks`` iteration are
+    released again, so replaying a file of any size keeps a constant
+    resident set. Other formats (FLAC, OGG, MP3, 24-bit WAV, ...) fall back
+    to block-wise decoding through libsndfile.
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        raw_sampling_rate: Optional[int] = None,
+        raw_channels: int = 1,
+        raw_dtype: str = "int16"
+    ):
+        """
+        Open a file and map its samples if the format allows.
+        
+        Args:
+            path: Path to the audio file
+            raw_sampling_rate: Sample rate of headerless ``.raw``/``.pcm`` files (required for them)
+            raw_channels: Interleaved channels of headerless files
+            raw_dtype: Sample type of headerless files (little-endian), e.g. "int16" or "float32"
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Audio file not found: {self.path}")
+            
+        if self.path.suffix.lower() in RAW_EXTENSIONS:
+            if raw_sampling_rate is None:
+                raise ValueError(f"{self.path} is headerless PCM; its sample rate must be given")
+            dtype = np.dtype(raw_dtype).newbyteorder("<")
+            frames = os.path.getsize(self.path) // (dtype.itemsize * raw_channels)
+            layout = PCMLayout(0, frames, raw_channels, int(raw_sampling_rate), dtype)
+        else:
+            layout = parse_wav_header(self.path)
+            
+        self._data: Optional[np.ndarray] = None
+        self._page_base = 0
+        if layout is not None:
+            self.sampling_rate = layout.sampling_rate
+            self.channels = layout.channels
+            self.frames = layout.frames
+            self._frame_bytes = layout.channels * layout.dtype.itemsize
+            self._data = self._map(layout)
+        else:
+            info = sf.info(str(self.path))
+            self.sampling_rate = info.samplerate
+            self.channels = info.channels
+            self.frames = info.frames
+            
+        logger.debug(
+            f"Opened {self.path} ({'memory-mapped' if self.mapped else 'decoded in blocks'}): "
+            f"{self.frames} frames, {self.channels} channels, {self.sampling_rate}Hz"
+        )
+    
+    @property
+    def mapped(self) -> bool:
+        """
+        True if the samples are memory-mapped rather than decoded.
+        """
+        return self._data is not None
+    
+    @property
+    def duration(self) -> float:
+        """
+        Length of the file in seconds.
+        """
+        return self.frames / self.sampling_rate if self.sampling_rate else 0.0
+    
+    def view(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Return raw samples as a zero-copy, read-only ``(frames, channels)`` view.
+        
+        Args:
+            start: First frame
+            stop: End frame (exclusive; default: end of file)
+            
+        Returns:
+            Slice of the mapped data chunk in the file's sample type
+        """
+        if self._data is None:
+            raise ValueError(f"{self.path} is not memory-mapped; use read() or blocks()")
+        return np.asarray(self._data[start:stop])
+    
+    def read(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Return frames as a mono float32 waveform at the native rate.
+        
+        Args:
+            start: First frame
+            stop: End frame (exclusive; default: end of file)
+            
+        Returns:
+            1D float32 waveform; a view of the mapping when the file is mono float32
+        """
+        stop = self.frames if stop is None else min(stop, self.frames)
+        start = min(start, stop)
+        if self._data is None:
+            with sf.SoundFile(str(self.path)) as f:
+                f.seek(start)
+                return downmix(f.read(stop - start, dtype="float32", always_2d=True))
+            
+        if self.channels == 1 and self._data.dtype == np.float32:
+            return np.asarray(self._data[start:stop, 0])
+        # Convert block by block so only one block of intermediates exists at a time
+        waveform = np.empty(stop - start, dtype=np.float32)
+        for block_start in range(start, stop, READ_BLOCK_FRAMES):
+            block_stop = min(block_start + READ_BLOCK_FRAMES, stop)
+            waveform[block_start - start:block_stop - start] = self._convert(self._data[block_start:block_stop])
+        return waveform
+    
+    def blocks(self, block_frames: int, start: int = 0) -> Iterator[np.ndarray]:
+        """
+        Iterate over the file as consecutive mono float32 blocks.
+        
+        For mapped files the pages of each block are released once the next
+        block is requested, so memory use does not grow with the file.
+        
+        Args:
+            block_frames: Frames per block (the last block may be shorter)
+            start: First frame
+            
+        Yields:
+            1D float32 waveforms at the native rate
+        """
+        if block_frames < 1:
+            raise ValueError(f"block_frames must be positive, got {block_frames}")
+        if self._data is None:
+            for block in sf.blocks(
+                str(self.path),
+                blocksize=block_frames,
+                dtype="float32",
+                always_2d=True,
+                start=start
+            ):
+                yield downmix(block)
+            return
+            
+        self._advise(mmap.MADV_SEQUENTIAL if hasattr(mmap, "MADV_SEQUENTIAL") else None, start, self.frames)
+        for block_start in range(start, self.frames, block_frames):
+            block_stop = min(block_start + block_frames, self.frames)
+            yield self._convert(self._data[block_start:block_stop])
+            self.release(block_start, block_stop)
+    
+    def release(self, start: int = 0, stop: Optional[int] = None):
+        """
+        Drop mapped pages of a frame range from this process's resident set.
+        
+        The data stays in the page cache and is faulted back in if read
+        again; views into the range remain valid. No-op for decoded files.
+        
+        Args:
+            start: First frame
+            stop: End frame (exclusive; default: end of file)
+        """
+        self._advise(getattr(mmap, "MADV_DONTNEED", None), start, self.frames if stop is None else stop)
+    
+    def close(self):
+        """
+        Drop the mapping; views handed out earlier keep it alive until they are freed.
+        
+        The reader must not be used afterwards.
+        """
+        self._data = None
+    
+    def __enter__(self) -> "AudioReader":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _map(self, layout: PCMLayout) -> np.ndarray:
+        if layout.frames == 0:
+            return np.zeros((0, layout.channels), dtype=layout.dtype)
+        # numpy maps from the allocation boundary below the offset
+        self._page_base = layout.offset % mmap.ALLOCATIONGRANULARITY
+        return np.memmap(
+            self.path,
+            dtype=layout.dtype,
+            mode="r",
+            offset=layout.offset,
+            shape=(layout.frames, layout.channels)
+        )
+    
+    def _convert(self, samples: np.ndarray) -> np.ndarray:
+        if samples.dtype == np.uint8:
+            samples = (samples.astype(np.float32) - 128.0) * (1.0 / 128.0)
+        return np.ascontiguousarray(downmix(to_float32(np.asarray(samples))))
+    
+    def _advise(self, advice: Optional[int], start: int, stop: int):
+        buffer = getattr(self._data, "_mmap", None)
+        if advice is None or buffer is None or not hasattr(buffer, "madvise") or stop <= start:
+            return
+        begin = self._page_base + start * self._frame_bytes
+        end = self._page_base + stop * self._frame_bytes
+        begin -= begin % mmap.PAGESIZE
+        try:
+            buffer.madvise(advice, begin, end - begin)
+        except (OSError, ValueError) as e:
+            logger.debug(f"madvise failed on {self.path}: {str(e)}")
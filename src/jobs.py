@@ -0,0 +1,464 @@
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from src.cache import hash_file
+from src.workers import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def atomic_write_text(path: Union[str, Path], text: str):
+    """
+    Write a text file so readers only ever see the old or the complete new contents.
+    
+    The text goes to a temporary file in the same directory, is fsynced and
+    then renamed over ``path``.
+    
+    Args:
+        path: Destination file
+        text: Contents to write
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def transcription_path(
+    audio_path: Union[str, Path],
+    output_dir: Union[str, Path],
+    input_root: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Return where the transcription of an audio file is written.
+    
+    Args:
+        audio_path: Source audio file
+        output_dir: Directory the transcriptions go to
+        input_root: Mirror the directory layout below this path in
+            ``output_dir`` (default: name every output flat by stem)
+        
+    Returns:
+        Path of the ``<stem>_transcription.txt`` file
+    """
+    audio_path = Path(audio_path)
+    output_dir = Path(output_dir)
+    name = audio_path.stem + "_transcription.txt"
+    if input_root is not None:
+        try:
+            return output_dir / audio_path.parent.relative_to(input_root) / name
+        except ValueError:
+            pass
+    return output_dir / name
+
+
+class JobManifest:
+    """
+    Per-file progress of a bulk transcription job, stored in sqlite.
+    
+    Each file has a status (pending/done/failed), the content hash of the
+    audio it was transcribed from, its attempt count and timing. Re-adding
+    a finished file keeps it done unless its contents changed, which makes
+    re-running the same job idempotent. Only the files passed to the latest
+    ``add`` call are scheduled and counted; rows for the rest are kept so a
+    later run over them can still skip finished work.
+    """
+    
+    def __init__(self, path: Union[str, Path] = "transcription_jobs.sqlite"):
+        """
+        Open (or create) the manifest.
+        
+        Args:
+            path: Location of the sqlite database
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, content_hash TEXT, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL DEFAULT 0, "
+            "error TEXT, output_path TEXT, elapsed_s REAL, updated_at REAL NOT NULL, "
+            "listed INTEGER NOT NULL DEFAULT 1)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_status ON files (listed, status)")
+        self._conn.commit()
+    
+    def add(self, paths: Iterable[Union[str, Path]]) -> int:
+        """
+        Set the files belonging to the job.
+        
+        New files start pending. A done file whose size or modification
+        time changed is re-hashed and, if its contents differ, reset to
+        pending.
+        
+        Args:
+            paths: Audio files belonging to the job
+            
+        Returns:
+            Number of files that are new or were reset to pending
+        """
+        added = 0
+        now = time.time()
+        with self._lock:
+            known = {
+                row[0]: row[1:]
+                for row in self._conn.execute("SELECT path, size, mtime, content_hash, status FROM files")
+            }
+            self._conn.execute("UPDATE files SET listed = 0")
+            for path in paths:
+                path = str(path)
+                stat = os.stat(path)
+                row = known.get(path)
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO files (path, size, mtime, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        (path, stat.st_size, stat.st_mtime, PENDING, now)
+                    )
+                    added += 1
+                    continue
+                    
+                size, mtime, content_hash, status = row
+                if size == stat.st_size and mtime == stat.st_mtime:
+                    self._conn.execute("UPDATE files SET listed = 1 WHERE path = ?", (path,))
+                    continue
+                if status == DONE and content_hash == hash_file(path):
+                    self._conn.execute(
+                        "UPDATE files SET size = ?, mtime = ?, listed = 1 WHERE path = ?",
+                        (stat.st_size, stat.st_mtime, path)
+                    )
+                    continue
+                self._conn.execute(
+                    "UPDATE files SET size = ?, mtime = ?, content_hash = NULL, status = ?, attempts = 0, "
+                    "next_attempt_at = 0, error = NULL, updated_at = ?, listed = 1 WHERE path = ?",
+                    (stat.st_size, stat.st_mtime, PENDING, now, path)
+                )
+                added += 1
+            self._conn.commit()
+        return added
+    
+    def due(self, max_attempts: int, limit: Optional[int] = None) -> List[str]:
+        """
+        Return files that are pending, or failed with attempts left and their backoff elapsed.
+        
+        Args:
+            max_attempts: Attempts after which a failed file is given up on
+            limit: Maximum number of files to return
+            
+        Returns:
+            File paths, in path order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE listed = 1 "
+                "AND (status = ? OR (status = ? AND attempts < ? AND next_attempt_at <= ?)) ORDER BY path LIMIT ?",
+                (PENDING, FAILED, max_attempts, time.time(), -1 if limit is None else limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def next_retry_at(self, max_attempts: int) -> Optional[float]:
+        """
+        Return when the earliest failed file with attempts left becomes due, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM files WHERE listed = 1 AND status = ? AND attempts < ?",
+                (FAILED, max_attempts)
+            ).fetchone()
+        return row[0]
+    
+    def mark_done(self, path: str, content_hash: str, output_path: Union[str, Path], elapsed_s: float):
+        """
+        Record a successful transcription.
+        
+        Args:
+            path: Audio file
+            content_hash: ``hash_file`` digest of the audio that was transcribed
+            output_path: Where the transcription was written
+            elapsed_s: Seconds spent on this file
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET status = ?, content_hash = ?, attempts = attempts + 1, error = NULL, "
+                "output_path = ?, elapsed_s = ?, updated_at = ? WHERE path = ?",
+                (DONE, content_hash, str(output_path), elapsed_s, time.time(), path)
+            )
+            self._conn.commit()
+    
+    def mark_failed(self, path: str, error: str, backoff_s: float, elapsed_s: float):
+        """
+        Record a failed attempt and schedule the next one.
+        
+        Args:
+            path: Audio file
+            error: Error message
+            backoff_s: Base backoff; the delay doubles with every failed attempt
+            elapsed_s: Seconds spent on this file
+        """
+        with self._lock:
+            attempts = self._conn.execute(
+                "SELECT attempts FROM files WHERE path = ?", (path,)
+            ).fetchone()[0] + 1
+            now = time.time()
+            self._conn.execute(
+                "UPDATE files SET status = ?, attempts = ?, error = ?, next_attempt_at = ?, elapsed_s = ?, "
+                "updated_at = ? WHERE path = ?",
+                (FAILED, attempts, error, now + backoff_s * 2 ** (attempts - 1), elapsed_s, now, path)
+            )
+            self._conn.commit()
+    
+    def reset_failed(self) -> int:
+        """
+        Give every failed file of the job a fresh set of attempts.
+        
+        Returns:
+            Number of files reset
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE files SET status = ?, attempts = 0, next_attempt_at = 0, updated_at = ? "
+                "WHERE listed = 1 AND status = ?",
+                (PENDING, time.time(), FAILED)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+    
+    def failures(self) -> List[tuple]:
+        """
+        Return ``(path, attempts, error)`` for every failed file.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, attempts, error FROM files WHERE listed = 1 AND status = ? ORDER BY path", (FAILED,)
+            ).fetchall()
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Return the number of files in each status.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM files WHERE listed = 1 GROUP BY status").fetchall()
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+    
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """
+    Drive a ``JobManifest`` to completion with batched inference.
+    
+    Due files are transcribed ``batch_size`` at a time through the
+    pipeline's ``transcribe_batch`` (a ``QwenASRPipeline`` or a
+    ``WorkerPool``). A ``WorkerPool`` is given one batch per worker at a
+    time, and each batch is recorded as soon as its worker returns it. If a
+    batch fails, its files are retried one by one so a single bad file does
+    not fail its neighbours. Every transcription is written atomically
+    before the file is marked done, so a crash at any point loses at most
+    the batches in flight.
+    """
+    
+    def __init__(
+        self,
+        pipeline: Any,
+        manifest: JobManifest,
+        output_dir: Union[str, Path],
+        batch_size: int = 32,
+        max_attempts: int = 3,
+        backoff_seconds: float = 5.0,
+        input_root: Optional[Union[str, Path]] = None,
+        **batch_options
+    ):
+        """
+        Initialize the runner.
+        
+        Args:
+            pipeline: Object with a ``transcribe_batch`` method
+            manifest: Job state
+            output_dir: Directory to write transcriptions to
+            batch_size: Files per model batch
+            max_attempts: Attempts per file before it is left failed
+            backoff_seconds: Delay before the first retry; doubles with each attempt
+            input_root: Mirror the directory layout below this path in
+                ``output_dir`` (default: write all outputs flat)
+            **batch_options: Passed to ``transcribe_batch`` (e.g. ``max_batch_seconds``)
+        """
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if max_attempts <= 0:
+            raise ValueError(f"max_attempts must be positive, got {max_attempts}")
+            
+        self.pipeline = pipeline
+        self.manifest = manifest
+        self.output_dir = Path(output_dir)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.input_root = Path(input_root) if input_root is not None else None
+        self.batch_options = batch_options
+    
+    def output_path(self, audio_path: Union[str, Path]) -> Path:
+        """
+        Return where the transcription of an audio file is written.
+        """
+        return transcription_path(audio_path, self.output_dir, self.input_root)
+    
+    def run(self, wait_for_retries: bool = True) -> Dict[str, int]:
+        """
+        Transcribe every due file.
+        
+        Args:
+            wait_for_retries: Sleep until failed files become due again and
+                retry them, instead of leaving them for the next run
+            
+        Returns:
+            Final per-status counts from the manifest
+        """
+        processed = 0
+        start_time = time.perf_counter()
+        
+        while True:
+            batch = self.manifest.due(self.max_attempts, limit=self.batch_size * self._parallelism)
+            if batch:
+                processed += self._run_batch(batch)
+                continue
+                
+            retry_at = self.manifest.next_retry_at(self.max_attempts)
+            if not wait_for_retries or retry_at is None:
+                break
+            delay = retry_at - time.time()
+            if delay > 0:
+                logger.info(f"Retrying failed files in {delay:.1f}s")
+                time.sleep(delay)
+            
+        elapsed = time.perf_counter() - start_time
+        counts = self.manifest.counts()
+        logger.info(
+            f"Job finished: {processed} transcription attempts in {elapsed:.2f}s "
+            f"({counts[DONE]} done, {counts[FAILED]} failed, {counts[PENDING]} pending)"
+        )
+        return counts
+    
+    @property
+    def _parallelism(self) -> int:
+        return self.pipeline.num_workers if isinstance(self.pipeline, WorkerPool) else 1
+    
+    def _run_batch(self, batch: List[str]) -> int:
+        hashes = {}
+        readable = []
+        for path in batch:
+            try:
+                hashes[path] = hash_file(path)
+                readable.append(path)
+            except OSError as e:
+                self._fail(path, e, 0.0)
+        if not readable:
+            return len(batch)
+        if isinstance(self.pipeline, WorkerPool):
+            self._run_pool(readable, hashes)
+            return len(batch)
+            
+        start_time = time.perf_counter()
+        try:
+            transcriptions = self.pipeline.transcribe_batch(
+                readable, batch_size=self.batch_size, **self.batch_options
+            )
+        except Exception as e:
+            if len(readable) == 1:
+                self._fail(readable[0], e, time.perf_counter() - start_time)
+                return len(batch)
+            logger.warning(f"Batch of {len(readable)} files failed ({e}); retrying them one by one")
+            for path in readable:
+                self._run_single(path, hashes[path])
+            return len(batch)
+            
+        elapsed = time.perf_counter() - start_time
+        for path, transcription in zip(readable, transcriptions):
+            self._finish(path, hashes[path], transcription, elapsed / len(readable))
+        return len(batch)
+    
+    def _run_pool(self, readable: List[str], hashes: Dict[str, str]):
+        start_time = time.perf_counter()
+        failed_chunks = []
+        handled = set()
+        
+        def on_chunk(offset: int, outcome: Union[List[str], Exception]):
+            paths = readable[offset:offset + self.batch_size]
+            if isinstance(outcome, Exception):
+                # Retried after the pool call returns; the pool is not re-entrant
+                failed_chunks.append((paths, outcome))
+                handled.update(paths)
+                return
+            elapsed = time.perf_counter() - start_time
+            for path, transcription in zip(paths, outcome):
+                self._finish(path, hashes[path], transcription, elapsed / len(paths))
+            handled.update(paths)
+            
+        try:
+            self.pipeline.transcribe_batch(
+                readable, batch_size=self.batch_size, on_chunk=on_chunk, **self.batch_options
+            )
+        except Exception as e:
+            # Chunks already handled keep their outcome; the rest is retried below
+            unfinished = [path for path in readable if path not in handled]
+            if unfinished:
+                failed_chunks.append((unfinished, e))
+                
+        for paths, error in failed_chunks:
+            if len(paths) == 1:
+                self._fail(paths[0], error, time.perf_counter() - start_time)
+                continue
+            logger.warning(f"Batch of {len(paths)} files failed ({error}); retrying them one by one")
+            for path in paths:
+                self._run_single(path, hashes[path])
+    
+    def _run_single(self, path: str, content_hash: str):
+        start_time = time.perf_counter()
+        try:
+            transcription = self.pipeline.transcribe_batch([path], batch_size=1, **self.batch_options)[0]
+        except Exception as e:
+            self._fail(path, e, time.perf_counter() - start_time)
+            return
+        self._finish(path, content_hash, transcription, time.perf_counter() - start_time)
+    
+    def _finish(self, path: str, content_hash: str, transcription: str, elapsed_s: float):
+        output_path = self.output_path(path)
+        try:
+            atomic_write_text(output_path, transcription)
+        except OSError as e:
+            self._fail(path, e, elapsed_s)
+            return
+        self.manifest.mark_done(path, content_hash, output_path, elapsed_s)
+    
+    def _fail(self, path: str, error: Exception, elapsed_s: float):
+        logger.error(f"Failed to transcribe {path}: {error}")
+        self.manifest.mark_failed(path, f"{type(error).__name__}: {error}", self.backoff_seconds, elapsed_s)
@@ -0,0 +1,146 @@
+import logging
+from collections import Counter, deque
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LanguageDetection(NamedTuple):
+    """
+    Language used for one transcription call.
+    
+    ``language`` is what the model reported (or was told), ``detected`` is
+    True when the model auto-detected it on this call, and ``confidence``
+    is the share of recent detections that agree with the current choice.
+    """
+    language: Optional[str]
+    confidence: float
+    pinned: bool
+    detected: bool
+
+
+class LanguageTracker:
+    """
+    Detects the language of a stream once and pins it for later chunks.
+    
+    While unpinned, every chunk is transcribed with auto-detection and its
+    detected language is recorded. Once ``min_detections`` recent
+    detections agree at least ``confidence_threshold`` of the time, that
+    language is passed as the hint for the following chunks, which skips
+    detection and stops the language flip-flopping between chunks. After
+    ``recheck_seconds`` of pinned audio one chunk is auto-detected again; a
+    disagreeing result lowers the confidence and can unpin the language.
+    
+    The model reports no detection probabilities, so confidence is measured
+    as agreement between recent chunks. A tracker belongs to one stream or
+    session and is not thread-safe.
+    """
+    
+    def __init__(
+        self,
+        hint: Optional[str] = None,
+        min_detections: int = 2,
+        confidence_threshold: float = 0.8,
+        recheck_seconds: float = 60.0,
+        window: int = 5
+    ):
+        """
+        Configure the tracker.
+        
+        Args:
+            hint: Language given by the user; pinned for good and never re-checked
+            min_detections: Agreeing detections needed before pinning
+            confidence_threshold: Share of the last ``window`` detections that
+                                 must agree to pin (and to stay pinned)
+            recheck_seconds: Pinned audio after which one chunk is auto-detected again
+            window: Number of recent detections considered
+        """
+        if not 0.0 < confidence_threshold <= 1.0:
+            raise ValueError(f"confidence_threshold must be in (0, 1], got {confidence_threshold}")
+            
+        self.hint = hint
+        self.min_detections = min_detections
+        self.confidence_threshold = confidence_threshold
+        self.recheck_seconds = recheck_seconds
+        self.window = window
+        
+        self.detections = 0
+        self.rechecks = 0
+        self.reset()
+    
+    def reset(self):
+        """
+        Forget detections and unpin (a user hint stays pinned).
+        """
+        self._votes: "deque[str]" = deque(maxlen=self.window)
+        self._pinned: Optional[str] = self.hint
+        self._seconds_since_check = 0.0
+        self.last: Optional[LanguageDetection] = None
+    
+    @property
+    def language(self) -> Optional[str]:
+        """
+        Pinned language, or None while still detecting.
+        """
+        return self._pinned
+    
+    @property
+    def confidence(self) -> float:
+        """
+        Share of recent detections agreeing with the leading language.
+        """
+        if self.hint is not None:
+            return 1.0
+        if not self._votes:
+            return 0.0
+        return Counter(self._votes).most_common(1)[0][1] / len(self._votes)
+    
+    def next_hint(self) -> Optional[str]:
+        """
+        Return the language hint for the next chunk; None means auto-detect.
+        """
+        if self.hint is not None:
+            return self.hint
+        if self._pinned is not None and self._seconds_since_check >= self.recheck_seconds:
+            return None
+        return self._pinned
+    
+    def observe(self, language: Optional[str], audio_seconds: float, hint: Optional[str]) -> LanguageDetection:
+        """
+        Record the outcome of a transcription call.
+        
+        Args:
+            language: Language reported by the model
+            audio_seconds: Duration of the transcribed chunk
+            hint: Hint the chunk was transcribed with (from ``next_hint``)
+            
+        Returns:
+            Structured detection for the call
+        """
+        if hint is not None:
+            self._seconds_since_check += audio_seconds
+            self.last = LanguageDetection(hint, self.confidence, True, False)
+            return self.last
+            
+        # Silence comes back without a language; mixed speech as "A,B"
+        if language and "," not in language:
+            self.detections += 1
+            if self._pinned is not None:
+                self.rechecks += 1
+            self._votes.append(language)
+            self._update_pin()
+            
+        self._seconds_since_check = 0.0
+        self.last = LanguageDetection(language or None, self.confidence, self._pinned is not None, True)
+        return self.last
+    
+    def _update_pin(self):
+        leading, count = Counter(self._votes).most_common(1)[0]
+        confident = count >= self.min_detections and count / len(self._votes) >= self.confidence_threshold
+        
+        if confident and leading != self._pinned:
+            logger.info(f"Pinned language: {leading} (confidence {count / len(self._votes):.2f})")
+            self._pinned = leading
+        elif not confident and self._pinned is not None:
+            logger.info(f"Unpinned language {self._pinned} (confidence {self.confidence:.2f})")
+            self._pinned = None
@@ -0,0 +1,139 @@
+import logging
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Union
+
+import numpy as np
+
+from src.audio import TARGET_SAMPLE_RATE, resample
+from src.ingest import AudioReader
+
+logger = logging.getLogger(__name__)
+
+
+class AudioSegment(NamedTuple):
+    """
+    A slice of a long recording, resampled for the model.
+    """
+    start: float
+    end: float
+    audio: np.ndarray
+
+
+class TranscriptSegment(NamedTuple):
+    """
+    Transcribed text of one segment with its position in the recording.
+    
+    ``text`` is a ``TranscriptionText`` when produced by the pipeline, so
+    ``text.result`` holds the segment's language, timings and token count.
+    """
+    start: float
+    end: float
+    text: str
+
+
+def find_quiet_point(audio: np.ndarray, start: int, end: int, frame_len: int) -> int:
+    """
+    Return the sample index at the center of the quietest frame in ``audio[start:end]``.
+    
+    Args:
+        audio: Mono waveform
+        start: First sample of the search region
+        end: End of the search region (exclusive)
+        frame_len: Energy analysis frame length in samples
+        
+    Returns:
+        Sample index to cut at
+    """
+    region = audio[start:end]
+    num_frames = len(region) // frame_len
+    if num_frames == 0:
+        return (start + end) // 2
+    frames = region[:num_frames * frame_len].reshape(num_frames, frame_len)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    return start + int(np.argmin(energy)) * frame_len + frame_len // 2
+
+
+def iter_segments(
+    audio_path: Union[str, Path],
+    segment_seconds: float = 30.0,
+    search_seconds: float = 5.0,
+    block_seconds: float = 10.0,
+    frame_ms: float = 25.0,
+    target_rate: int = TARGET_SAMPLE_RATE
+) -> Iterator[AudioSegment]:
+    """
+    Stream a recording from disk and split it at quiet points.
+    
+    The file is read block by block (``AudioReader.blocks``: memory-mapped
+    for uncompressed WAV, decoded otherwise), so at most about
+    ``segment_seconds + search_seconds + block_seconds`` of audio is in
+    memory regardless of the file length. Each cut is placed at the
+    quietest frame within ``search_seconds`` of the target segment length.
+    
+    Args:
+        audio_path: Path to audio file
+        segment_seconds: Target segment length
+        search_seconds: How far from the target length a cut may move
+        block_seconds: Decode block length
+        frame_ms: Energy analysis frame length in milliseconds
+        target_rate: Sample rate of the yielded segments
+        
+    Yields:
+        Consecutive segments covering the whole recording
+    """
+    reader = AudioReader(audio_path)
+    sampling_rate = reader.sampling_rate
+    target = int(segment_seconds * sampling_rate)
+    search = min(int(search_seconds * sampling_rate), target // 2)
+    frame_len = max(1, int(frame_ms * sampling_rate / 1000.0))
+    
+    pending = np.zeros(0, dtype=np.float32)
+    offset = 0
+    
+    for block in reader.blocks(int(block_seconds * sampling_rate)):
+        pending = np.concatenate([pending, block])
+        
+        while len(pending) >= target + search:
+            cut = find_quiet_point(pending, target - search, target + search, frame_len)
+            yield AudioSegment(
+                offset / sampling_rate,
+                (offset + cut) / sampling_rate,
+                resample(pending[:cut], sampling_rate, target_rate)
+            )
+            pending = pending[cut:]
+            offset += cut
+        
+    if len(pending) > 0:
+        yield AudioSegment(
+            offset / sampling_rate,
+            (offset + len(pending)) / sampling_rate,
+            resample(pending, sampling_rate, target_rate)
+        )
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Format seconds as ``HH:MM:SS.mmm``.
+    """
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"
+
+
+def format_transcript(segments: List[TranscriptSegment]) -> str:
+    """
+    Render segments as one timestamped line each.
+    
+    Args:
+        segments: Transcribed segments in order
+        
+    Returns:
+        Lines of the form ``[HH:MM:SS.mmm --> HH:MM:SS.mmm] text``
+    """
+    return "\n".join(
+        f"[{format_timestamp(s.start)} --> {format_timestamp(s.end)}] {s.text}"
+        for s in segments
+        if s.text.strip()
+    )
@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Latency distribution of one pipeline stage.
+    
+    Keeps cumulative bucket counts (for Prometheus export) plus a bounded
+    window of recent observations for exact p50/p95/p99.
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, window: int = 10000):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+    
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+    
+    def summary(self) -> dict:
+        """
+        Return count, mean and quantiles in milliseconds.
+        """
+        result = {"count": self.count, "mean_ms": 1000.0 * self.total / self.count if self.count else 0.0}
+        recent = np.fromiter(self.recent, dtype=np.float64, count=len(self.recent))
+        for q in QUANTILES:
+            key = f"p{int(q * 100)}_ms"
+            result[key] = float(np.quantile(recent, q)) * 1000.0 if recent.size else 0.0
+        return result
+
+
+class MetricsRegistry:
+    """
+    Per-stage latency histograms and real-time factor for one process.
+    
+    Stages are free-form names (``decode``, ``resample``, ``vad``,
+    ``queue_wait``, ``model_forward``, ``output_write``, ...). All methods
+    are thread-safe, and a ``timer`` costs two ``perf_counter`` calls plus a
+    lock, so it can stay on in production.
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.audio_seconds = 0.0
+        self.compute_seconds = 0.0
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage: str, seconds: float):
+        """
+        Record one latency observation for a stage.
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """
+        Time the enclosed block as one observation of ``stage``.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+    
+    def samples(self, stage: str) -> List[float]:
+        """
+        Return the recent observations of a stage in seconds (empty if never observed).
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            return list(histogram.recent) if histogram is not None else []
+    
+    def record_throughput(self, audio_seconds: float, compute_seconds: float):
+        """
+        Account audio processed against the compute time it took.
+        """
+        with self._lock:
+            self.audio_seconds += audio_seconds
+            self.compute_seconds += compute_seconds
+    
+    @property
+    def realtime_factor(self) -> float:
+        """
+        Audio seconds processed per compute second (above 1 is faster than real time).
+        """
+        return self.audio_seconds / self.compute_seconds if self.compute_seconds > 0 else 0.0
+    
+    def snapshot(self) -> dict:
+        """
+        Return all stage summaries and throughput totals as a plain dict.
+        """
+        with self._lock:
+            return {
+                "stages": {stage: h.summary() for stage, h in sorted(self._histograms.items())},
+                "audio_seconds": self.audio_seconds,
+                "compute_seconds": self.compute_seconds,
+                "realtime_factor": self.realtime_factor,
+            }
+    
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Export the snapshot as JSON.
+        """
+        return json.dumps(self.snapshot(), indent=indent)
+    
+    def to_prometheus(self, prefix: str = "asr") -> str:
+        """
+        Export in the Prometheus text exposition format.
+        
+        Each stage becomes a ``<prefix>_stage_latency_seconds`` histogram;
+        exact recent quantiles are exposed separately as
+        ``<prefix>_stage_latency_quantile_seconds`` gauges.
+        """
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [f"# TYPE {name} histogram"]
+        quantile_lines = [f"# TYPE {name.replace('_seconds', '_quantile_seconds')} gauge"]
+        
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+                
+                recent = np.fromiter(histogram.recent, dtype=np.float64, count=len(histogram.recent))
+                if recent.size:
+                    for q in QUANTILES:
+                        quantile_lines.append(
+                            f'{prefix}_stage_latency_quantile_seconds{{stage="{stage}",quantile="{q}"}} '
+                            f'{float(np.quantile(recent, q))}'
+                        )
+            
+            lines.extend(quantile_lines)
+            lines.extend([
+                f"# TYPE {prefix}_audio_seconds_total counter",
+                f"{prefix}_audio_seconds_total {self.audio_seconds}",
+                f"# TYPE {prefix}_compute_seconds_total counter",
+                f"{prefix}_compute_seconds_total {self.compute_seconds}",
+                f"# TYPE {prefix}_realtime_factor gauge",
+                f"{prefix}_realtime_factor {self.realtime_factor}",
+            ])
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: str):
+        """
+        Write the metrics to a file: Prometheus text for ``.prom``/``.txt``, JSON otherwise.
+        """
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json(indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
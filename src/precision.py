@@ -0,0 +1,98 @@
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "bf16", "int8-dynamic")
+
+
+def default_precision(device: str) -> str:
+    """
+    Return the precision used when none is requested: bf16 on CUDA, fp32 on CPU.
+    """
+    return "bf16" if "cuda" in device else "fp32"
+
+
+def load_dtype(precision: str, device: str):
+    """
+    Return the torch dtype to load the weights in for a precision.
+    
+    ``int8-dynamic`` loads fp32 weights, which ``apply_precision`` then
+    quantizes.
+    
+    Args:
+        precision: One of ``PRECISIONS``
+        device: Target device
+        
+    Returns:
+        torch dtype
+    """
+    import torch
+    
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; choose from {PRECISIONS}")
+    if precision == "int8-dynamic" and "cuda" in device:
+        raise ValueError("int8-dynamic quantization runs on CPU only; use bf16 on CUDA")
+    return torch.bfloat16 if precision == "bf16" else torch.float32
+
+
+def apply_precision(model: Any, precision: str) -> Any:
+    """
+    Convert a loaded model's linear layers to the requested weight format.
+    
+    ``int8-dynamic`` replaces every ``nn.Linear`` with a dynamically
+    quantized one: int8 weights, activations quantized per batch at run
+    time, float32 everywhere else. fp32 and bf16 are applied at load time
+    and need no conversion here.
+    
+    Args:
+        model: torch module (the underlying transformers model)
+        precision: One of ``PRECISIONS``
+        
+    Returns:
+        The converted model (modified in place)
+    """
+    if precision != "int8-dynamic":
+        return model
+        
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+    
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def memory_footprint_bytes(model: Any) -> int:
+    """
+    Return the bytes held by a model's parameters and buffers.
+    
+    Dynamically quantized linear layers keep their int8 weights in packed
+    parameters that ``parameters()`` does not list, so those are counted
+    through the module's ``weight()``/``bias()`` accessors.
+    
+    Args:
+        model: torch module
+        
+    Returns:
+        Footprint in bytes
+    """
+    seen = set()
+    total = 0
+    
+    def count(tensor: Optional[Any]):
+        nonlocal total
+        if tensor is None or tensor.data_ptr() in seen:
+            return
+        seen.add(tensor.data_ptr())
+        total += tensor.nelement() * tensor.element_size()
+        
+    for tensor in model.parameters():
+        count(tensor)
+    for tensor in model.buffers():
+        count(tensor)
+    for module in model.modules():
+        weight = getattr(module, "weight", None)
+        if callable(weight):
+            count(weight())
+            bias = getattr(module, "bias", None)
+            count(bias() if callable(bias) else None)
+    return total
@@ -0,0 +1,59 @@
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def prefetch(
+    items: Iterable[T],
+    load_fn: Callable[[T], R],
+    num_workers: int = 2,
+    prefetch_depth: int = 8
+) -> Iterator[R]:
+    """
+    Apply ``load_fn`` to upcoming items on a thread pool while the caller works.
+    
+    At most ``prefetch_depth`` items are in flight or waiting to be consumed,
+    so a slow consumer applies backpressure instead of letting decoded audio
+    pile up in memory. Results are yielded in input order. Decoding
+    (libsndfile, scipy) and inference (torch) release the GIL, so threads
+    are enough to overlap them.
+    
+    Args:
+        items: Inputs to load, consumed lazily
+        load_fn: Function run on a worker thread for each item
+        num_workers: Number of worker threads
+        prefetch_depth: Maximum number of items loaded ahead of the consumer
+        
+    Yields:
+        ``load_fn(item)`` for each item, in order
+    """
+    if num_workers < 1:
+        raise ValueError(f"num_workers must be positive, got {num_workers}")
+    if prefetch_depth < 1:
+        raise ValueError(f"prefetch_depth must be positive, got {prefetch_depth}")
+    
+    iterator = iter(items)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="audio-prefetch")
+    
+    try:
+        for item in islice(iterator, prefetch_depth):
+            pending.append(executor.submit(load_fn, item))
+        
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(iterator, 1):
+                pending.append(executor.submit(load_fn, item))
+            yield result
+            
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
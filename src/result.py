@@ -0,0 +1,154 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+FIELDS = (
+    "text", "language", "duration", "timings", "token_count", "truncated", "token_budget", "segments", "cached"
+)
+
+
+class TranscriptionResult:
+    """
+    Everything known about one transcription call.
+    
+    ``timings`` maps stage names (``resample``, ``decode_wait``,
+    ``model_forward``, ``resegment``, ``total``) to seconds spent on this
+    input; in a batch the shared model call is reported for every input in
+    it. ``token_count`` is the number of transcript tokens generated, and
+    ``truncated`` is True when generation ran into ``token_budget``, the
+    ``max_new_tokens`` cap it ran with (all None when unknown, e.g. for
+    cached results or models without a tokenizer). ``segments`` is above 1
+    when a truncated transcription was retried in shorter pieces.
+    """
+    
+    __slots__ = FIELDS
+    
+    def __init__(
+        self,
+        text: str,
+        language: Optional[str] = None,
+        duration: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+        token_count: Optional[int] = None,
+        truncated: Optional[bool] = None,
+        token_budget: Optional[int] = None,
+        segments: int = 1,
+        cached: bool = False
+    ):
+        self.text = text
+        self.language = language
+        self.duration = duration
+        self.timings = timings if timings is not None else {}
+        self.token_count = token_count
+        self.truncated = truncated
+        self.token_budget = token_budget
+        self.segments = segments
+        self.cached = cached
+    
+    def __str__(self) -> str:
+        return self.text
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in FIELDS)
+        return f"TranscriptionResult({fields})"
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TranscriptionResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the result as a JSON-serializable dict (timings in milliseconds).
+        """
+        return {
+            "text": self.text,
+            "language": self.language,
+            "duration": self.duration,
+            "timings_ms": {stage: round(seconds * 1000.0, 2) for stage, seconds in self.timings.items()},
+            "token_count": self.token_count,
+            "truncated": self.truncated,
+            "token_budget": self.token_budget,
+            "segments": self.segments,
+            "cached": self.cached,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TranscriptionResult":
+        """
+        Rebuild a result from ``to_dict`` output; unknown keys are ignored.
+        """
+        return cls(
+            data["text"],
+            language=data.get("language"),
+            duration=data.get("duration"),
+            timings={stage: ms / 1000.0 for stage, ms in (data.get("timings_ms") or {}).items()},
+            token_count=data.get("token_count"),
+            truncated=data.get("truncated"),
+            token_budget=data.get("token_budget"),
+            segments=data.get("segments", 1),
+            cached=data.get("cached", False),
+        )
+
+
+class TranscriptionText(str):
+    """
+    Transcribed text that also carries its ``TranscriptionResult``.
+    
+    This is what the pipeline returns, so callers treating transcriptions as
+    plain strings keep working. The structured fields are available as
+    ``.result`` or directly (``text.language``, ``text.truncated``, ...).
+    String methods such as ``strip`` return plain ``str``.
+    """
+    
+    def __new__(cls, result: TranscriptionResult) -> "TranscriptionText":
+        text = super().__new__(cls, result.text)
+        text.result = result
+        return text
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names str does not define
+        if name in FIELDS:
+            return getattr(self.__dict__["result"], name)
+        raise AttributeError(f"'TranscriptionText' object has no attribute {name!r}")
+    
+    def __reduce__(self):
+        return TranscriptionText, (self.result,)
+
+
+def as_result(text: Union[str, TranscriptionResult]) -> TranscriptionResult:
+    """
+    Return the result attached to a transcription, or wrap plain text in one.
+    """
+    if isinstance(text, TranscriptionResult):
+        return text
+    result = getattr(text, "result", None)
+    return result if isinstance(result, TranscriptionResult) else TranscriptionResult(str(text))
+
+
+def results_to_jsonl(
+    results: Iterable[Union[str, TranscriptionResult]],
+    sources: Optional[Sequence[str]] = None,
+    spans: Optional[Sequence[Tuple[float, float]]] = None
+) -> str:
+    """
+    Serialize many transcriptions as JSON lines.
+    
+    Args:
+        results: ``TranscriptionText``, ``TranscriptionResult`` or plain strings
+        sources: Optional input name per result, stored as ``"source"``
+        spans: Optional ``(start, end)`` seconds per result within its
+              source (long-form segments), stored as ``"start"``/``"end"``
+        
+    Returns:
+        One JSON object per line, in input order
+    """
+    lines = []
+    for index, item in enumerate(results):
+        record = as_result(item).to_dict()
+        if spans is not None:
+            start, end = spans[index]
+            record = {"start": round(start, 3), "end": round(end, 3), **record}
+        if sources is not None:
+            record = {"source": str(sources[index]), **record}
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return "".join(line + "\n" for line in lines)
@@ -0,0 +1,455 @@
+import argparse
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from src.audio import TARGET_SAMPLE_RATE, decode_audio_bytes
+from src.precision import PRECISIONS
+from src.result import TranscriptionResult, TranscriptionText, as_result
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_REQUEST_BYTES = 100 * 1024 * 1024
+
+
+class PendingRequest:
+    """
+    One queued transcription request and its timing.
+    """
+    
+    __slots__ = ("audio", "language", "future", "enqueued_at", "queue_wait", "batch_size")
+    
+    def __init__(self, audio, language: Optional[str]):
+        self.audio = audio
+        self.language = language
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+        self.queue_wait = 0.0
+        self.batch_size = 0
+
+
+class RequestCoalescer:
+    """
+    Combines concurrent transcription requests into dynamic model batches.
+    
+    A single worker thread owns the pipeline. It takes the oldest queued
+    request, then keeps collecting until ``max_batch_size`` requests are in
+    hand or ``max_wait_ms`` has passed since that first request arrived,
+    and runs them through ``transcribe_batch`` together. Raising the wait
+    trades per-request latency for larger, more efficient batches. If a
+    batch fails, its requests are retried one by one so a single bad input
+    only fails its own request.
+    """
+    
+    def __init__(self, pipeline, max_batch_size: int = 16, max_wait_ms: float = 20.0):
+        """
+        Configure the coalescer.
+        
+        Args:
+            pipeline: Object exposing ``transcribe_batch`` (e.g. QwenASRPipeline)
+            max_batch_size: Maximum number of requests per model call
+            max_wait_ms: Longest time the first request of a batch waits for company
+        """
+        self.pipeline = pipeline
+        self.metrics = getattr(pipeline, "metrics", None)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        
+        self.requests = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self._queue_waits = deque(maxlen=10000)
+        self._batch_sizes = deque(maxlen=10000)
+        
+        self._queue: "queue.Queue[Optional[PendingRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """
+        Start the batching worker thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="asr-coalescer", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """
+        Finish queued requests and stop the worker thread.
+        """
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+    
+    def submit(self, audio, language: Optional[str] = None) -> PendingRequest:
+        """
+        Queue one input for transcription.
+        
+        Args:
+            audio: Any input accepted by ``transcribe_batch``
+            language: Optional language hint
+        
+        Returns:
+            Pending request; ``request.future.result()`` yields the text
+        """
+        request = PendingRequest(audio, language)
+        self._queue.put(request)
+        return request
+    
+    def stats(self) -> dict:
+        """
+        Return request, batch and queue-wait metrics.
+        """
+        waits_ms = np.array(self._queue_waits) * 1000.0
+        sizes = np.array(self._batch_sizes)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "queued": self._queue.qsize(),
+            "mean_batch_size": float(sizes.mean()) if sizes.size else 0.0,
+            "queue_wait_p50_ms": float(np.percentile(waits_ms, 50)) if waits_ms.size else 0.0,
+            "queue_wait_p95_ms": float(np.percentile(waits_ms, 95)) if waits_ms.size else 0.0,
+        }
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            
+            batch = [first]
+            deadline = first.enqueued_at + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            
+            self._process(batch)
+    
+    def _process(self, batch: List[PendingRequest]):
+        # Requests cancelled while queued (e.g. an asyncio timeout) are dropped
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        
+        started = time.monotonic()
+        for request in batch:
+            request.queue_wait = started - request.enqueued_at
+            request.batch_size = len(batch)
+            self._queue_waits.append(request.queue_wait)
+            if self.metrics is not None:
+                self.metrics.observe("queue_wait", request.queue_wait)
+        self._batch_sizes.append(len(batch))
+        self.requests += len(batch)
+        self.batches += 1
+        
+        try:
+            texts = self.pipeline.transcribe_batch(
+                [request.audio for request in batch],
+                languages=[request.language for request in batch],
+                batch_size=len(batch),
+            )
+        except Exception as e:
+            self.failed_batches += 1
+            if len(batch) == 1:
+                logger.error(f"Request failed: {str(e)}")
+                batch[0].future.set_exception(e)
+                return
+            logger.warning(f"Batch of {len(batch)} requests failed ({e}); retrying them one by one")
+            for request in batch:
+                self._process_single(request)
+            return
+        
+        for request, text in zip(batch, texts):
+            request.future.set_result(text)
+    
+    def _process_single(self, request: PendingRequest):
+        try:
+            text = self.pipeline.transcribe_batch([request.audio], languages=[request.language], batch_size=1)[0]
+        except Exception as e:
+            logger.error(f"Request failed: {str(e)}")
+            request.future.set_exception(e)
+            return
+        request.future.set_result(text)
+
+
+def make_handler(
+    coalescer: RequestCoalescer,
+    request_timeout: float = 600.0,
+    max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES
+):
+    """
+    Build the HTTP request handler class bound to a coalescer.
+    
+    A request that is not answered within ``request_timeout`` seconds gets a
+    504 and is cancelled, so it never reaches the model if it is still
+    queued. Bodies larger than ``max_request_bytes`` are refused with a 413
+    before they are read.
+    
+    Endpoints:
+        POST /transcribe[?language=English]  body: encoded audio file bytes
+        GET  /health
+        GET  /stats
+        GET  /metrics         Prometheus text format (per-stage latency, real-time factor)
+        GET  /metrics.json
+    """
+    metrics = coalescer.metrics
+    
+    class ASRRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(200, coalescer.stats())
+            elif metrics is not None and self.path == "/metrics":
+                self._send(200, metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            elif metrics is not None and self.path == "/metrics.json":
+                self._send(200, metrics.to_json().encode("utf-8"), "application/json")
+            else:
+                self._send_json(404, {"error": f"Unknown path: {self.path}"})
+        
+        def do_POST(self):
+            url = urllib.parse.urlparse(self.path)
+            if url.path != "/transcribe":
+                self._send_json(404, {"error": f"Unknown path: {url.path}"})
+                return
+            
+            language = urllib.parse.parse_qs(url.query).get("language", [None])[0]
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0 or length > max_request_bytes:
+                # The body stays unread, so the connection cannot be reused
+                self.close_connection = True
+                if length < 0:
+                    self._send_json(400, {"error": "Invalid Content-Length"})
+                else:
+                    self._send_json(413, {"error": f"Request body of {length} bytes exceeds {max_request_bytes} bytes"})
+                return
+            body = self.rfile.read(length)
+            
+            try:
+                decode_start = time.perf_counter()
+                waveform = decode_audio_bytes(body)
+                if metrics is not None:
+                    metrics.observe("decode", time.perf_counter() - decode_start)
+            except Exception as e:
+                self._send_json(400, {"error": f"Could not decode audio: {str(e)}"})
+                return
+            
+            request = coalescer.submit((waveform, TARGET_SAMPLE_RATE), language)
+            try:
+                text = request.future.result(timeout=request_timeout)
+            except TimeoutError:
+                request.future.cancel()
+                self._send_json(504, {"error": f"Transcription did not finish within {request_timeout:.0f}s"})
+                return
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            
+            self._send_json(200, {
+                **as_result(text).to_dict(),
+                "queue_ms": request.queue_wait * 1000.0,
+                "batch_size": request.batch_size,
+            })
+        
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+        
+        def _send_json(self, status: int, payload: dict):
+            self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+        
+        def _send(self, status: int, data: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+    return ASRRequestHandler
+
+
+class _ThreadingASRHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops bursts of concurrent connections
+    request_queue_size = 128
+
+
+class ASRServer:
+    """
+    Long-running local HTTP server wrapping one loaded pipeline.
+    """
+    
+    def __init__(
+        self,
+        pipeline,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 20.0,
+        request_timeout: float = 600.0,
+        max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES
+    ):
+        """
+        Create the server (not yet listening for requests).
+        
+        Args:
+            pipeline: Object exposing ``transcribe_batch``
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            max_batch_size: Maximum number of requests per model call
+            max_wait_ms: Longest time a request waits for a batch to fill
+            request_timeout: Seconds before an unanswered request gets a 504 and is cancelled
+            max_request_bytes: Largest accepted upload
+        """
+        self.coalescer = RequestCoalescer(pipeline, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.httpd = _ThreadingASRHTTPServer(
+            (host, port),
+            make_handler(self.coalescer, request_timeout=request_timeout, max_request_bytes=max_request_bytes)
+        )
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def serve_forever(self):
+        """
+        Serve requests until ``shutdown`` is called.
+        """
+        self.coalescer.start()
+        logger.info(f"ASR server listening on {self.url}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.coalescer.stop()
+            self.httpd.server_close()
+    
+    def shutdown(self):
+        """
+        Stop serving; safe to call from another thread.
+        """
+        self.httpd.shutdown()
+
+
+class ASRClient:
+    """
+    Minimal client for ``ASRServer``.
+    """
+    
+    def __init__(self, url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: float = 600.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+    
+    def transcribe(self, audio: Union[str, Path, bytes], language: Optional[str] = None) -> TranscriptionText:
+        """
+        Send an audio file to the server and return the transcription.
+        
+        Args:
+            audio: Path to an audio file, or its encoded bytes
+            language: Optional language hint
+        
+        Returns:
+            Transcribed text, with the server's ``TranscriptionResult`` as ``.result``
+        """
+        data = audio if isinstance(audio, bytes) else Path(audio).read_bytes()
+        query = f"?{urllib.parse.urlencode({'language': language})}" if language else ""
+        request = urllib.request.Request(
+            f"{self.url}/transcribe{query}",
+            data=data,
+            headers={"Content-Type": "application/octet-stream"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return TranscriptionText(TranscriptionResult.from_dict(json.loads(response.read())))
+    
+    def stats(self) -> dict:
+        """
+        Return the server's batching statistics.
+        """
+        with urllib.request.urlopen(f"{self.url}/stats", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def main():
+    """
+    Load the model once and serve transcription requests.
+    """
+    parser = argparse.ArgumentParser(description="Persistent Qwen3-ASR transcription server")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to bind (default: {DEFAULT_PORT})")
+    parser.add_argument("--model-path", type=str, default="Qwen/Qwen3-ASR-0.6B", help="HuggingFace model identifier or local path")
+    parser.add_argument("--device", type=str, default=None, help="Device to run inference on (default: auto)")
+    parser.add_argument("--precision", choices=PRECISIONS, default=None, help="Weight format: fp32, bf16 or int8-dynamic (default: bf16 on CUDA, fp32 on CPU)")
+    parser.add_argument("--max-batch-size", type=int, default=16, help="Maximum requests per model batch (default: 16)")
+    parser.add_argument("--max-new-tokens", type=int, default=256, help="Ceiling of the per-batch token budget (default: 256)")
+    parser.add_argument("--tokens-per-second", type=float, default=10.0, help="Token budget per second of audio; 0 always allows --max-new-tokens (default: 10)")
+    parser.add_argument("--max-wait-ms", type=float, default=20.0, help="Maximum time a request waits for a batch to fill (default: 20)")
+    parser.add_argument("--request-timeout", type=float, default=600.0, help="Seconds before an unanswered request is cancelled with a 504 (default: 600)")
+    parser.add_argument("--max-request-mb", type=float, default=100.0, help="Largest accepted upload in MB (default: 100)")
+    parser.add_argument("--warmup-seconds", type=float, default=5.0, help="Clip length used to warm up the model (default: 5)")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip warm-up; the first requests pay for lazy initialization")
+    args = parser.parse_args()
+    
+    from src.inference import QwenASRPipeline
+    
+    warmup_shapes = None
+    if not args.no_warmup:
+        warmup_shapes = [(1, args.warmup_seconds), (args.max_batch_size, args.warmup_seconds)]
+    
+    pipeline = QwenASRPipeline(
+        model_name=args.model_path,
+        device=args.device,
+        max_inference_batch_size=args.max_batch_size,
+        max_new_tokens=args.max_new_tokens,
+        tokens_per_second=args.tokens_per_second or None,
+        warmup_shapes=warmup_shapes,
+        precision=args.precision
+    )
+    server = ASRServer(
+        pipeline,
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        request_timeout=args.request_timeout,
+        max_request_bytes=int(args.max_request_mb * 1024 * 1024)
+    )
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down ASR server")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    main()
@@ -0,0 +1,228 @@
+import logging
+import re
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from src.audio import TARGET_SAMPLE_RATE, StreamingResampler
+from src.language import LanguageTracker
+from src.result import TranscriptionResult, as_result
+from src.vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+_NORMALIZE_PATTERN = re.compile(r"[^\w']+")
+
+
+class StreamingHypothesis(NamedTuple):
+    """
+    Text emitted by the streaming transcriber.
+    
+    Final hypotheses carry newly committed text that will not change again;
+    partial hypotheses carry the current uncommitted tail, which later
+    windows may still revise. ``language`` is the language of the window
+    that produced the hypothesis, when known, and ``result`` is that
+    window's ``TranscriptionResult`` (None when a silent window closed the
+    utterance).
+    """
+    text: str
+    is_final: bool
+    audio_end: float
+    language: Optional[str] = None
+    result: Optional[TranscriptionResult] = None
+
+
+def _normalize(word: str) -> str:
+    return _NORMALIZE_PATTERN.sub("", word.lower())
+
+
+def stitch_words(
+    committed_tail: List[str],
+    new_words: List[str],
+    overlap_ratio: float,
+    min_match_words: int = 2
+) -> tuple:
+    """
+    Merge the words of a new window into the uncommitted tail of the transcript.
+    
+    The longest run of words shared by the tail and the new window (compared
+    case- and punctuation-insensitively) marks the seam. Words before the
+    seam come from the tail; from the seam on, the new window wins, since
+    words at the end of the previous window were cut mid-utterance. Without
+    a usable match, the estimated overlap share of the new window is dropped.
+    
+    Args:
+        committed_tail: Uncommitted words of the transcript so far
+        new_words: Words transcribed from the new window
+        overlap_ratio: Fraction of the new window that overlaps the previous one
+        min_match_words: Shortest shared run accepted as a seam
+        
+    Returns:
+        ``(merged_tail, stable_count)`` where the first ``stable_count`` words
+        of ``merged_tail`` precede the seam and can be committed
+    """
+    if not committed_tail:
+        return list(new_words), 0
+    
+    matcher = SequenceMatcher(
+        None,
+        [_normalize(w) for w in committed_tail],
+        [_normalize(w) for w in new_words],
+        autojunk=False,
+    )
+    match = matcher.find_longest_match(0, len(committed_tail), 0, len(new_words))
+    
+    if match.size >= min(min_match_words, len(new_words)) and match.size > 0:
+        return committed_tail[:match.a] + new_words[match.b:], match.a
+    
+    skip = int(round(len(new_words) * overlap_ratio))
+    return committed_tail + new_words[skip:], len(committed_tail)
+
+
+class StreamingTranscriber:
+    """
+    Overlapping-window streaming transcription.
+    
+    Audio is fed in arbitrary pieces. Every ``hop_seconds`` a window of
+    ``window_seconds`` is transcribed and stitched into the running
+    transcript, so words cut at one window's edge are recovered whole from
+    the next. Commitment never moves backwards, which is exact when
+    ``hop_seconds >= window_seconds / 2``.
+    
+    Audio at other rates is resampled to 16 kHz as it is fed, so each
+    sample is filtered once rather than once per overlapping window.
+    """
+    
+    def __init__(
+        self,
+        pipeline,
+        window_seconds: float = 5.0,
+        hop_seconds: float = 2.5,
+        sampling_rate: int = 16000,
+        language: Optional[str] = None,
+        vad: Optional[VoiceActivityDetector] = None,
+        language_tracker: Optional[LanguageTracker] = None
+    ):
+        """
+        Initialize the streaming transcriber.
+        
+        Args:
+            pipeline: Object exposing ``transcribe_numpy`` (e.g. QwenASRPipeline)
+            window_seconds: Length of each transcribed window
+            hop_seconds: Distance between window starts (<= window_seconds)
+            sampling_rate: Sample rate of the fed audio
+            language: Optional language hint passed to the pipeline
+            vad: Optional voice activity detector; silent windows are skipped
+                and close the current utterance
+            language_tracker: Tracker that detects the stream's language once and
+                             pins it for later windows (default: a new one seeded
+                             with ``language``); survives ``reset``
+        """
+        if not 0 < hop_seconds <= window_seconds:
+            raise ValueError(f"hop_seconds must be in (0, window_seconds], got {hop_seconds}")
+        
+        self.pipeline = pipeline
+        self.window_seconds = window_seconds
+        self.hop_seconds = hop_seconds
+        self.sampling_rate = sampling_rate
+        self.language = language
+        self.vad = vad
+        self.language_tracker = language_tracker or LanguageTracker(hint=language)
+        
+        # Windows are cut from the 16 kHz buffer
+        self.window_samples = int(window_seconds * TARGET_SAMPLE_RATE)
+        self.hop_samples = int(hop_seconds * TARGET_SAMPLE_RATE)
+        self._resampler = StreamingResampler(sampling_rate, TARGET_SAMPLE_RATE)
+        self.overlap_ratio = 1.0 - hop_seconds / window_seconds
+        
+        self.reset()
+    
+    def reset(self):
+        """
+        Discard buffered audio and transcript state.
+        """
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0
+        self._processed_until = 0
+        self._resampler.reset()
+        self._tail: List[str] = []
+        self._committed: List[str] = []
+    
+    @property
+    def text(self) -> str:
+        """
+        Full transcript so far, committed and uncommitted.
+        """
+        return " ".join(self._committed + self._tail)
+    
+    def feed(self, audio: np.ndarray) -> List[StreamingHypothesis]:
+        """
+        Add audio and transcribe every window that became complete.
+        
+        Args:
+            audio: Mono samples at ``sampling_rate``
+            
+        Returns:
+            Hypotheses emitted while processing, in order
+        """
+        self._buffer = np.concatenate([self._buffer, self._resampler.process(audio)])
+        
+        hypotheses: List[StreamingHypothesis] = []
+        while len(self._buffer) >= self.window_samples:
+            hypotheses.extend(self._process_window(self._buffer[:self.window_samples]))
+            self._buffer = self._buffer[self.hop_samples:]
+            self._buffer_start += self.hop_samples
+        return hypotheses
+    
+    def finish(self) -> List[StreamingHypothesis]:
+        """
+        Transcribe any audio not yet covered by a window and commit everything.
+        
+        Returns:
+            Remaining hypotheses, ending with a final one
+        """
+        self._buffer = np.concatenate([self._buffer, self._resampler.flush()])
+        hypotheses: List[StreamingHypothesis] = []
+        if self._buffer_start + len(self._buffer) > self._processed_until:
+            hypotheses.extend(self._process_window(self._buffer))
+        
+        hypotheses.extend(self._commit(len(self._tail)))
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = self._processed_until
+        return hypotheses
+    
+    def _process_window(self, window: np.ndarray) -> List[StreamingHypothesis]:
+        self._processed_until = self._buffer_start + len(window)
+        
+        if self.vad is not None and self.vad.detect(window, TARGET_SAMPLE_RATE) is None:
+            logger.debug("Silent window, closing utterance")
+            return self._commit(len(self._tail))
+        
+        result = as_result(self.pipeline.transcribe_numpy(
+            window, TARGET_SAMPLE_RATE, language_tracker=self.language_tracker
+        ))
+        new_words = result.text.split()
+        if not new_words:
+            return self._commit(len(self._tail), result)
+        
+        self._tail, stable = stitch_words(self._tail, new_words, self.overlap_ratio)
+        hypotheses = self._commit(stable, result)
+        hypotheses.append(StreamingHypothesis(
+            " ".join(self._tail), False, self._audio_end(), self._language(), result
+        ))
+        return hypotheses
+    
+    def _commit(self, count: int, result: Optional[TranscriptionResult] = None) -> List[StreamingHypothesis]:
+        if count <= 0:
+            return []
+        words, self._tail = self._tail[:count], self._tail[count:]
+        self._committed.extend(words)
+        return [StreamingHypothesis(" ".join(words), True, self._audio_end(), self._language(), result)]
+    
+    def _audio_end(self) -> float:
+        return self._processed_until / TARGET_SAMPLE_RATE
+    
+    def _language(self) -> Optional[str]:
+        last = self.language_tracker.last
+        return self.language_tracker.language or (last.language if last is not None else None)
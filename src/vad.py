@@ -0,0 +1,111 @@
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    """
+    Interface for voice activity detectors used to gate audio before inference.
+    
+    Implementations return the sample span that contains speech, so callers
+    can both drop silent audio and trim leading/trailing silence.
+    """
+    
+    def detect(self, audio: np.ndarray, sampling_rate: int) -> Optional[Tuple[int, int]]:
+        """
+        Locate speech in a mono buffer.
+        
+        Args:
+            audio: Mono audio samples (float in [-1, 1] or int16)
+            sampling_rate: Sample rate of the audio
+            
+        Returns:
+            ``(start, end)`` sample indices of the voiced region, or None if
+            the buffer contains no speech
+        """
+        raise NotImplementedError
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """
+    Frame energy / zero-crossing-rate voice activity detector.
+    
+    A frame counts as speech when its RMS level is above
+    ``energy_threshold_db``, or when it is within ``zcr_margin_db`` of the
+    threshold and has a high zero-crossing rate (unvoiced consonants such as
+    "s" and "f" are quiet but noisy). All frames are scored at once with
+    NumPy, so the cost is a few passes over the buffer.
+    """
+    
+    def __init__(
+        self,
+        frame_ms: float = 30.0,
+        energy_threshold_db: float = -45.0,
+        zcr_threshold: float = 0.25,
+        zcr_margin_db: float = 10.0,
+        min_speech_ms: float = 150.0,
+        padding_ms: float = 200.0
+    ):
+        """
+        Configure the detector.
+        
+        Args:
+            frame_ms: Analysis frame length in milliseconds
+            energy_threshold_db: Frame RMS level (dBFS) above which a frame is speech
+            zcr_threshold: Zero-crossing rate (crossings per sample) marking unvoiced speech
+            zcr_margin_db: How far below the energy threshold high-ZCR frames still count
+            min_speech_ms: Minimum total speech required to treat a buffer as voiced
+            padding_ms: Audio kept before the first and after the last speech frame
+        """
+        self.frame_ms = frame_ms
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_threshold = zcr_threshold
+        self.zcr_margin_db = zcr_margin_db
+        self.min_speech_ms = min_speech_ms
+        self.padding_ms = padding_ms
+    
+    def speech_frames(self, audio: np.ndarray, sampling_rate: int) -> np.ndarray:
+        """
+        Classify each analysis frame as speech or non-speech.
+        
+        Args:
+            audio: Mono audio samples (float in [-1, 1] or int16)
+            sampling_rate: Sample rate of the audio
+            
+        Returns:
+            Boolean array with one entry per frame (a trailing partial frame
+            is included)
+        """
+        frame_len = max(1, int(sampling_rate * self.frame_ms / 1000.0))
+        num_frames = -(-len(audio) // frame_len)
+        if num_frames == 0:
+            return np.zeros(0, dtype=bool)
+        
+        samples = audio.astype(np.float32) / 32768.0 if audio.dtype == np.int16 else audio
+        frames = np.zeros(num_frames * frame_len, dtype=np.float32)
+        frames[:len(samples)] = samples
+        frames = frames.reshape(num_frames, frame_len)
+        
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+        
+        loud = energy_db > self.energy_threshold_db
+        fricative = (energy_db > self.energy_threshold_db - self.zcr_margin_db) & (zcr > self.zcr_threshold)
+        return loud | fricative
+    
+    def detect(self, audio: np.ndarray, sampling_rate: int) -> Optional[Tuple[int, int]]:
+        speech = self.speech_frames(audio, sampling_rate)
+        frame_len = max(1, int(sampling_rate * self.frame_ms / 1000.0))
+        
+        if np.count_nonzero(speech) * self.frame_ms < self.min_speech_ms:
+            return None
+        
+        voiced = np.flatnonzero(speech)
+        padding = int(sampling_rate * self.padding_ms / 1000.0)
+        start = max(0, voiced[0] * frame_len - padding)
+        end = min(len(audio), (voiced[-1] + 1) * frame_len + padding)
+        return int(start), int(end)
@@ -0,0 +1,444 @@
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Environment variables read by the BLAS/OpenMP runtimes when torch is imported
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _worker_main(
+    worker_id: int,
+    num_threads: int,
+    pipeline_kwargs: Dict[str, Any],
+    model_factory: Optional[Callable[[], Any]],
+    cache_options: Optional[Dict[str, Any]],
+    tasks: Connection,
+    results: Connection
+):
+    """
+    Entry point of one worker process: load a pipeline, then serve tasks until a None sentinel.
+    
+    Tasks arrive on the worker's own ``tasks`` pipe, one at a time, so the
+    parent always knows which task a worker holds. Messages sent on
+    ``results`` are ``(kind, worker_id, task_id, payload)`` tuples with kind
+    ``ready``, ``load_failed``, ``done`` or ``failed``. Sends on a pipe are
+    synchronous, so a result is never lost when the process dies afterwards.
+    """
+    # Must be set before torch is imported so the runtimes size their pools
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(num_threads)
+    
+    try:
+        from src.cache import TranscriptionCache
+        from src.inference import QwenASRPipeline
+        
+        logging.getLogger("src.inference").setLevel(logging.WARNING)
+        
+        cache = TranscriptionCache(**cache_options) if cache_options else None
+        model = model_factory() if model_factory is not None else None
+        if model is None:
+            import torch
+            torch.set_num_threads(num_threads)
+        pipeline = QwenASRPipeline(model=model, cache=cache, **pipeline_kwargs)
+    except Exception as e:
+        results.send(("load_failed", worker_id, None, f"{type(e).__name__}: {e}"))
+        return
+    
+    results.send(("ready", worker_id, None, pipeline.load_profile))
+    
+    while True:
+        try:
+            task = tasks.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        task_id, items, languages, options = task
+        try:
+            texts = pipeline.transcribe_batch(items, languages=languages, **options)
+        except Exception as e:
+            results.send(("failed", worker_id, task_id, f"{type(e).__name__}: {e}"))
+        else:
+            results.send(("done", worker_id, task_id, texts))
+    
+    if cache is not None:
+        cache.close()
+
+
+class WorkerPool:
+    """
+    Pool of worker processes, each with its own model and CPU thread budget.
+    
+    A single process rarely keeps every core busy on CPU: torch's intra-op
+    parallelism flattens out and decoding, padding and post-processing run
+    under the GIL. The pool splits the cores between ``num_workers``
+    processes (``torch.set_num_threads`` per worker), hands chunks of
+    inputs to whichever worker is idle and reassembles the results in input
+    order. A worker that dies is restarted and its chunk is retried; a
+    chunk that runs longer than ``task_timeout`` fails the call and its
+    worker is replaced.
+    
+    Workers are spawned (not forked), so ``model_factory`` must be picklable,
+    e.g. a module-level function or class.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "Qwen/Qwen3-ASR-0.6B",
+        num_workers: int = 2,
+        threads_per_worker: Optional[int] = None,
+        max_inference_batch_size: int = 32,
+        max_new_tokens: int = 256,
+        tokens_per_second: Optional[float] = 10.0,
+        resegment_depth: int = 1,
+        cache_path: Optional[str] = None,
+        cache_max_disk_bytes: Optional[int] = None,
+        model_factory: Optional[Callable[[], Any]] = None,
+        max_task_retries: int = 1,
+        startup_timeout: float = 600.0,
+        task_timeout: Optional[float] = 3600.0,
+        precision: Optional[str] = None
+    ):
+        """
+        Configure the pool (call ``start`` or use it as a context manager).
+        
+        Args:
+            model_name: Hugging Face model identifier or local path
+            num_workers: Number of worker processes
+            threads_per_worker: torch threads per worker. Defaults to the
+                               available cores divided evenly between workers.
+            max_inference_batch_size: Maximum batch size for inference
+            max_new_tokens: Maximum number of tokens to generate
+            tokens_per_second: Token budget per second of audio (see ``QwenASRPipeline``)
+            resegment_depth: Retry levels for truncated transcriptions
+            cache_path: Optional transcription cache database shared by all workers
+            cache_max_disk_bytes: Size budget of the shared cache
+            model_factory: Optional picklable callable returning a model object
+                          (e.g. a stub backend); each worker calls it instead
+                          of loading weights
+            max_task_retries: How often a chunk is retried after its worker died
+            startup_timeout: Seconds to wait for all workers to load their model
+            task_timeout: Seconds one chunk may run before its worker is
+                         considered hung (None: wait forever)
+            precision: Weight format of each worker's model (see ``QwenASRPipeline``)
+        """
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.max_inference_batch_size = max_inference_batch_size
+        self.max_task_retries = max_task_retries
+        self.startup_timeout = startup_timeout
+        self.task_timeout = task_timeout
+        self.device = "cpu"
+        self.metrics = MetricsRegistry()
+        self.restarts = 0
+        
+        self._pipeline_kwargs = {
+            "model_name": model_name,
+            "device": "cpu",
+            "max_inference_batch_size": max_inference_batch_size,
+            "max_new_tokens": max_new_tokens,
+            "tokens_per_second": tokens_per_second,
+            "resegment_depth": resegment_depth,
+            "precision": precision,
+        }
+        self._model_factory = model_factory
+        self._cache_options = None
+        if cache_path:
+            self._cache_options = {"path": cache_path}
+            if cache_max_disk_bytes is not None:
+                self._cache_options["max_disk_bytes"] = cache_max_disk_bytes
+        
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * num_workers
+        self._connections: List[Optional[Connection]] = [None] * num_workers
+        self._task_connections: List[Optional[Connection]] = [None] * num_workers
+        self._ready = [False] * num_workers
+        # Task each worker is working on, with the time it was handed over
+        self._assigned: List[Optional[Tuple[tuple, float]]] = [None] * num_workers
+        self._pending: Deque[tuple] = deque()
+        self._next_task_id = 0
+    
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def start(self):
+        """
+        Launch the workers and wait until every one has loaded its model.
+        """
+        logger.info(
+            f"Starting {self.num_workers} workers with {self.threads_per_worker} threads each"
+        )
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+        
+        deadline = time.monotonic() + self.startup_timeout
+        ready = set()
+        while len(ready) < self.num_workers:
+            if time.monotonic() > deadline:
+                self.close()
+                raise TimeoutError(f"Workers not ready after {self.startup_timeout}s")
+            
+            for kind, worker_id, _, payload in self._receive(timeout=0.5):
+                if kind == "load_failed":
+                    self.close()
+                    raise RuntimeError(f"Worker {worker_id} failed to load the model: {payload}")
+                if kind == "ready":
+                    ready.add(worker_id)
+                    self._ready[worker_id] = True
+                    logger.info(f"Worker {worker_id} ready (load {payload.get('total_s', 0.0):.2f}s)")
+            
+            for worker_id, process in enumerate(self._processes):
+                if worker_id not in ready and not process.is_alive():
+                    self.close()
+                    raise RuntimeError(f"Worker {worker_id} exited during startup (code {process.exitcode})")
+    
+    def close(self, timeout: float = 30.0):
+        """
+        Stop the workers after they finish their current chunk.
+        
+        Args:
+            timeout: Seconds to wait for each worker before terminating it
+        """
+        for worker_id, process in enumerate(self._processes):
+            if process is not None and process.is_alive():
+                try:
+                    self._task_connections[worker_id].send(None)
+                except OSError:
+                    pass
+        for worker_id, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {worker_id} did not stop; terminating it")
+                process.terminate()
+                process.join()
+            self._close_connections(worker_id)
+            self._processes[worker_id] = None
+        self._pending.clear()
+    
+    def transcribe_batch(
+        self,
+        paths_or_arrays: Sequence[Any],
+        languages: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        batch_size: Optional[int] = None,
+        on_chunk: Optional[Callable[[int, Union[List[str], Exception]], None]] = None,
+        **batch_options
+    ) -> List[Optional[str]]:
+        """
+        Transcribe many inputs across the workers.
+        
+        Inputs are split into chunks of ``batch_size``, each handed to the
+        next idle worker, so faster workers take more chunks.
+        Each worker runs ``QwenASRPipeline.transcribe_batch`` on its chunk.
+        
+        Args:
+            paths_or_arrays: Inputs accepted by ``QwenASRPipeline.transcribe_batch``
+            languages: Optional language hint shared by all inputs, or one per input
+            batch_size: Inputs per chunk. Defaults to ``max_inference_batch_size``.
+            on_chunk: Called as ``on_chunk(offset, texts)`` as each chunk
+                     finishes, in completion order. A chunk that raised in
+                     its worker is reported as ``on_chunk(offset, error)``
+                     instead of failing the call, and its results are None.
+            **batch_options: Passed to each worker's ``transcribe_batch``
+                            (e.g. ``max_batch_seconds``, ``decode_workers``)
+        
+        Returns:
+            Transcribed texts, in the same order as the inputs
+        """
+        items = list(paths_or_arrays)
+        if languages is None or isinstance(languages, str):
+            language_hints = [languages] * len(items)
+        else:
+            language_hints = list(languages)
+            if len(language_hints) != len(items):
+                raise ValueError(f"Got {len(language_hints)} language hints for {len(items)} inputs")
+        
+        batch_size = batch_size or self.max_inference_batch_size
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        
+        chunks: Dict[int, tuple] = {}
+        for offset in range(0, len(items), batch_size):
+            task_id = self._next_task_id
+            self._next_task_id += 1
+            task = (
+                task_id,
+                items[offset:offset + batch_size],
+                language_hints[offset:offset + batch_size],
+                dict(batch_options, batch_size=batch_size),
+            )
+            chunks[task_id] = (offset, task, time.perf_counter())
+            self._pending.append(task)
+        
+        logger.info(f"Dispatched {len(items)} inputs in {len(chunks)} chunks to {self.num_workers} workers")
+        
+        transcriptions: List[Optional[str]] = [None] * len(items)
+        retries: Dict[int, int] = {}
+        remaining = set(chunks)
+        
+        try:
+            self._dispatch()
+            while remaining:
+                for kind, worker_id, task_id, payload in self._receive(timeout=0.5):
+                    if kind == "ready":
+                        self._ready[worker_id] = True
+                        logger.info(f"Worker {worker_id} restarted and ready")
+                        continue
+                    if kind == "load_failed":
+                        raise RuntimeError(f"Restarted worker {worker_id} failed to load the model: {payload}")
+                    # Results of an earlier, aborted call only free their worker
+                    self._assigned[worker_id] = None
+                    if task_id in remaining:
+                        offset, _, submitted = chunks[task_id]
+                        remaining.discard(task_id)
+                        if kind == "failed":
+                            error = RuntimeError(f"Worker {worker_id} failed: {payload}")
+                            if on_chunk is None:
+                                raise error
+                            on_chunk(offset, error)
+                            continue
+                        transcriptions[offset:offset + len(payload)] = payload
+                        self.metrics.observe("worker_task", time.perf_counter() - submitted)
+                        if on_chunk is not None:
+                            on_chunk(offset, payload)
+                
+                # Runs after _receive has drained everything the dead worker sent
+                self._recover_crashed(chunks, remaining, retries)
+                self._check_timeouts(chunks, remaining)
+                self._dispatch()
+        except BaseException:
+            # Drop chunks of the aborted call that have not started yet
+            self._pending.clear()
+            raise
+        
+        return transcriptions
+    
+    def _spawn(self, worker_id: int):
+        reader, writer = self._context.Pipe(duplex=False)
+        task_reader, task_writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                worker_id,
+                self.threads_per_worker,
+                self._pipeline_kwargs,
+                self._model_factory,
+                self._cache_options,
+                task_reader,
+                writer,
+            ),
+            name=f"asr-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        # Only the child keeps these ends, so its exit shows up as EOF
+        writer.close()
+        task_reader.close()
+        self._processes[worker_id] = process
+        self._connections[worker_id] = reader
+        self._task_connections[worker_id] = task_writer
+        self._ready[worker_id] = False
+        self._assigned[worker_id] = None
+    
+    def _close_connections(self, worker_id: int):
+        for connections in (self._connections, self._task_connections):
+            if connections[worker_id] is not None:
+                connections[worker_id].close()
+                connections[worker_id] = None
+    
+    def _restart(self, worker_id: int):
+        process = self._processes[worker_id]
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        self._close_connections(worker_id)
+        self.restarts += 1
+        self._spawn(worker_id)
+    
+    def _dispatch(self):
+        """
+        Hand pending chunks to idle workers, one chunk per worker.
+        """
+        for worker_id, connection in enumerate(self._task_connections):
+            if not self._pending:
+                return
+            if connection is None or not self._ready[worker_id] or self._assigned[worker_id] is not None:
+                continue
+            task = self._pending.popleft()
+            # Recorded before sending, so a worker dying at any point gives the chunk back
+            self._assigned[worker_id] = (task, time.monotonic())
+            try:
+                connection.send(task)
+            except OSError:
+                # Worker already gone; _recover_crashed requeues the chunk
+                pass
+    
+    def _receive(self, timeout: float) -> List[tuple]:
+        """
+        Return every message the workers have sent, waiting up to ``timeout`` for the first.
+        """
+        connections = [c for c in self._connections if c is not None]
+        messages = []
+        for connection in wait(connections, timeout):
+            try:
+                while connection.poll():
+                    messages.append(connection.recv())
+            except EOFError:
+                # Worker exited; _recover_crashed restarts it
+                pass
+        return messages
+    
+    def _recover_crashed(self, chunks: Dict[int, tuple], remaining: set, retries: Dict[int, int]):
+        """
+        Restart dead workers and requeue the chunk each one was working on.
+        """
+        for worker_id, process in enumerate(self._processes):
+            if process is None or process.is_alive():
+                continue
+            
+            held = self._assigned[worker_id]
+            logger.warning(f"Worker {worker_id} exited with code {process.exitcode}; restarting")
+            self._restart(worker_id)
+            
+            if held is None or held[0][0] not in remaining:
+                continue
+            task = held[0]
+            task_id = task[0]
+            retries[task_id] = retries.get(task_id, 0) + 1
+            if retries[task_id] > self.max_task_retries:
+                raise RuntimeError(
+                    f"Chunk starting at input {chunks[task_id][0]} crashed a worker "
+                    f"{retries[task_id]} times; giving up"
+                )
+            self._pending.appendleft(task)
+    
+    def _check_timeouts(self, chunks: Dict[int, tuple], remaining: set):
+        """
+        Replace workers stuck on one chunk for over ``task_timeout`` and fail the call.
+        """
+        if self.task_timeout is None:
+            return
+        now = time.monotonic()
+        for worker_id, held in enumerate(self._assigned):
+            if held is None or now - held[1] <= self.task_timeout:
+                continue
+            task_id = held[0][0]
+            logger.error(f"Worker {worker_id} spent {now - held[1]:.0f}s on one chunk; restarting it")
+            self._restart(worker_id)
+            if task_id in remaining:
+                raise TimeoutError(
+                    f"Chunk starting at input {chunks[task_id][0]} did not finish within {self.task_timeout}s"
+                )
@@ -0,0 +1,321 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import IO, List, NamedTuple, Optional, Union
+
+from src.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("text", "jsonl", "srt", "vtt")
+
+# How much of an existing SRT/VTT file is scanned for its last cue before appending
+RESUME_SCAN_BYTES = 64 * 1024
+CUE_PATTERN = re.compile(r"^(?:(\d+)\n)?(\d+:\d\d:\d\d[,.]\d{3}) --> (\d+:\d\d:\d\d[,.]\d{3})", re.MULTILINE)
+
+
+class TranscriptRecord(NamedTuple):
+    """
+    One transcribed chunk with its position in the audio stream.
+    """
+    text: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+    language: Optional[str] = None
+    latency: Optional[float] = None
+    created_at: Optional[float] = None
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """
+    Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT).
+    """
+    milliseconds = int(round(max(seconds, 0.0) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """
+    Parse an SRT (HH:MM:SS,mmm) or VTT (HH:MM:SS.mmm) timestamp into seconds.
+    """
+    hours, minutes, seconds = timestamp.replace(",", ".").split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def format_record(record: TranscriptRecord, output_format: str, index: int = 1) -> str:
+    """
+    Render one record in an output format.
+    
+    Args:
+        record: Transcribed chunk
+        output_format: One of ``FORMATS``
+        index: Cue number within the file (SRT only)
+        
+    Returns:
+        Text to append to the file
+    """
+    created_at = datetime.fromtimestamp(record.created_at if record.created_at is not None else time.time())
+    if output_format == "text":
+        return f"[{created_at.strftime('%Y-%m-%d %H:%M:%S')}] {record.text}\n"
+    if output_format == "jsonl":
+        return json.dumps({
+            "time": created_at.isoformat(timespec="milliseconds"),
+            "start": record.start,
+            "end": record.end,
+            "language": record.language,
+            "latency_ms": None if record.latency is None else round(record.latency * 1000.0, 1),
+            "text": record.text,
+        }, ensure_ascii=False) + "\n"
+        
+    start = record.start or 0.0
+    end = record.end if record.end is not None else start
+    if output_format == "srt":
+        return f"{index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{record.text}\n\n"
+    if output_format == "vtt":
+        return f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{record.text}\n\n"
+    raise ValueError(f"Unknown output format {output_format!r}; choose from {FORMATS}")
+
+
+class TranscriptWriter:
+    """
+    Appends transcripts to a file from a background thread.
+    
+    ``write`` only queues the record, so a slow disk or network mount never
+    blocks the caller. The writer thread drains everything queued within
+    ``flush_interval`` into a single write, fsyncs at most every
+    ``fsync_interval`` seconds, and rotates the file once it would exceed
+    ``max_bytes`` (``notes.txt`` -> ``notes.1.txt`` -> ``notes.2.txt`` ...,
+    keeping ``backup_count`` old files).
+    
+    Appending to an existing SRT/VTT file continues its cue numbering and
+    shifts the new cues past its last timestamp, so players still see one
+    ordered track.
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        output_format: str = "text",
+        flush_interval: float = 0.5,
+        fsync_interval: float = 5.0,
+        max_bytes: Optional[int] = None,
+        backup_count: int = 5,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Configure the writer; the thread starts on the first ``write``.
+        
+        Args:
+            path: Output file, appended to if it exists
+            output_format: One of ``FORMATS``
+            flush_interval: Longest time a record waits in memory before it is written
+            fsync_interval: Minimum seconds between fsyncs (0 fsyncs every write)
+            max_bytes: Rotate the file when it would grow past this size (default: never)
+            backup_count: Number of rotated files to keep
+            metrics: Optional registry; records the ``output_write`` and ``output_fsync`` stages
+        """
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}; choose from {FORMATS}")
+            
+        self.path = Path(path)
+        self.output_format = output_format
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.metrics = metrics
+        
+        self.records_written = 0
+        self.rotations = 0
+        self.write_errors = 0
+        
+        self._queue: "queue.Queue[Optional[TranscriptRecord]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._size = 0
+        self._cue_index = 0
+        self._time_offset: Optional[float] = None
+        self._last_fsync = 0.0
+    
+    def write(self, record: TranscriptRecord):
+        """
+        Queue a record for writing; returns immediately.
+        
+        Args:
+            record: Transcribed chunk (``created_at`` defaults to now)
+        """
+        if record.created_at is None:
+            record = record._replace(created_at=time.time())
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(record)
+    
+    def close(self):
+        """
+        Write everything still queued, fsync and stop the writer thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+    
+    def __enter__(self) -> "TranscriptWriter":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            batch = [] if first is None else [first]
+            stopping = first is None
+            
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping:
+                remaining = deadline - time.monotonic()
+                try:
+                    record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+                
+            if batch:
+                self._write_batch(batch)
+            self._sync(force=stopping)
+            
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _write_batch(self, batch: List[TranscriptRecord]):
+        start_time = time.perf_counter()
+        try:
+            self._open()
+            chunks = []
+            for record in batch:
+                if self._time_offset:
+                    record = record._replace(
+                        start=(record.start or 0.0) + self._time_offset,
+                        end=None if record.end is None else record.end + self._time_offset,
+                    )
+                self._cue_index += 1
+                chunk = format_record(record, self.output_format, self._cue_index)
+                if self.max_bytes and self._size and self._size + len(chunk.encode("utf-8")) > self.max_bytes:
+                    self._write(chunks)
+                    chunks = []
+                    self._rotate()
+                    self._cue_index = 1
+                    chunk = format_record(record, self.output_format, self._cue_index)
+                chunks.append(chunk)
+                self._size += len(chunk.encode("utf-8"))
+            self._write(chunks)
+            self.records_written += len(batch)
+        except OSError as e:
+            self.write_errors += 1
+            logger.error(f"Failed to write {len(batch)} transcripts to {self.path}: {str(e)}")
+            self._reset()
+        if self.metrics is not None:
+            self.metrics.observe("output_write", time.perf_counter() - start_time)
+    
+    def _write(self, chunks: List[str]):
+        if not chunks:
+            return
+        self._file.write("".join(chunks))
+        self._file.flush()
+    
+    def _open(self) -> IO[str]:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._time_offset is None:
+                self._resume_cues()
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+            if self._size == 0 and self.output_format == "vtt":
+                self._file.write("WEBVTT\n\n")
+                self._size = len("WEBVTT\n\n")
+        return self._file
+    
+    def _resume_cues(self):
+        """
+        Pick up the cue number and end time of the last cue in an existing SRT/VTT file.
+        """
+        self._time_offset = 0.0
+        if self.output_format not in ("srt", "vtt") or not self.path.exists():
+            return
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(max(0, f.seek(0, os.SEEK_END) - RESUME_SCAN_BYTES))
+                tail = f.read().decode("utf-8", errors="replace")
+        except OSError as e:
+            logger.error(f"Failed to read existing cues of {self.path}: {str(e)}")
+            return
+            
+        cues = CUE_PATTERN.findall(tail.replace("\r\n", "\n"))
+        if not cues:
+            return
+        if cues[-1][0]:
+            self._cue_index = int(cues[-1][0])
+        self._time_offset = max(parse_timestamp(end) for _, _, end in cues)
+        logger.info(f"Appending to {self.path} after its cues ending at {self._time_offset:.3f}s")
+    
+    def _sync(self, force: bool = False):
+        if self._file is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_fsync < self.fsync_interval:
+            return
+        start_time = time.perf_counter()
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.error(f"Failed to fsync {self.path}: {str(e)}")
+        self._last_fsync = now
+        if self.metrics is not None:
+            self.metrics.observe("output_fsync", time.perf_counter() - start_time)
+    
+    def _rotate(self):
+        self._sync(force=True)
+        self._file.close()
+        self._file = None
+        
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self._backup_path(index)
+            if source.exists():
+                os.replace(source, self._backup_path(index + 1))
+        if self.backup_count > 0:
+            os.replace(self.path, self._backup_path(1))
+        else:
+            self.path.unlink()
+        self.rotations += 1
+        logger.info(f"Rotated {self.path}")
+        self._open()
+    
+    def _backup_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{index}{self.path.suffix}")
+    
+    def _reset(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
@@ -1,10 +1,19 @@
 import streamlit as st
+import argparse
 import os
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-import tempfile
+from src.audio import TARGET_SAMPLE_RATE, decode_audio_bytes
+from src.cache import hash_bytes
 from src.inference import QwenASRPipeline
 
+# Streamlit passes arguments after "--": streamlit run streamlit_app.py -- --results-dir ./out
+_parser = argparse.ArgumentParser()
+_parser.add_argument("--results-dir", default=os.environ.get("ASR_RESULTS_DIR", "results"))
+RESULTS_DIR = Path(_parser.parse_known_args()[0].results_dir)
+MAX_CACHED_RESULTS = 32
+
 st.set_page_config(
     page_title="Qwen3-ASR Transcription Studio",
     page_icon="🎙️",
@@ -47,8 +56,8 @@ def load_model():
         return QwenASRPipeline()
 
 def save_transcription(text: str, audio_filename: str = "recording") -> str:
-    results_dir = Path("/root/ASRmodel/results")
-    results_dir.mkdir(exist_ok=True)
+    results_dir = RESULTS_DIR
+    results_dir.mkdir(parents=True, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{audio_filename}_{timestamp}_transcription.txt"
@@ -62,8 +71,44 @@ def save_transcription(text: str, audio_filename: str = "recording") -> str:
     
     return str(filepath)
 
+def transcribe_upload(data: bytes) -> dict:
+    """
+    Transcribe recorded audio bytes, reusing the result of earlier reruns.
+    
+    Streamlit reruns the whole script on every interaction, so results are
+    kept in the session keyed by the audio hash; only new audio is decoded
+    (in memory) and transcribed, and only once saved to disk.
+    """
+    results = st.session_state.transcriptions
+    audio_hash = hash_bytes(data)
+    if audio_hash in results:
+        results.move_to_end(audio_hash)
+        return results[audio_hash]
+    
+    asr_model = load_model()
+    waveform = decode_audio_bytes(data)
+    transcription = asr_model.transcribe_numpy(waveform, TARGET_SAMPLE_RATE)
+    
+    result = {
+        "text": transcription,
+        "timestamp": datetime.now().strftime('%Y%m%d_%H%M%S'),
+        "saved_path": None,
+    }
+    if transcription and transcription.strip():
+        result["saved_path"] = save_transcription(transcription, "audio_recording")
+    
+    results[audio_hash] = result
+    while len(results) > MAX_CACHED_RESULTS:
+        results.popitem(last=False)
+    return result
+
+def clear_recording():
+    st.session_state.audio_input_counter += 1
+
 if 'audio_input_counter' not in st.session_state:
     st.session_state.audio_input_counter = 0
+if 'transcriptions' not in st.session_state:
+    st.session_state.transcriptions = OrderedDict()
 
 col1, col2, col3 = st.columns([1, 2, 1])
 
@@ -83,15 +128,8 @@ with col2:
         
         with st.spinner("🔄 Processing audio and generating transcription..."):
             try:
-                asr_model = load_model()
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-                    tmp_file.write(audio_data.getvalue())
-                    tmp_path = tmp_file.name
-                
-                transcription = asr_model.transcribe(tmp_path)
-                
-                os.unlink(tmp_path)
+                result = transcribe_upload(audio_data.getvalue())
+                transcription = result["text"]
                 
                 if transcription and transcription.strip():
                     st.success("✅ Transcription Complete!")
@@ -105,22 +143,18 @@ with col2:
                         label_visibility="collapsed"
                     )
                     
-                    saved_path = save_transcription(transcription, "audio_recording")
-                    
-                    st.info(f"💾 Transcript automatically saved to:\n`{saved_path}`")
+                    st.info(f"💾 Transcript automatically saved to:\n`{result['saved_path']}`")
                     
                     col_a, col_b = st.columns(2)
                     with col_a:
                         st.download_button(
                             label="⬇️ Download Transcript",
                             data=transcription,
-                            file_name=f"transcription_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                            file_name=f"transcription_{result['timestamp']}.txt",
                             mime="text/plain"
                         )
                     with col_b:
-                        if st.button("🔄 Clear & Record New"):
-                            st.session_state.audio_input_counter += 1
-                            st.rerun()
+                        st.button("🔄 Clear & Record New", on_click=clear_recording)
                 else:
                     st.warning("⚠️ No transcription generated. Please try recording again.")
                     
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Let the tests import the flat ``src`` package however pytest is started
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,60 @@
+"""
+AsyncQwenASRPipeline tests: coalescing awaits and keeping bad inputs out of batches.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.async_pipeline import AsyncQwenASRPipeline
+
+
+class StubPipeline:
+    """
+    Records the inputs of every ``transcribe_batch`` call and answers with a description of each.
+    """
+    
+    def __init__(self):
+        self.batches = []
+    
+    def transcribe_batch(self, inputs, languages=None, batch_size=None):
+        self.batches.append(list(inputs))
+        return [item if isinstance(item, str) else f"{len(item[0])} samples" for item in inputs]
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(b"not decoded by the stub")
+    return str(path)
+
+
+def transcribe_batch(pipeline, inputs, **options):
+    async def main():
+        async with AsyncQwenASRPipeline(pipeline, max_wait_ms=200) as asr:
+            return await asr.atranscribe_batch(inputs, **options)
+    return asyncio.run(main())
+
+
+def test_concurrent_inputs_share_one_batch(audio_file):
+    pipeline = StubPipeline()
+    texts = transcribe_batch(pipeline, [audio_file, (np.zeros(800, dtype=np.float32), 16000)])
+    assert texts == [audio_file, "800 samples"]
+    assert len(pipeline.batches) == 1
+
+
+def test_missing_path_is_reported_in_place(audio_file, tmp_path):
+    pipeline = StubPipeline()
+    missing = str(tmp_path / "missing.wav")
+    results = transcribe_batch(pipeline, [audio_file, missing, audio_file], return_exceptions=True)
+    
+    assert results[0] == results[2] == audio_file
+    assert isinstance(results[1], FileNotFoundError)
+    assert pipeline.batches == [[audio_file, audio_file]]
+
+
+def test_missing_path_raises_before_submitting(audio_file, tmp_path):
+    pipeline = StubPipeline()
+    with pytest.raises(FileNotFoundError):
+        transcribe_batch(pipeline, [audio_file, str(tmp_path / "missing.wav")])
+    assert pipeline.batches == []
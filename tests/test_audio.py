@@ -0,0 +1,48 @@
+"""
+Audio front-end tests: chunked StreamingResampler output against one-shot resample().
+"""
+import numpy as np
+import pytest
+
+from src.audio import TARGET_SAMPLE_RATE, StreamingResampler, resample
+
+
+def stream(resampler: StreamingResampler, audio: np.ndarray, chunk_sizes) -> np.ndarray:
+    """
+    Feed ``audio`` in chunks cycling through ``chunk_sizes`` and return everything emitted.
+    """
+    outputs, position, index = [], 0, 0
+    while position < len(audio):
+        size = chunk_sizes[index % len(chunk_sizes)]
+        outputs.append(resampler.process(audio[position:position + size]))
+        position += size
+        index += 1
+    outputs.append(resampler.flush())
+    return np.concatenate(outputs)
+
+
+@pytest.mark.parametrize("src_rate", [8000, 22050, 44100, 48000])
+@pytest.mark.parametrize("chunk_sizes", [[1600], [1, 7, 333, 4096]])
+def test_chunked_output_matches_one_shot(src_rate, chunk_sizes):
+    audio = np.random.default_rng(src_rate).uniform(-1, 1, src_rate * 2 + 123).astype(np.float32)
+    expected = resample(audio, src_rate, TARGET_SAMPLE_RATE)
+    
+    streamed = stream(StreamingResampler(src_rate), audio, chunk_sizes)
+    assert streamed.dtype == np.float32
+    assert len(streamed) == len(expected)
+    np.testing.assert_allclose(streamed, expected, atol=1e-5)
+
+
+def test_resampler_restarts_after_flush():
+    audio = np.random.default_rng(0).uniform(-1, 1, 44100).astype(np.float32)
+    resampler = StreamingResampler(44100)
+    first = stream(resampler, audio, [4410])
+    second = stream(resampler, audio, [4410])
+    np.testing.assert_array_equal(first, second)
+
+
+def test_matching_rates_pass_through():
+    audio = np.arange(100, dtype=np.float32)
+    resampler = StreamingResampler(TARGET_SAMPLE_RATE)
+    np.testing.assert_array_equal(resampler.process(audio), audio)
+    assert len(resampler.flush()) == 0
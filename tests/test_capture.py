@@ -0,0 +1,117 @@
+"""
+Capture tests: ring buffer bookkeeping and the lag policies of CaptureSession.
+
+The session captures from an ``ArrayAudioSource`` without real-time pacing,
+so the whole recording is buffered before the consumer reads anything and
+every policy sees the same, fully predictable backlog.
+"""
+import logging
+import time
+
+import numpy as np
+import pytest
+
+from src.capture import ArrayAudioSource, AudioRingBuffer, CaptureSession
+
+SAMPLING_RATE = 16000
+CHUNK = 1600
+NUM_CHUNKS = 10
+
+
+def numbered_audio() -> np.ndarray:
+    """
+    Return NUM_CHUNKS chunks whose samples all hold the chunk's index.
+    """
+    return np.repeat(np.arange(NUM_CHUNKS, dtype=np.float32), CHUNK)
+
+
+def captured_session(**session_options) -> CaptureSession:
+    """
+    Capture all of ``numbered_audio()`` and return the session once the source is exhausted.
+    """
+    session = CaptureSession(
+        ArrayAudioSource(numbered_audio(), SAMPLING_RATE, realtime=False),
+        chunk_samples=CHUNK,
+        block_samples=CHUNK,
+        **session_options
+    )
+    session.start()
+    deadline = time.monotonic() + 10
+    while not session.buffer.closed:
+        assert time.monotonic() < deadline, "capture thread did not finish"
+        time.sleep(0.01)
+    return session
+
+
+def test_ring_buffer_wraps_around():
+    buffer = AudioRingBuffer(8)
+    assert buffer.write(np.arange(6, dtype=np.float32)) == 6
+    np.testing.assert_array_equal(buffer.read(4), [0, 1, 2, 3])
+    
+    # Starts at index 6 and continues at the front of the storage
+    assert buffer.write(np.arange(6, 11, dtype=np.float32)) == 5
+    assert buffer.available == 7
+    np.testing.assert_array_equal(buffer.read(7), [4, 5, 6, 7, 8, 9, 10])
+    assert buffer.available == 0
+    assert buffer.overflow_samples == 0
+
+
+def test_ring_buffer_counts_overflow():
+    buffer = AudioRingBuffer(4)
+    assert buffer.write(np.arange(3, dtype=np.float32)) == 3
+    assert buffer.write(np.arange(3, 6, dtype=np.float32)) == 1
+    assert buffer.overflow_samples == 2
+    np.testing.assert_array_equal(buffer.read(4), [0, 1, 2, 3])
+    
+    # Space freed by the read is usable again
+    assert buffer.write(np.arange(4, dtype=np.float32)) == 4
+    assert buffer.overflow_samples == 2
+
+
+def test_ring_buffer_returns_remainder_after_close():
+    buffer = AudioRingBuffer(8)
+    buffer.write(np.ones(3, dtype=np.float32))
+    assert buffer.read(4, timeout=0.01) is None
+    buffer.close()
+    np.testing.assert_array_equal(buffer.read(4), [1, 1, 1])
+    assert buffer.read(4) is None
+
+
+def test_drop_policy_keeps_order_and_drops_new_audio(caplog):
+    with caplog.at_level(logging.WARNING, logger="src.capture"):
+        session = captured_session(lag_policy="drop", buffer_seconds=0.4)
+    chunks = list(session.chunks())
+    
+    assert [chunk[0] for chunk in chunks] == [0, 1, 2, 3]
+    stats = session.stats()
+    assert stats["captured_seconds"] == pytest.approx(1.0)
+    assert stats["overflow_seconds"] == pytest.approx(0.6)
+    # One warning when the buffer fills and one with the total, not one per block
+    assert len(caplog.records) == 2
+    assert "0.60s" in caplog.records[-1].getMessage()
+
+
+def test_skip_policy_jumps_to_newest_chunk():
+    session = captured_session(lag_policy="skip")
+    chunks = list(session.chunks())
+    
+    assert len(chunks) == 1
+    assert np.all(chunks[0] == NUM_CHUNKS - 1)
+    stats = session.stats()
+    assert stats["skipped_seconds"] == pytest.approx(0.9)
+    assert stats["overflow_seconds"] == 0
+
+
+def test_merge_policy_merges_backlog_up_to_limit():
+    session = captured_session(lag_policy="merge", max_merge_chunks=4)
+    chunks = list(session.chunks())
+    
+    assert [len(chunk) // CHUNK for chunk in chunks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate(chunks), numbered_audio())
+    assert session.stats()["merged_chunks"] == 7
+    assert session.stats()["max_lag_seconds"] == pytest.approx(0.6)
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        CaptureSession(ArrayAudioSource(numbered_audio()), chunk_samples=CHUNK, lag_policy="wait")
@@ -0,0 +1,132 @@
+"""
+Bulk job tests: resuming an interrupted run, idempotent re-adds and retry bookkeeping.
+
+A stub pipeline stands in for the model; the manifest is a real sqlite
+database in a temporary directory.
+"""
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from src.jobs import DONE, FAILED, PENDING, JobManifest, JobRunner
+
+
+class Interrupted(BaseException):
+    """
+    Stands in for Ctrl-C or a killed process in the middle of a run.
+    """
+
+
+class StubPipeline:
+    """
+    Transcribes a file as its name; fails files named ``bad*`` and can interrupt after some calls.
+    """
+    
+    def __init__(self, interrupt_after: int = None):
+        self.calls = []
+        self.interrupt_after = interrupt_after
+    
+    def transcribe_batch(self, paths, batch_size=None, **batch_options):
+        if self.interrupt_after is not None and len(self.calls) >= self.interrupt_after:
+            raise Interrupted()
+        self.calls.append([Path(path).name for path in paths])
+        if any(Path(path).name.startswith("bad") for path in paths):
+            raise RuntimeError("cannot decode")
+        return [f"text of {Path(path).name}" for path in paths]
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    directory = tmp_path / "audio"
+    directory.mkdir()
+    for index in range(6):
+        (directory / f"clip{index}.wav").write_bytes(f"audio {index}".encode())
+    return directory
+
+
+def run_job(db_path, files, output_dir, pipeline, **runner_options):
+    manifest = JobManifest(db_path)
+    try:
+        added = manifest.add(files)
+        counts = JobRunner(pipeline, manifest, output_dir, **runner_options).run(wait_for_retries=False)
+        return added, counts
+    finally:
+        manifest.close()
+
+
+def test_resume_after_interruption(tmp_path, audio_dir):
+    files = sorted(audio_dir.iterdir())
+    db_path, output_dir = tmp_path / "job.sqlite", tmp_path / "out"
+    
+    with pytest.raises(Interrupted):
+        run_job(db_path, files, output_dir, StubPipeline(interrupt_after=1), batch_size=2)
+    assert sorted(path.name for path in output_dir.iterdir()) == ["clip0_transcription.txt", "clip1_transcription.txt"]
+    
+    pipeline = StubPipeline()
+    added, counts = run_job(db_path, files, output_dir, pipeline, batch_size=2)
+    assert added == 0
+    assert pipeline.calls == [["clip2.wav", "clip3.wav"], ["clip4.wav", "clip5.wav"]]
+    assert counts == {PENDING: 0, DONE: 6, FAILED: 0}
+    assert (output_dir / "clip5_transcription.txt").read_text() == "text of clip5.wav"
+
+
+def test_re_adding_finished_files_is_idempotent(tmp_path, audio_dir):
+    files = sorted(audio_dir.iterdir())
+    db_path, output_dir = tmp_path / "job.sqlite", tmp_path / "out"
+    assert run_job(db_path, files, output_dir, StubPipeline())[0] == 6
+    
+    pipeline = StubPipeline()
+    added, counts = run_job(db_path, files, output_dir, pipeline)
+    assert (added, pipeline.calls) == (0, [])
+    assert counts[DONE] == 6
+    
+    # A new mtime alone is not a change; new contents are
+    stat = os.stat(files[0])
+    os.utime(files[0], (stat.st_atime, stat.st_mtime + 10))
+    files[1].write_bytes(b"re-recorded")
+    os.utime(files[1], (stat.st_atime, stat.st_mtime + 10))
+    pipeline = StubPipeline()
+    added, counts = run_job(db_path, files, output_dir, pipeline)
+    assert added == 1
+    assert pipeline.calls == [["clip1.wav"]]
+    assert counts[DONE] == 6
+
+
+def test_failed_file_is_isolated_and_retried_with_backoff(tmp_path, audio_dir):
+    bad = audio_dir / "bad.wav"
+    bad.write_bytes(b"corrupt")
+    files = sorted(audio_dir.iterdir())
+    db_path, output_dir = tmp_path / "job.sqlite", tmp_path / "out"
+    
+    before = time.time()
+    _, counts = run_job(db_path, files, output_dir, StubPipeline(), backoff_seconds=100.0)
+    assert counts == {PENDING: 0, DONE: 6, FAILED: 1}
+    
+    manifest = JobManifest(db_path)
+    try:
+        assert manifest.due(max_attempts=3) == []
+        assert manifest.failures() == [(str(bad), 1, "RuntimeError: cannot decode")]
+        assert manifest.next_retry_at(max_attempts=3) == pytest.approx(before + 100.0, abs=5.0)
+        # Each further failure doubles the delay
+        manifest.mark_failed(str(bad), "RuntimeError: cannot decode", 100.0, 0.0)
+        assert manifest.next_retry_at(max_attempts=3) == pytest.approx(time.time() + 200.0, abs=5.0)
+        # No attempts left: nothing is due or scheduled any more
+        assert manifest.next_retry_at(max_attempts=2) is None
+    finally:
+        manifest.close()
+    
+    manifest = JobManifest(db_path)
+    try:
+        manifest.add(files)
+        # --retry-failed: fresh attempts, retried after the (short) backoff within one run
+        assert manifest.reset_failed() == 1
+        pipeline = StubPipeline()
+        counts = JobRunner(pipeline, manifest, output_dir, max_attempts=2, backoff_seconds=0.01).run()
+        assert pipeline.calls == [["bad.wav"], ["bad.wav"]]
+        assert counts == {PENDING: 0, DONE: 6, FAILED: 1}
+        assert manifest.failures()[0][1] == 2
+        assert manifest.due(max_attempts=2) == []
+    finally:
+        manifest.close()
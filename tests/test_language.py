@@ -0,0 +1,86 @@
+"""
+LanguageTracker tests: pinning, periodic re-checks and unpinning on disagreement.
+"""
+import pytest
+
+from src.language import LanguageTracker
+
+
+def transcribe_chunk(tracker: LanguageTracker, detected: str, seconds: float = 5.0):
+    """
+    Run one chunk through the tracker as a pipeline would; ``detected`` is what the model reports.
+    """
+    hint = tracker.next_hint()
+    return tracker.observe(hint or detected, seconds, hint)
+
+
+def test_pins_after_agreeing_detections():
+    tracker = LanguageTracker(min_detections=2, confidence_threshold=0.8)
+    assert tracker.next_hint() is None
+    
+    first = transcribe_chunk(tracker, "English")
+    assert (first.detected, first.pinned) == (True, False)
+    assert tracker.next_hint() is None
+    
+    second = transcribe_chunk(tracker, "English")
+    assert (second.detected, second.pinned) == (True, True)
+    assert tracker.next_hint() == "English"
+    
+    # Pinned chunks skip detection
+    third = transcribe_chunk(tracker, "German")
+    assert (third.language, third.detected, third.confidence) == ("English", False, 1.0)
+    assert tracker.detections == 2
+
+
+def test_silence_and_mixed_output_do_not_vote():
+    tracker = LanguageTracker(min_detections=2)
+    transcribe_chunk(tracker, "")
+    transcribe_chunk(tracker, "English,Chinese")
+    transcribe_chunk(tracker, "English")
+    assert tracker.language is None
+    assert tracker.detections == 1
+
+
+def test_rechecks_after_pinned_audio():
+    tracker = LanguageTracker(min_detections=2, recheck_seconds=10.0)
+    transcribe_chunk(tracker, "English")
+    transcribe_chunk(tracker, "English")
+    
+    transcribe_chunk(tracker, "English", seconds=6.0)
+    assert tracker.next_hint() == "English"
+    transcribe_chunk(tracker, "English", seconds=6.0)
+    assert tracker.next_hint() is None
+    
+    recheck = transcribe_chunk(tracker, "English")
+    assert (recheck.detected, recheck.pinned) == (True, True)
+    assert tracker.rechecks == 1
+    assert tracker.next_hint() == "English"
+
+
+def test_disagreeing_recheck_unpins():
+    tracker = LanguageTracker(min_detections=2, confidence_threshold=0.8, recheck_seconds=0.0)
+    transcribe_chunk(tracker, "English")
+    transcribe_chunk(tracker, "English")
+    assert tracker.language == "English"
+    
+    recheck = transcribe_chunk(tracker, "German")
+    assert recheck.pinned is False
+    assert tracker.confidence == pytest.approx(2 / 3)
+    assert tracker.language is None
+    assert tracker.next_hint() is None
+    
+    # Detection resumes on every chunk until the votes agree again
+    for _ in range(3):
+        transcribe_chunk(tracker, "German")
+    assert tracker.language == "German"
+
+
+def test_user_hint_is_never_rechecked():
+    tracker = LanguageTracker(hint="French", recheck_seconds=0.0)
+    for _ in range(3):
+        detection = transcribe_chunk(tracker, "English")
+        assert (detection.language, detection.pinned, detection.detected) == ("French", True, False)
+    assert tracker.detections == 0
+    
+    tracker.reset()
+    assert tracker.language == "French"
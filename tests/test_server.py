@@ -0,0 +1,123 @@
+"""
+Server tests: request coalescing, timeouts and upload limits with a stub model.
+"""
+import io
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.server import ASRClient, ASRServer, RequestCoalescer
+
+
+class StubPipeline:
+    """
+    Records every ``transcribe_batch`` call and answers with each input's length.
+    """
+    
+    def __init__(self, release: threading.Event = None):
+        self.batches = []
+        self.called = threading.Event()
+        self.release = release
+    
+    def transcribe_batch(self, inputs, languages=None, batch_size=None):
+        self.batches.append(len(inputs))
+        self.called.set()
+        if self.release is not None:
+            self.release.wait(10)
+        return [f"{len(waveform)} samples, {language}" for (waveform, _), language in zip(inputs, languages)]
+
+
+def wav_bytes(num_samples: int) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(num_samples, dtype=np.float32), 16000, format="WAV")
+    return buffer.getvalue()
+
+
+def post(server: ASRServer, data: bytes):
+    """
+    POST raw bytes to /transcribe and return (status, body).
+    """
+    request = urllib.request.Request(f"{server.url}/transcribe", data=data, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+    
+    def start(pipeline, **server_options):
+        server = ASRServer(pipeline, port=0, **server_options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return server
+    
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        thread.join(10)
+
+
+def test_coalescer_merges_queued_requests():
+    pipeline = StubPipeline()
+    coalescer = RequestCoalescer(pipeline, max_batch_size=8, max_wait_ms=50)
+    requests = [coalescer.submit((np.zeros(n, dtype=np.float32), 16000), language) for n, language in
+                [(100, "English"), (200, None), (300, "German")]]
+    coalescer.start()
+    try:
+        texts = [request.future.result(timeout=10) for request in requests]
+    finally:
+        coalescer.stop()
+    
+    assert pipeline.batches == [3]
+    assert texts == ["100 samples, English", "200 samples, None", "300 samples, German"]
+    assert all(request.batch_size == 3 for request in requests)
+
+
+def test_server_batches_concurrent_clients(serve):
+    pipeline = StubPipeline()
+    server = serve(pipeline, max_batch_size=4, max_wait_ms=500)
+    client = ASRClient(server.url, timeout=10)
+    lengths = [1600, 3200, 4800, 6400]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        texts = list(executor.map(lambda n: client.transcribe(wav_bytes(n)), lengths))
+    
+    assert pipeline.batches == [4]
+    assert texts == [f"{n} samples, None" for n in lengths]
+
+
+def test_timed_out_request_never_reaches_model(serve):
+    release = threading.Event()
+    pipeline = StubPipeline(release)
+    server = serve(pipeline, max_batch_size=1, max_wait_ms=0, request_timeout=0.3)
+    
+    # The first request occupies the model; the second times out while queued
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = executor.submit(post, server, wav_bytes(1600))
+        assert pipeline.called.wait(10)
+        status, _ = post(server, wav_bytes(3200))
+        release.set()
+        first.result()
+    server.coalescer.stop()
+    
+    assert status == 504
+    assert pipeline.batches == [1]
+
+
+def test_oversized_upload_is_refused_unread(serve):
+    pipeline = StubPipeline()
+    server = serve(pipeline, max_request_bytes=1024)
+    status, body = post(server, wav_bytes(1600))
+    
+    assert status == 413
+    assert b"exceeds 1024 bytes" in body
+    assert pipeline.batches == []
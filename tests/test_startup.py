@@ -0,0 +1,58 @@
+"""
+Startup regression check: validating arguments must not import the model stack.
+
+``cli.py --help`` and argument errors used to pay for importing torch and
+qwen_asr before doing anything; the heavy imports now happen only once a
+model is loaded. Each case runs the CLI in a fresh interpreter and inspects
+``sys.modules`` when it exits.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("torch", "torchaudio", "qwen_asr", "transformers", "librosa")
+
+PROBE = """
+import json, runpy, sys
+sys.argv = {argv!r}
+try:
+    runpy.run_path("cli.py", run_name="__main__")
+except SystemExit:
+    pass
+finally:
+    loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+    sys.stderr.write("LOADED " + json.dumps(loaded) + "\\n")
+"""
+
+
+def run_cli(*cli_args: str):
+    """
+    Run cli.py with ``cli_args`` and return (completed process, heavy modules it imported).
+    """
+    probe = PROBE.format(argv=["cli.py", *cli_args], heavy=HEAVY_MODULES)
+    process = subprocess.run(
+        [sys.executable, "-c", probe], cwd=REPO_ROOT, capture_output=True, text=True, timeout=300
+    )
+    # An import error escapes the probe, so a crash cannot pass for a clean startup
+    assert process.returncode == 0, process.stderr
+    marker = next(line for line in process.stderr.splitlines() if line.startswith("LOADED "))
+    return process, json.loads(marker[len("LOADED "):])
+
+
+def test_help_skips_model_imports():
+    process, loaded = run_cli("--help")
+    assert "usage:" in process.stdout
+    assert loaded == []
+
+
+@pytest.mark.parametrize("cli_args", [
+    ("--audio", "does_not_exist.wav"),
+    ("--audio-dir", "does_not_exist"),
+])
+def test_input_validation_skips_model_imports(cli_args):
+    _, loaded = run_cli(*cli_args)
+    assert loaded == []
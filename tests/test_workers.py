@@ -0,0 +1,81 @@
+"""
+WorkerPool tests with a stub model: ordering, crash recovery and giving up.
+
+Workers are spawned, so the stub factories live at module level where the
+child processes can unpickle them.
+"""
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.workers import WorkerPool
+
+CRASH_SAMPLES = 4242
+
+
+class StubModel:
+    """
+    Returns each input's length and the worker's pid; kills the worker on a CRASH_SAMPLES input.
+    
+    With a ``marker`` path the crash happens only once across all workers.
+    """
+    
+    def __init__(self, marker=None):
+        self.marker = marker
+    
+    def transcribe(self, audio, language=None, **kwargs):
+        items = audio if isinstance(audio, list) else [audio]
+        for waveform, _ in items:
+            if len(waveform) == CRASH_SAMPLES and not (self.marker and os.path.exists(self.marker)):
+                if self.marker:
+                    Path(self.marker).touch()
+                os._exit(3)
+        time.sleep(0.05)
+        return [SimpleNamespace(text=f"{len(waveform)} {os.getpid()}", language="English") for waveform, _ in items]
+
+
+class StubFactory:
+    def __init__(self, marker=None):
+        self.marker = marker
+    
+    def __call__(self):
+        return StubModel(self.marker)
+
+
+def inputs(*lengths):
+    return [(np.zeros(n, dtype=np.float32), 16000) for n in lengths]
+
+
+def test_results_keep_input_order_across_workers():
+    lengths = [1000, 2000, 3000, 4000, 5000, 6000]
+    with WorkerPool(num_workers=2, threads_per_worker=1, model_factory=StubFactory()) as pool:
+        texts = pool.transcribe_batch(inputs(*lengths), batch_size=1)
+    
+    assert [int(text.split()[0]) for text in texts] == lengths
+    assert len({text.split()[1] for text in texts}) == 2
+
+
+def test_crashed_worker_is_restarted_and_chunk_retried(tmp_path):
+    marker = tmp_path / "crashed"
+    lengths = [1000, CRASH_SAMPLES, 3000, 4000]
+    with WorkerPool(num_workers=2, threads_per_worker=1, model_factory=StubFactory(str(marker))) as pool:
+        texts = pool.transcribe_batch(inputs(*lengths), batch_size=1)
+        assert pool.restarts == 1
+        # The restarted worker keeps serving later calls
+        assert [int(text.split()[0]) for text in pool.transcribe_batch(inputs(7000, 8000), batch_size=1)] == [7000, 8000]
+    
+    assert marker.exists()
+    assert [int(text.split()[0]) for text in texts] == lengths
+
+
+def test_gives_up_on_chunk_that_keeps_crashing():
+    with WorkerPool(
+        num_workers=2, threads_per_worker=1, model_factory=StubFactory(), max_task_retries=1
+    ) as pool:
+        with pytest.raises(RuntimeError, match="crashed a worker 2 times; giving up"):
+            pool.transcribe_batch(inputs(1000, CRASH_SAMPLES, 3000), batch_size=1)
+        assert pool.restarts == 2
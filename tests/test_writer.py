@@ -0,0 +1,39 @@
+"""
+TranscriptWriter tests: appending SRT/VTT output to a file from an earlier session.
+"""
+import re
+
+import pytest
+
+from src.writer import TranscriptRecord, TranscriptWriter, parse_timestamp
+
+
+def write_session(path, output_format, spans):
+    """
+    Write one capture session whose stream offsets start at zero.
+    """
+    with TranscriptWriter(path, output_format=output_format, flush_interval=0.0) as writer:
+        for index, (start, end) in enumerate(spans):
+            writer.write(TranscriptRecord(f"cue {index}", start=start, end=end))
+
+
+@pytest.mark.parametrize("output_format", ["srt", "vtt"])
+def test_append_continues_cues(tmp_path, output_format):
+    path = tmp_path / f"notes.{output_format}"
+    write_session(path, output_format, [(0.0, 2.0), (2.0, 4.5)])
+    write_session(path, output_format, [(0.0, 1.0), (1.0, 3.0)])
+    text = path.read_text(encoding="utf-8")
+    
+    starts = [parse_timestamp(start) for start in re.findall(r"^(\S+) -->", text, re.MULTILINE)]
+    assert starts == [0.0, 2.0, 4.5, 5.5]
+    if output_format == "srt":
+        assert re.findall(r"^(\d+)$", text, re.MULTILINE) == ["1", "2", "3", "4"]
+    else:
+        assert text.count("WEBVTT") == 1
+
+
+def test_append_to_text_leaves_records_unshifted(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    write_session(path, "jsonl", [(0.0, 2.0)])
+    write_session(path, "jsonl", [(0.0, 1.0)])
+    assert path.read_text(encoding="utf-8").count('"start": 0.0') == 2
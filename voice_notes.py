@@ -1,11 +1,19 @@
 import argparse
+import itertools
 import logging
 import sys
+import time
 import numpy as np
-import soundfile as sf
-from pathlib import Path
-from datetime import datetime
+from typing import List, Optional
+from src.audio import TARGET_SAMPLE_RATE, StreamingResampler
+from src.ingest import AudioReader
 from src.inference import QwenASRPipeline
+from src.language import LanguageTracker
+from src.metrics import MetricsRegistry
+from src.capture import LAG_POLICIES, AudioSource, CaptureSession, PyAudioSource
+from src.streaming import StreamingHypothesis, StreamingTranscriber
+from src.vad import EnergyVAD, VoiceActivityDetector
+from src.writer import FORMATS, TranscriptRecord, TranscriptWriter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,22 +31,80 @@ class VoiceNotesApp:
     def __init__(
         self,
         output_file: str = "voice_notes.txt",
-        chunk_duration: float = 5.0
+        chunk_duration: float = 5.0,
+        vad: Optional[VoiceActivityDetector] = None,
+        hop_duration: Optional[float] = None,
+        lag_policy: str = "drop",
+        buffer_seconds: float = 60.0,
+        metrics_out: Optional[str] = None,
+        output_format: str = "text",
+        rotate_bytes: Optional[int] = None,
+        fsync_interval: float = 5.0,
+        language: Optional[str] = None,
+        language_confidence: float = 0.8,
+        language_recheck_seconds: float = 60.0
     ):
         """
         Initialize the Voice Notes application.
         
         Args:
-            output_file: Path to the output text file
+            output_file: Path to the output file
             chunk_duration: Duration of each audio chunk in seconds
+            vad: Optional voice activity detector. Silent chunks are dropped
+                before inference and voiced chunks are trimmed to their speech.
+            hop_duration: If set, enables streaming mode: overlapping windows of
+                         chunk_duration are transcribed every hop_duration
+                         seconds and their text is stitched together.
+            lag_policy: What live capture does when inference falls behind:
+                       "drop", "skip" or "merge" (see CaptureSession)
+            buffer_seconds: Capture ring buffer size in seconds
+            metrics_out: Optional file to export per-stage latency metrics to
+                        when the session ends (``.prom`` for Prometheus text,
+                        otherwise JSON)
+            output_format: "text" (timestamped lines), "jsonl" (with stream
+                          offsets, language and latency), "srt" or "vtt"
+            rotate_bytes: Rotate the output file once it would exceed this size
+            fsync_interval: Minimum seconds between fsyncs of the output file
+            language: Language of the session; None detects it from the first
+                     chunks and pins it once confident
+            language_confidence: Share of recent detections that must agree
+                                before the detected language is pinned
+            language_recheck_seconds: Audio after which the pinned language is
+                                     detected again
         """
         self.output_file = output_file
         self.chunk_duration = chunk_duration
+        self.vad = vad
+        self.hop_duration = hop_duration
+        self.lag_policy = lag_policy
+        self.buffer_seconds = buffer_seconds
+        self.metrics_out = metrics_out
+        self.metrics = MetricsRegistry()
+        self.writer = TranscriptWriter(
+            output_file,
+            output_format=output_format,
+            fsync_interval=fsync_interval,
+            max_bytes=rotate_bytes,
+            metrics=self.metrics
+        )
+        self.language_tracker = LanguageTracker(
+            hint=language,
+            confidence_threshold=language_confidence,
+            recheck_seconds=language_recheck_seconds
+        )
         self.pipeline = None
         
+        self.total_seconds = 0.0
+        self.committed_seconds = 0.0
+        self.skipped_seconds = 0.0
+        
         logger.info("Initializing Voice Notes Application")
-        logger.info(f"Output file: {self.output_file}")
+        logger.info(f"Output file: {self.output_file} ({output_format})")
         logger.info(f"Chunk duration: {self.chunk_duration}s")
+        if self.hop_duration is not None:
+            logger.info(f"Streaming mode: {self.hop_duration}s hop")
+        logger.info(f"Voice activity detection: {type(self.vad).__name__ if self.vad else 'disabled'}")
+        logger.info(f"Language: {language or 'auto-detect'}")
     
     def initialize_pipeline(self):
         """
@@ -46,20 +112,35 @@ class VoiceNotesApp:
         """
         if self.pipeline is None:
             logger.info("Loading ASR model...")
-            self.pipeline = QwenASRPipeline()
+            self.pipeline = QwenASRPipeline(metrics=self.metrics)
             logger.info("ASR model loaded successfully")
     
-    def append_transcription(self, text: str):
+    def append_transcription(
+        self,
+        text: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        latency: Optional[float] = None,
+        language: Optional[str] = None
+    ):
         """
-        Append transcription to the output file with timestamp.
+        Queue a transcription for the background writer.
         
         Args:
             text: Transcribed text
+            start: Offset of the transcribed audio in the stream, in seconds
+            end: End offset of the transcribed audio, in seconds
+            latency: Seconds from receiving the audio to having its text
+            language: Detected or hinted language
+        """
+        self.writer.write(TranscriptRecord(text, start, end, language, latency))
+        logger.info(f"Queued for {self.output_file}")
+    
+    def close(self):
+        """
+        Write out queued transcriptions and stop the writer thread.
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.output_file, "a") as f:
-            f.write(f"[{timestamp}] {text}\n")
-        logger.info(f"Appended to {self.output_file}")
+        self.writer.close()
     
     def process_audio_chunk(self, audio_chunk: np.ndarray, sampling_rate: int):
         """
@@ -73,60 +154,206 @@ class VoiceNotesApp:
             if len(audio_chunk) == 0:
                 logger.warning("Empty audio chunk, skipping")
                 return
-            
+                
             logger.info(f"Processing chunk: {len(audio_chunk)} samples at {sampling_rate}Hz")
             
+            chunk_start = time.perf_counter()
+            chunk_seconds = len(audio_chunk) / sampling_rate
+            stream_offset = self.total_seconds
+            self.total_seconds += chunk_seconds
+            speech_start, speech_end = stream_offset, stream_offset + chunk_seconds
+            
+            if self.vad is not None:
+                with self.metrics.timer("vad"):
+                    speech = self.vad.detect(audio_chunk, sampling_rate)
+                if speech is None:
+                    self.skipped_seconds += chunk_seconds
+                    logger.info("No speech detected, skipping chunk")
+                    return
+                start, end = speech
+                self.skipped_seconds += (len(audio_chunk) - (end - start)) / sampling_rate
+                audio_chunk = audio_chunk[start:end]
+                speech_start, speech_end = stream_offset + start / sampling_rate, stream_offset + end / sampling_rate
+                
             transcription = self.pipeline.transcribe_numpy(
                 audio_array=audio_chunk,
-                sampling_rate=sampling_rate
+                sampling_rate=sampling_rate,
+                language_tracker=self.language_tracker
             )
             
             if transcription.strip():
                 print(f"\n[TRANSCRIPTION] {transcription}")
-                self.append_transcription(transcription)
+                self.append_transcription(
+                    transcription,
+                    start=speech_start,
+                    end=speech_end,
+                    latency=time.perf_counter() - chunk_start,
+                    language=self.language_tracker.last.language
+                )
             else:
                 logger.info("Empty transcription, skipping")
                 
+            self.metrics.observe("chunk_total", time.perf_counter() - chunk_start)
+            
         except Exception as e:
             logger.error(f"Failed to process audio chunk: {str(e)}")
     
-    def simulate_from_file(self, audio_file: str):
+    def create_streamer(self, sampling_rate: int) -> StreamingTranscriber:
         """
-        Simulate real-time audio capture from a file.
+        Create an overlapping-window transcriber for streaming mode.
         
         Args:
-            audio_file: Path to audio file to simulate streaming from
+            sampling_rate: Sampling rate of the audio that will be fed
+            
+        Returns:
+            Streaming transcriber bound to the loaded pipeline
         """
-        audio_path = Path(audio_file)
-        if not audio_path.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_file}")
-        
-        logger.info(f"Simulating audio stream from: {audio_file}")
+        return StreamingTranscriber(
+            self.pipeline,
+            window_seconds=self.chunk_duration,
+            hop_seconds=self.hop_duration,
+            sampling_rate=sampling_rate,
+            vad=self.vad,
+            language_tracker=self.language_tracker
+        )
+    
+    def handle_hypotheses(self, hypotheses: List[StreamingHypothesis], latency: Optional[float] = None):
+        """
+        Show partial hypotheses and persist final ones.
         
-        audio_data, sampling_rate = sf.read(audio_file)
+        Final text is written with the stream span since the previous final
+        hypothesis.
         
-        if len(audio_data.shape) > 1:
-            audio_data = audio_data.mean(axis=1)
+        Args:
+            hypotheses: Hypotheses emitted by the streaming transcriber
+            latency: Seconds the transcriber took to produce them
+        """
+        for hypothesis in hypotheses:
+            if not hypothesis.is_final:
+                print(f"\n[PARTIAL @ {hypothesis.audio_end:.1f}s] {hypothesis.text}")
+            elif hypothesis.text.strip():
+                print(f"\n[TRANSCRIPTION] {hypothesis.text}")
+                self.append_transcription(
+                    hypothesis.text,
+                    start=self.committed_seconds,
+                    end=hypothesis.audio_end,
+                    latency=latency,
+                    language=hypothesis.language
+                )
+                self.committed_seconds = hypothesis.audio_end
+    
+    def feed_streamer(self, streamer: StreamingTranscriber, audio_array: Optional[np.ndarray]):
+        """
+        Feed one hop of audio to the streaming transcriber and handle its output.
         
-        total_duration = len(audio_data) / sampling_rate
-        chunk_samples = int(self.chunk_duration * sampling_rate)
+        Args:
+            streamer: Streaming transcriber from ``create_streamer``
+            audio_array: Next hop of audio, or None to flush the end of the stream
+        """
+        start_time = time.perf_counter()
+        hypotheses = streamer.finish() if audio_array is None else streamer.feed(audio_array)
+        self.handle_hypotheses(hypotheses, latency=time.perf_counter() - start_time)
+    
+    def log_vad_summary(self):
+        """
+        Log how much audio voice activity detection kept away from the model.
+        """
+        if self.vad is None or self.total_seconds == 0:
+            return
+        logger.info(
+            f"VAD skipped {self.skipped_seconds:.1f}s of {self.total_seconds:.1f}s audio "
+            f"({100.0 * self.skipped_seconds / self.total_seconds:.0f}%)"
+        )
+    
+    def report_metrics(self):
+        """
+        Log per-stage latency percentiles and export them if requested.
+        """
+        snapshot = self.metrics.snapshot()
+        for stage, summary in snapshot["stages"].items():
+            logger.info(
+                f"Latency {stage}: n={summary['count']} p50={summary['p50_ms']:.1f}ms "
+                f"p95={summary['p95_ms']:.1f}ms p99={summary['p99_ms']:.1f}ms"
+            )
+        logger.info(f"Real-time factor: {snapshot['realtime_factor']:.1f}x")
         
-        logger.info(f"Audio info: {len(audio_data)} samples, {sampling_rate}Hz, {total_duration:.2f}s total")
-        logger.info(f"Processing in chunks of {self.chunk_duration}s ({chunk_samples} samples)")
+        tracker = self.language_tracker
+        if tracker.detections:
+            logger.info(
+                f"Language: {tracker.language or 'not pinned'} (confidence {tracker.confidence:.2f}, "
+                f"{tracker.detections} detections, {tracker.rechecks} re-checks)"
+            )
+            
+        if self.metrics_out:
+            self.metrics.write(self.metrics_out)
+            logger.info(f"Metrics written to {self.metrics_out}")
+    
+    def simulate_from_file(
+        self,
+        audio_file: str,
+        raw_sampling_rate: Optional[int] = None,
+        raw_channels: int = 1,
+        raw_dtype: str = "int16"
+    ):
+        """
+        Simulate real-time audio capture from a file.
         
-        self.initialize_pipeline()
+        The file is read one chunk at a time through ``AudioReader``
+        (memory-mapped for uncompressed WAV and raw PCM), so replaying a
+        multi-gigabyte capture keeps memory use flat.
         
-        num_chunks = int(np.ceil(len(audio_data) / chunk_samples))
-        logger.info(f"Starting streaming simulation ({num_chunks} chunks)...")
+        Args:
+            audio_file: Path to audio file to simulate streaming from
+            raw_sampling_rate: Sample rate of headerless ``.raw``/``.pcm`` input
+            raw_channels: Interleaved channels of headerless input
+            raw_dtype: Sample type of headerless input (e.g. int16, float32)
+        """
+        logger.info(f"Simulating audio stream from: {audio_file}")
         
-        for i in range(num_chunks):
-            start_idx = i * chunk_samples
-            end_idx = min(start_idx + chunk_samples, len(audio_data))
-            chunk = audio_data[start_idx:end_idx]
+        with AudioReader(audio_file, raw_sampling_rate, raw_channels, raw_dtype) as reader:
+            sampling_rate = reader.sampling_rate
+            logger.info(
+                f"Audio info: {reader.frames} samples, {sampling_rate}Hz, {reader.duration:.2f}s total"
+                f"{' (memory-mapped)' if reader.mapped else ''}"
+            )
             
-            logger.info(f"\n--- Chunk {i+1}/{num_chunks} ---")
-            self.process_audio_chunk(chunk, sampling_rate)
-        
+            chunk_samples = int(self.chunk_duration * TARGET_SAMPLE_RATE)
+            logger.info(f"Processing in chunks of {self.chunk_duration}s ({chunk_samples} samples)")
+            
+            self.initialize_pipeline()
+            
+            if self.hop_duration is not None:
+                # The streamer resamples as it is fed
+                streamer = self.create_streamer(sampling_rate)
+                logger.info(f"Starting streaming simulation ({self.hop_duration}s hops)...")
+                for block in reader.blocks(max(1, int(self.hop_duration * sampling_rate))):
+                    self.feed_streamer(streamer, block)
+                self.feed_streamer(streamer, None)
+                self.close()
+                self.report_metrics()
+                logger.info("\nStreaming simulation complete!")
+                return
+                
+            num_chunks = int(np.ceil(reader.frames * TARGET_SAMPLE_RATE / sampling_rate / chunk_samples))
+            logger.info(f"Starting streaming simulation ({num_chunks} chunks)...")
+            
+            # Same samples as resampling the whole file at once, one chunk in memory at a time
+            resampler = StreamingResampler(sampling_rate, TARGET_SAMPLE_RATE)
+            pending = np.zeros(0, dtype=np.float32)
+            index = 0
+            blocks = reader.blocks(max(1, int(self.chunk_duration * sampling_rate)))
+            for block in itertools.chain(blocks, [None]):
+                resampled = resampler.flush() if block is None else resampler.process(block)
+                pending = np.concatenate([pending, resampled])
+                while len(pending) >= chunk_samples or (block is None and len(pending)):
+                    chunk, pending = pending[:chunk_samples], pending[chunk_samples:]
+                    index += 1
+                    logger.info(f"\n--- Chunk {index}/{num_chunks} ---")
+                    self.process_audio_chunk(chunk, TARGET_SAMPLE_RATE)
+            
+        self.log_vad_summary()
+        self.close()
+        self.report_metrics()
         logger.info("\nStreaming simulation complete!")
     
     def run_microphone_capture(self):
@@ -139,42 +366,77 @@ class VoiceNotesApp:
             logger.error("PyAudio not installed. Install with: pip install pyaudio")
             logger.info("Alternatively, use --simulate-input <file> to test with an audio file")
             sys.exit(1)
-        
+            
         logger.info("Starting microphone capture...")
         logger.info("Press Ctrl+C to stop")
         
         self.initialize_pipeline()
         
-        p = pyaudio.PyAudio()
+        source = PyAudioSource(sampling_rate=16000)
+        try:
+            self.run_capture(source)
+        finally:
+            source.close()
+            logger.info("Microphone capture stopped")
+    
+    def run_capture(self, source: AudioSource):
+        """
+        Transcribe a live audio source, capturing on a background thread.
+        
+        Capture keeps running while a chunk is being transcribed, so slow
+        inference shows up as lag (and, per the lag policy, as skipped,
+        merged or overflowed audio) instead of silently lost input.
         
-        sampling_rate = 16000
-        chunk_samples = int(self.chunk_duration * sampling_rate)
+        Args:
+            source: Audio source to capture from (microphone or a fake source)
+        """
+        self.initialize_pipeline()
         
-        stream = p.open(
-            format=pyaudio.paFloat32,
-            channels=1,
-            rate=sampling_rate,
-            input=True,
-            frames_per_buffer=chunk_samples
+        sampling_rate = source.sampling_rate
+        # Chunks are contiguous, so one resampler carries filter state across them
+        resampler = StreamingResampler(sampling_rate, TARGET_SAMPLE_RATE)
+        streamer = None
+        chunk_seconds = self.chunk_duration
+        if self.hop_duration is not None:
+            chunk_seconds = self.hop_duration
+            streamer = self.create_streamer(sampling_rate)
+            
+        session = CaptureSession(
+            source,
+            chunk_samples=int(chunk_seconds * sampling_rate),
+            buffer_seconds=self.buffer_seconds,
+            lag_policy=self.lag_policy
         )
+        session.start()
         
         try:
-            chunk_count = 0
-            while True:
-                audio_chunk = stream.read(chunk_samples, exception_on_overflow=False)
-                audio_array = np.frombuffer(audio_chunk, dtype=np.float32)
-                
-                chunk_count += 1
-                logger.info(f"\n--- Chunk {chunk_count} ---")
-                self.process_audio_chunk(audio_array, sampling_rate)
-                
+            for chunk_count, audio_array in enumerate(session.chunks(), start=1):
+                # Audio still waiting in the ring buffer when a chunk is taken
+                self.metrics.observe("queue_wait", session.lag_seconds)
+                if streamer is not None:
+                    self.feed_streamer(streamer, audio_array)
+                    continue
+                    
+                logger.info(f"\n--- Chunk {chunk_count} (lag: {session.lag_seconds:.1f}s) ---")
+                self.process_audio_chunk(resampler.process(audio_array), TARGET_SAMPLE_RATE)
+            
         except KeyboardInterrupt:
-            logger.info("\nStopping microphone capture...")
+            logger.info("\nStopping capture...")
         finally:
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            logger.info("Microphone capture stopped")
+            session.stop()
+            
+        if streamer is not None:
+            self.feed_streamer(streamer, None)
+        self.log_vad_summary()
+        
+        stats = session.stats()
+        logger.info(
+            f"Capture stats: {stats['captured_seconds']:.1f}s captured, "
+            f"{stats['overflow_seconds']:.1f}s overflowed, {stats['skipped_seconds']:.1f}s skipped, "
+            f"{stats['merged_chunks']} chunks merged, max lag {stats['max_lag_seconds']:.1f}s"
+        )
+        self.close()
+        self.report_metrics()
 
 
 def main():
@@ -190,11 +452,48 @@ def main():
         default=None,
         help="Simulate audio stream from a file instead of using microphone"
     )
+    parser.add_argument(
+        "--raw-sample-rate",
+        type=int,
+        default=None,
+        help="Sample rate of a headerless .raw/.pcm --simulate-input file"
+    )
+    parser.add_argument(
+        "--raw-channels",
+        type=int,
+        default=1,
+        help="Interleaved channels of a headerless --simulate-input file (default: 1)"
+    )
+    parser.add_argument(
+        "--raw-dtype",
+        type=str,
+        default="int16",
+        help="Little-endian sample type of a headerless --simulate-input file (default: int16)"
+    )
     parser.add_argument(
         "--output",
         type=str,
         default="voice_notes.txt",
-        help="Output text file for transcriptions (default: voice_notes.txt)"
+        help="Output file for transcriptions (default: voice_notes.txt)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="Output format: timestamped text, JSONL with stream offsets/language/latency, SRT or WebVTT "
+             "(default: text)"
+    )
+    parser.add_argument(
+        "--rotate-mb",
+        type=float,
+        default=None,
+        help="Rotate the output file when it reaches this size (keeps 5 old files)"
+    )
+    parser.add_argument(
+        "--fsync-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between fsyncs of the output file (default: 5)"
     )
     parser.add_argument(
         "--chunk-duration",
@@ -203,21 +502,94 @@ def main():
         help="Duration of each audio chunk in seconds (default: 5.0)"
     )
     
+    parser.add_argument(
+        "--hop-duration",
+        type=float,
+        default=None,
+        help="Enable streaming mode: transcribe overlapping chunk-duration windows every N seconds"
+    )
+    parser.add_argument(
+        "--lag-policy",
+        choices=LAG_POLICIES,
+        default="drop",
+        help="When inference falls behind live capture: drop new audio once the buffer is full, "
+             "skip to the newest chunk, or merge the backlog (default: drop)"
+    )
+    parser.add_argument(
+        "--buffer-seconds",
+        type=float,
+        default=60.0,
+        help="Capture ring buffer size in seconds (default: 60)"
+    )
+    parser.add_argument(
+        "--no-vad",
+        action="store_true",
+        help="Transcribe every chunk, including silence (disables voice activity detection)"
+    )
+    parser.add_argument(
+        "--vad-threshold-db",
+        type=float,
+        default=-45.0,
+        help="Frame level in dBFS above which audio counts as speech (default: -45)"
+    )
+    parser.add_argument(
+        "--language",
+        type=str,
+        default=None,
+        help="Language of the recording, e.g. English (default: detect once and pin)"
+    )
+    parser.add_argument(
+        "--language-confidence",
+        type=float,
+        default=0.8,
+        help="Share of recent detections that must agree before the language is pinned (default: 0.8)"
+    )
+    parser.add_argument(
+        "--language-recheck-seconds",
+        type=float,
+        default=60.0,
+        help="Re-detect the pinned language after this much audio (default: 60)"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=str,
+        default=None,
+        help="Write per-stage latency metrics here on exit (.prom for Prometheus text, otherwise JSON)"
+    )
+    
     args = parser.parse_args()
     
     app = VoiceNotesApp(
         output_file=args.output,
-        chunk_duration=args.chunk_duration
+        chunk_duration=args.chunk_duration,
+        vad=None if args.no_vad else EnergyVAD(energy_threshold_db=args.vad_threshold_db),
+        hop_duration=args.hop_duration,
+        lag_policy=args.lag_policy,
+        buffer_seconds=args.buffer_seconds,
+        metrics_out=args.metrics_out,
+        output_format=args.format,
+        rotate_bytes=int(args.rotate_mb * 1024 * 1024) if args.rotate_mb else None,
+        fsync_interval=args.fsync_interval,
+        language=args.language,
+        language_confidence=args.language_confidence,
+        language_recheck_seconds=args.language_recheck_seconds
     )
     
     try:
         if args.simulate_input:
-            app.simulate_from_file(args.simulate_input)
+            app.simulate_from_file(
+                args.simulate_input,
+                raw_sampling_rate=args.raw_sample_rate,
+                raw_channels=args.raw_channels,
+                raw_dtype=args.raw_dtype
+            )
         else:
             app.run_microphone_capture()
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
         sys.exit(1)
+    finally:
+        app.close()
 
 
 if __name__ == "__main__":